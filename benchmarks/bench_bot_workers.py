@@ -0,0 +1,74 @@
+# benchmarks/bench_bot_workers.py
+"""Updates/sec of the dispatcher/worker mode (cluster.py) at 1, 2, 4, 8 workers.
+
+Runs the real ingest loop and real worker processes (importing main.py)
+against a local fake Bot API with a fixed per-call latency. Each chat
+sends several /start commands. Timing starts once every worker has
+handled a warm-up update and stops when every update has been answered.
+
+    python benchmarks/bench_bot_workers.py [chats] [messages_per_chat] [latency_ms]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ['BOT_TOKEN'] = '1:bench'
+
+from fake_bot_api import FakeBotAPI, message_update  # noqa: E402
+
+import cluster  # noqa: E402
+from telebot import apihelper  # noqa: E402
+
+CHATS = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+PER_CHAT = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+LATENCY = (float(sys.argv[3]) if len(sys.argv) > 3 else 20) / 1000
+
+
+def run(workers: int) -> float:
+    os.environ['DB_PATH'] = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    api = FakeBotAPI(latency=LATENCY).start()
+    apihelper.API_URL = api.api_url
+    ingest = cluster.Cluster(os.environ['BOT_TOKEN'], workers)
+    ingest.start()
+
+    # Har bir ishchiga bitta isitish xabari (jarayon ishga tushishi o'lchovga kirmaydi)
+    warmup, chat_id = {}, 10 ** 9
+    while len(warmup) < workers:
+        chat_id += 1
+        warmup.setdefault(ingest.ring.get(chat_id), chat_id)
+    api.add_updates([message_update(i + 1, chat, '/start') for i, chat in enumerate(warmup.values())])
+    while ingest.dispatched < workers:
+        ingest.poll_once(timeout=1)
+    api.wait_for('sendMessage', workers)
+
+    first_id = workers + 1
+    updates = [message_update(first_id + i, 1000 + i % CHATS, '/start') for i in range(CHATS * PER_CHAT)]
+    start = time.perf_counter()
+    api.add_updates(updates)
+    while ingest.dispatched < workers + len(updates):
+        ingest.poll_once(timeout=1)
+    if not api.wait_for('sendMessage', workers + len(updates)):
+        raise SystemExit(f'{workers} workers: timed out')
+    elapsed = time.perf_counter() - start
+
+    ingest.stop()
+    api.stop()
+    return len(updates) / elapsed
+
+
+def moved_share(before: int, after: int, keys: int = 100000) -> float:
+    a, b = cluster.HashRing(range(before)), cluster.HashRing(range(after))
+    return sum(a.get(k) != b.get(k) for k in range(keys)) / keys
+
+
+if __name__ == '__main__':
+    print(f'{CHATS} chats x {PER_CHAT} updates, Bot API latency {LATENCY * 1000:.0f} ms')
+    baseline = None
+    for workers in (1, 2, 4, 8):
+        rate = run(workers)
+        baseline = baseline or rate
+        print(f'{workers} worker(s): {rate:8.1f} updates/s  ({rate / baseline:.2f}x)')
+    for before, after in ((4, 5), (8, 9)):
+        print(f'{before} -> {after} workers: {moved_share(before, after):.1%} of chats move')
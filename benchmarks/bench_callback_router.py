@@ -0,0 +1,66 @@
+# benchmarks/bench_callback_router.py
+"""Callback dispatch cost: linear predicate chain vs. CallbackRouter.
+
+Matches the worst case, the last registered handler, while the number of
+registered handlers grows.
+
+    python benchmarks/bench_callback_router.py [--calls 100000]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import router  # noqa: E402
+
+
+class Call:
+    def __init__(self, data):
+        self.data = data
+
+
+def linear_chain(n):
+    # Eski usul: telebot har bir lambda predikatni ketma-ket tekshiradi
+    handlers = []
+    for i in range(n):
+        prefix = f'action{i}_'
+        handlers.append(((lambda p: lambda call: call.data.startswith(p))(prefix),
+                         lambda call: int(call.data.split('_')[1])))
+
+    def dispatch(call):
+        for predicate, handler in handlers:
+            if predicate(call):
+                return handler(call)
+    return dispatch, Call(f'action{n - 1}_42')
+
+
+def routed(n):
+    callbacks = router.CallbackRouter()
+    for i in range(n):
+        callbacks.route(f'action{i}', int)(lambda call, value: value)
+    return callbacks.dispatch, Call(router.encode(f'action{n - 1}', 42))
+
+
+def timeit(dispatch, call, calls):
+    start = time.perf_counter()
+    for _ in range(calls):
+        dispatch(call)
+    return (time.perf_counter() - start) / calls * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--calls', type=int, default=100000)
+    args = parser.parse_args()
+
+    print(f'{"handlers":>8} {"linear ns":>12} {"router ns":>12}')
+    for n in (15, 60, 240, 960):
+        linear = timeit(*linear_chain(n), args.calls)
+        routed_ns = timeit(*routed(n), args.calls)
+        print(f'{n:>8} {linear:>12.0f} {routed_ns:>12.0f}')
+
+
+if __name__ == '__main__':
+    main()
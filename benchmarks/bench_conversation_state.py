@@ -0,0 +1,83 @@
+# benchmarks/bench_conversation_state.py
+"""Conversation-state lookups per update with many half-finished wizards.
+
+Every incoming message costs one lookup (has_conversation), whether or
+not the chat is in a dialog, so both hits and misses are timed.
+
+    python benchmarks/bench_conversation_state.py [--wizards 100000] [--lookups 50000] [--threads 8]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import conversations  # noqa: E402
+import db  # noqa: E402
+import migrations  # noqa: E402
+
+
+def seed(store, wizards):
+    now = time.time()
+    data = json.dumps({'owner_id': 0, 'name': 'Startup', 'description': 'x' * 200})
+    with db.transaction() as conn:
+        conn.executemany('''
+            INSERT INTO conversations (chat_id, user_id, step, data, updated_at, expires_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', ((i, i, 'startup_logo', data, now, now + store.ttl) for i in range(1, wizards + 1)))
+
+
+def run(store, chat_ids, threads):
+    per_thread = len(chat_ids) // threads
+
+    def worker(ids):
+        for chat_id in ids:
+            store.get(chat_id, chat_id)
+
+    workers = [threading.Thread(target=worker, args=(chat_ids[i * per_thread:(i + 1) * per_thread],))
+               for i in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return per_thread * threads / elapsed, elapsed / (per_thread * threads) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--wizards', type=int, default=100000)
+    parser.add_argument('--lookups', type=int, default=50000)
+    parser.add_argument('--threads', type=int, default=8)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db.configure(os.path.join(tmp, 'bench.db'), max_size=args.threads)
+        migrations.migrate()
+        store = conversations.ConversationStore()
+        seed(store, args.wizards)
+
+        hits = [random.randint(1, args.wizards) for _ in range(args.lookups)]
+        misses = [args.wizards + random.randint(1, args.wizards) for _ in range(args.lookups)]
+
+        print(f'{args.wizards} open wizards, {args.lookups} lookups')
+        for label, ids in (('in dialog', hits), ('no dialog', misses)):
+            for threads in (1, args.threads):
+                rate, latency = run(store, ids, threads)
+                print(f'  {label:<10} threads={threads:<2} {rate:>10.0f} lookups/s  {latency:6.1f} us/lookup')
+
+        start = time.perf_counter()
+        db.execute('UPDATE conversations SET expires_at = 0')
+        removed = store.sweep()
+        print(f'  sweep: {removed} expired rows in {time.perf_counter() - start:.2f}s')
+        db.pool.close_all()
+
+
+if __name__ == '__main__':
+    main()
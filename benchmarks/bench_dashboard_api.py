@@ -0,0 +1,88 @@
+# benchmarks/bench_dashboard_api.py
+"""Bytes and SQL statements per dashboard tick: three endpoints vs /api/dashboard.
+
+Seeds users and startups, then runs one loadDashboard() tick several ways:
+the old three requests (/api/stats, /api/users, /api/startups), a first
+/api/dashboard fetch, a repeat with If-None-Match (304), and a fetch
+after a write. Body bytes are as sent on the wire; SQL statements are
+counted with the connection trace callback.
+
+    python benchmarks/bench_dashboard_api.py [users] [startups]
+"""
+import os
+import sys
+import tempfile
+
+os.environ['DB_PATH'] = os.path.join(tempfile.mkdtemp(), 'dashboard.db')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import db  # noqa: E402
+import main  # noqa: E402
+
+USERS = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+STARTUPS = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+
+statements = []
+
+
+def trace(conn):
+    conn.set_trace_callback(statements.append)
+    return conn
+
+
+def tick(client, urls, headers=None):
+    statements.clear()
+    sent, responses = 0, []
+    for url in urls:
+        response = client.get(url, headers=headers or {})
+        sent += len(response.get_data())
+        responses.append(response)
+    return sent, len(statements), responses
+
+
+if __name__ == '__main__':
+    main.init_db()
+    for i in range(1, USERS + 1):
+        main.save_user(i, f'user{i}', f'Foydalanuvchi {i}')
+    for i in range(STARTUPS):
+        startup_id = main.create_startup(f'Startup {i}', 'Loyiha tavsifi ' * 20, '', 'https://t.me/x', i % USERS + 1)
+        main.update_startup_status(startup_id, ('active', 'pending', 'completed')[i % 3])
+    session_id = main.create_web_session(1)
+
+    connect = db.pool._connect
+    db.pool._connect = lambda: trace(connect())
+    for conn in db.pool._all:
+        trace(conn)
+
+    client = main.app.test_client()
+    client.set_cookie('session_id', session_id)
+    gzip_headers = {'Accept-Encoding': 'gzip'}
+
+    rows = [('3 endpoints, plain JSON',) + tick(client, ['/api/stats', '/api/users?per_page=5',
+                                                        '/api/startups?per_page=5'])[:2]]
+    sent, queries, (response,) = tick(client, ['/api/dashboard'])
+    rows.append(('/api/dashboard, identity', sent, queries))
+    main.dashboard_snapshot.touch()
+    sent, queries, (response,) = tick(client, ['/api/dashboard'], gzip_headers)
+    assert response.headers['Content-Encoding'] == 'gzip'
+    rows.append(('/api/dashboard, gzip', sent, queries))
+    etag = response.headers['ETag']
+    sent, queries, (response,) = tick(client, ['/api/dashboard'], {**gzip_headers, 'If-None-Match': etag})
+    assert response.status_code == 304
+    rows.append(('/api/dashboard, 304 (unchanged)', sent, queries))
+    main.dashboard_snapshot.touch()
+    sent, queries, (response,) = tick(client, ['/api/dashboard'], {**gzip_headers, 'If-None-Match': etag})
+    assert response.status_code == 304
+    rows.append(('  304 after version recheck', sent, queries))
+
+    main.save_user(USERS + 1, 'new', 'Yangi')
+    sent, queries, (response,) = tick(client, ['/api/dashboard'], {**gzip_headers, 'If-None-Match': etag})
+    assert response.status_code == 200 and response.headers['ETag'] != etag
+    rows.append(('  200 after a write (rebuild)', sent, queries))
+
+    base_bytes, base_queries = rows[0][1], rows[0][2]
+    print(f"{'tick':34} {'bytes':>7} {'SQL':>4}")
+    for name, sent, queries in rows:
+        print(f'{name:34} {sent:7} {queries:4}')
+    print(f'saved per unchanged tick: {base_bytes} bytes, {base_queries} SQL statements, 2 round trips')
+    print('encodings:', main.dashboard_snapshot.encodings, 'snapshot:', main.dashboard_snapshot.stats())
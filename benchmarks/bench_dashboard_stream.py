@@ -0,0 +1,106 @@
+# benchmarks/bench_dashboard_stream.py
+"""Database load of open admin dashboards: /api/stream vs 30-second polling.
+
+Starts the web app on a local port and opens N /api/stream connections.
+While new users and startups are written, it counts the SQL statements
+the web process issues and checks that every client received the events.
+Polling is estimated from the statements a single loadDashboard() round
+(/api/stats, /api/users, /api/startups) issues, multiplied by N.
+
+    python benchmarks/bench_dashboard_stream.py [clients] [seconds]
+"""
+import http.client
+import os
+import sys
+import tempfile
+import threading
+import time
+
+CLIENTS = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+os.environ['DB_PATH'] = os.path.join(tempfile.mkdtemp(), 'stream.db')
+# werkzeug har bir ulanishga oqim ochadi: obunachilar chegarasi CLIENTS dan past bo'lmasin
+os.environ['WEB_THREADS'] = str(CLIENTS + 8)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from werkzeug.serving import make_server  # noqa: E402
+
+import db  # noqa: E402
+import main  # noqa: E402
+
+SECONDS = float(sys.argv[2]) if len(sys.argv) > 2 else 10
+ADMIN = 1
+
+statements = []
+
+
+def trace(conn):
+    # Veb jarayonidagi barcha SQL so'rovlarini sanaymiz
+    conn.set_trace_callback(lambda sql: statements.append(threading.current_thread().name))
+    return conn
+
+
+def client(port, session_id, received, ready):
+    conn = http.client.HTTPConnection('127.0.0.1', port)
+    conn.request('GET', '/api/stream', headers={'Cookie': f'session_id={session_id}'})
+    response = conn.getresponse()
+    assert response.status == 200, response.status
+    ready.release()
+    for line in response:
+        if line.startswith(b'event: '):
+            received.append(line[7:].strip().decode())
+
+
+if __name__ == '__main__':
+    connect = db.pool._connect
+    db.pool._connect = lambda: trace(connect())
+    for conn in db.pool._all:
+        trace(conn)
+    main.init_db()
+    main.save_user(ADMIN, 'admin', 'Admin')
+    session_id = main.create_web_session(ADMIN)
+    server = make_server('127.0.0.1', 0, main.app, threaded=True)
+    port = server.server_port
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    test_client = main.app.test_client()
+    test_client.set_cookie('session_id', session_id)
+    statements.clear()
+    for url in ('/api/stats', '/api/users?per_page=5', '/api/startups?per_page=5'):
+        assert test_client.get(url).status_code == 200
+    per_refresh = len(statements)
+
+    ready = threading.Semaphore(0)
+    received = [[] for _ in range(CLIENTS)]
+    for i in range(CLIENTS):
+        threading.Thread(target=client, args=(port, session_id, received[i], ready), daemon=True).start()
+    for _ in range(CLIENTS):
+        ready.acquire()
+
+    time.sleep(1.5)  # poller boshlang'ich holatni olsin
+    statements.clear()
+    time.sleep(5)
+    idle = statements.count('event-hub') / 5
+    statements.clear()
+    start = time.perf_counter()
+    writes = 0
+    while time.perf_counter() - start < SECONDS:
+        writes += 1
+        main.save_user(1000 + writes, f'user{writes}', f'User {writes}')
+        if writes % 3 == 0:
+            main.create_startup(f'Startup {writes}', 'Tavsif', '', 'https://t.me/x', 1000 + writes)
+        time.sleep(0.5)
+    time.sleep(1.5)
+    elapsed = time.perf_counter() - start
+    hub = [name for name in statements if name == 'event-hub']
+
+    users = sum(r.count('user') for r in received) / CLIENTS
+    startups = sum(r.count('startup') for r in received) / CLIENTS
+    print(f'{CLIENTS} open dashboards, {writes} new users, {writes // 3} new startups in {elapsed:.1f}s')
+    print(f'events per client: {users:.0f} user, {startups:.0f} startup, '
+          f'{sum(r.count("stats") for r in received) / CLIENTS:.0f} stats')
+    print(f'stream:  {idle:6.1f} SQL statements/s idle, {len(hub) / elapsed:.1f}/s while writing '
+          f'(one shared poller, independent of clients)')
+    print(f'polling: {per_refresh * CLIENTS / 30:6.1f} SQL statements/s '
+          f'({per_refresh} per refresh x {CLIENTS} tabs / 30s), changes seen up to 30s late')
+    print('hub:', main.dashboard_events.stats())
+    assert all(r.count('user') == writes for r in received), 'missed user events'
@@ -0,0 +1,177 @@
+# benchmarks/bench_data_scale.py
+"""Time every data helper on a seeded database and compare against a JSON baseline.
+
+Seeds a temporary database with benchmarks/seed.py (default: 1M users,
+100k startups). Each case is calibrated the way pytest-benchmark does it:
+a warm-up call, a calibration call, then enough rounds to fill
+ROUND_TIME. The output is min / median / mean per call plus the average
+number of SQL statements per call, read from the metrics histograms.
+
+With ``--save`` the results are written to benchmarks/baselines/ (one
+file per scale) for committing. Without it, the run is compared against
+that file. It exits non-zero if a case got TOLERANCE times slower (and
+at least FLOOR_MS slower), or if it now issues more SQL statements per
+call.
+
+    python benchmarks/bench_data_scale.py [users] [startups] [--save]
+"""
+import itertools
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+os.environ['DB_PATH'] = os.path.join(tempfile.mkdtemp(), 'scale.db')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import seed  # noqa: E402
+
+import main  # noqa: E402
+import metrics  # noqa: E402
+import pagination  # noqa: E402
+
+ARGS = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+SAVE = '--save' in sys.argv
+USERS = int(ARGS[0]) if ARGS else 1000000
+STARTUPS = int(ARGS[1]) if len(ARGS) > 1 else 100000
+ROUND_TIME = 0.5      # har bir holat uchun o'lchov vaqti, soniya
+MAX_ROUNDS = 20000
+MIN_ROUNDS = 5
+TOLERANCE = 1.5
+FLOOR_MS = 0.05       # mikrosekundli holatlarda shovqin regressiya hisoblanmaydi
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines',
+                        f'data_scale_{USERS}u_{STARTUPS}s.json')
+
+
+def sql_count() -> int:
+    return sum(metrics.db_seconds.count(*labels) for labels in list(metrics.db_seconds._values))
+
+
+def measure(fn):
+    fn()
+    start = time.perf_counter()
+    fn()
+    once = time.perf_counter() - start
+    rounds = max(MIN_ROUNDS, min(MAX_ROUNDS, int(ROUND_TIME / max(once, 1e-7))))
+    times = []
+    before = sql_count()
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    # O'rtacha: vaqt bo'yicha qayta tekshiruvlar (katalog versiyasi) ba'zi chaqiruvlarga tushadi
+    statements = (sql_count() - before) / rounds
+    return {
+        'min_ms': round(min(times) * 1000, 4),
+        'median_ms': round(statistics.median(times) * 1000, 4),
+        'mean_ms': round(statistics.fmean(times) * 1000, 4),
+        'rounds': rounds,
+        'sql': round(statements, 2),
+    }
+
+
+def deep_cursor(sql: str, params, depth: int) -> str:
+    """Cursor for the row ``depth`` positions into a newest-first listing (setup only, not timed)."""
+    row = main.db.fetchone(sql + ' LIMIT 1 OFFSET ?', (*params, depth))
+    return pagination.encode_cursor(row[0], row[1])
+
+
+def cases(data):
+    client = main.app.test_client()
+    owner = data['users'][0]
+    session_id = main.create_web_session(owner)
+    client.set_cookie('session_id', session_id)
+    stats = main.get_statistics()
+    active_deep = deep_cursor("SELECT created_at, startup_id FROM startups WHERE status = 'active' "
+                              "ORDER BY created_at DESC, startup_id DESC", (), stats['active_startups'] * 9 // 10)
+    pending_deep = deep_cursor("SELECT created_at, startup_id FROM startups WHERE status = 'pending' "
+                               "ORDER BY created_at DESC, startup_id DESC", (), stats['pending_startups'] * 9 // 10)
+    startups_deep = deep_cursor('SELECT created_at, startup_id FROM startups ORDER BY created_at DESC, startup_id DESC',
+                                (), stats['total_startups'] * 9 // 10)
+    users_deep = deep_cursor('SELECT joined_at, user_id FROM users ORDER BY joined_at DESC, user_id DESC',
+                             (), stats['total_users'] * 9 // 10)
+    user_ids = itertools.cycle(data['users'][::997])
+    sessions = data['sessions']
+
+    def validate_uncached():
+        main.web_sessions.cache.clear()
+        main.validate_web_session(sessions[0])
+
+    def api(path):
+        def call():
+            response = client.get(path)
+            assert response.status_code == 200, (path, response.status_code)
+        return call
+
+    return [
+        ('get_user', lambda: main.get_user(next(user_ids))),
+        ('get_active_startups first page', lambda: main.get_active_startups()),
+        ('get_active_startups 90% deep', lambda: main.get_active_startups(active_deep)),
+        ('get_pending_startups first page', lambda: main.get_pending_startups()),
+        ('get_pending_startups 90% deep', lambda: main.get_pending_startups(pending_deep)),
+        ('get_statistics', main.get_statistics),
+        ('get_recent_startups', main.get_recent_startups),
+        ('get_all_users', main.get_all_users),
+        ('validate_web_session cached', lambda: main.validate_web_session(session_id)),
+        ('validate_web_session uncached', validate_uncached),
+        ('/api/startups first page', api('/api/startups?status=all&per_page=20')),
+        ('/api/startups 90% deep', api(f'/api/startups?status=all&per_page=20&cursor={startups_deep}')),
+        ('/api/startups active', api('/api/startups?status=active&per_page=20')),
+        ('/api/users first page', api('/api/users?per_page=20')),
+        ('/api/users 90% deep', api(f'/api/users?per_page=20&cursor={users_deep}')),
+    ]
+
+
+def compare(results, baseline):
+    failures = []
+    for name, result in results.items():
+        old = baseline['results'].get(name)
+        if old is None:
+            continue
+        slower = (result['median_ms'] > old['median_ms'] * TOLERANCE
+                  and result['median_ms'] - old['median_ms'] > FLOOR_MS)
+        if slower or result['sql'] > old['sql'] + 0.5:
+            failures.append(f"{name}: {old['median_ms']} -> {result['median_ms']} ms, "
+                            f"{old['sql']} -> {result['sql']} SQL")
+    return failures
+
+
+if __name__ == '__main__':
+    started = time.perf_counter()
+    data = seed.seed(USERS, STARTUPS)
+    main.active_startups.load()
+    print(f'seeded {USERS} users, {STARTUPS} startups in {time.perf_counter() - started:.1f} s')
+
+    baseline = None
+    if os.path.exists(BASELINE):
+        with open(BASELINE) as f:
+            baseline = json.load(f)
+    results = {}
+    print(f"{'case':34} {'min ms':>9} {'median ms':>10} {'mean ms':>9} {'rounds':>7} {'sql':>5}  baseline")
+    for name, fn in cases(data):
+        result = results[name] = measure(fn)
+        old = (baseline or {}).get('results', {}).get(name)
+        note = f"{old['median_ms']} ms ({result['median_ms'] / old['median_ms']:.2f}x)" if old else '-'
+        print(f"{name:34} {result['min_ms']:9.4f} {result['median_ms']:10.4f} {result['mean_ms']:9.4f} "
+              f"{result['rounds']:7} {result['sql']:5g}  {note}")
+
+    if SAVE:
+        os.makedirs(os.path.dirname(BASELINE), exist_ok=True)
+        with open(BASELINE, 'w') as f:
+            json.dump({
+                'scale': {'users': USERS, 'startups': STARTUPS},
+                'machine': {'python': platform.python_version(), 'sqlite': sqlite3.sqlite_version,
+                            'platform': platform.platform()},
+                'results': results,
+            }, f, indent=2, ensure_ascii=False)
+            f.write('\n')
+        print(f'saved {BASELINE}')
+    elif baseline is not None:
+        failures = compare(results, baseline)
+        for failure in failures:
+            print(f'REGRESSION {failure}')
+        sys.exit(1 if failures else 0)
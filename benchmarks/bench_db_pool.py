@@ -0,0 +1,71 @@
+# benchmarks/bench_db_pool.py
+"""Per-call overhead of the data helpers: connect-per-call vs. the shared pool.
+
+    python benchmarks/bench_db_pool.py [--calls 20000]
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import db  # noqa: E402
+
+
+def seed(path, users=1000):
+    conn = sqlite3.connect(path)
+    conn.execute('CREATE TABLE users (user_id INTEGER PRIMARY KEY, username TEXT, first_name TEXT, '
+                 "last_name TEXT DEFAULT '', joined_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)")
+    conn.executemany('INSERT INTO users (user_id, username, first_name) VALUES (?, ?, ?)',
+                     [(i, f'user{i}', f'User {i}') for i in range(1, users + 1)])
+    conn.commit()
+    conn.close()
+
+
+def get_user_connect_per_call(path, user_id):
+    # Eski usul: har chaqiruvda yangi ulanish
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    cursor = conn.cursor()
+    cursor.execute('SELECT * FROM users WHERE user_id = ?', (user_id,))
+    user = cursor.fetchone()
+    conn.close()
+    return dict(user) if user else None
+
+
+def get_user_pooled(user_id):
+    return db.fetchdict('SELECT * FROM users WHERE user_id = ?', (user_id,))
+
+
+def timeit(fn, calls):
+    start = time.perf_counter()
+    for i in range(calls):
+        fn(i % 1000 + 1)
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--calls', type=int, default=20000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bench.db')
+        seed(path)
+        db.configure(path)
+
+        before = timeit(lambda uid: get_user_connect_per_call(path, uid), args.calls)
+        after = timeit(get_user_pooled, args.calls)
+        db.pool.close_all()
+
+    print(f'get_user x{args.calls}')
+    print(f'  connect per call : {before:8.1f} us/call')
+    print(f'  pooled           : {after:8.1f} us/call')
+    print(f'  speedup          : {before / after:8.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,167 @@
+# benchmarks/bench_e2e.py
+"""End-to-end bot benchmark: real main.py handlers against the local fake Bot API.
+
+Synthetic users run the main flows as closed loops. Each user sends the
+next update only after the previous one was handled, and taps only the
+buttons the fake API saw the bot send. Flows run one after another,
+each with USERS concurrent users:
+
+    start     /start from a new user
+    create    ➕ Startup yaratish -> name -> description -> logo -> group link
+    moderate  admin: 🛠 Admin panel -> pending list -> view -> approve (one admin)
+    browse    🌐 Startuplar -> ⏭️ Keyingi x5
+    join      user taps join, the owner taps approve
+
+For each flow it prints updates/s, p50/p99 handler latency (update in,
+every Bot API call for it answered) and Bot API calls per run, by
+method.
+
+    python benchmarks/bench_e2e.py [users] [latency_ms]
+"""
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+os.environ['DB_PATH'] = os.path.join(tempfile.mkdtemp(), 'e2e.db')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_bot_api import FakeBotAPI, callback_update, message_update, photo_update  # noqa: E402
+
+import telebot  # noqa: E402
+from telebot import apihelper  # noqa: E402
+
+import main  # noqa: E402
+import router  # noqa: E402
+
+USERS = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+LATENCY = (float(sys.argv[2]) if len(sys.argv) > 2 else 20) / 1000
+FIRST_USER = 1000
+
+api = FakeBotAPI(latency=LATENCY).start()
+apihelper.API_URL = api.api_url
+main.bot.threaded = False
+_ids = iter(range(1, 10 ** 9))
+_ids_lock = threading.Lock()
+
+
+class Flow:
+    def __init__(self, name):
+        self.name = name
+        self.latencies = []
+        self.runs = 0
+        self._lock = threading.Lock()
+
+    def send(self, update):
+        with _ids_lock:
+            update['update_id'] = next(_ids)
+        start = time.perf_counter()
+        main.bot.process_new_updates([telebot.types.Update.de_json(update)])
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.latencies.append(elapsed)
+
+    def tap(self, user_id, data):
+        message_id, photo = api.last_message.get(user_id, (1, False))
+        self.send(callback_update(0, user_id, data, message_id=message_id, photo=photo))
+
+
+def run(flow: Flow, script, users):
+    """Run ``script(flow, user_id)`` for every user, USERS at a time; return the summary row."""
+    calls_before = Counter(api.calls)
+    pending = list(users)
+    lock = threading.Lock()
+
+    def worker():
+        while True:
+            with lock:
+                if not pending:
+                    return
+                user_id = pending.pop()
+            script(flow, user_id)
+            with flow._lock:
+                flow.runs += 1
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(min(USERS, len(users)))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    calls = Counter(api.calls)
+    calls.subtract(calls_before)
+    latencies = sorted(flow.latencies)
+    p99 = statistics.quantiles(latencies, n=100)[98] if len(latencies) > 1 else latencies[0]
+    per_run = {method: round(count / flow.runs, 1) for method, count in sorted(calls.items()) if count}
+    return (flow.name, flow.runs, len(latencies), len(latencies) / elapsed,
+            statistics.median(latencies) * 1000, p99 * 1000, sum(calls.values()) / flow.runs, per_run)
+
+
+# ==================== SSENARIYLAR ====================
+def start_flow(flow, user_id):
+    flow.send(message_update(0, user_id, '/start'))
+
+
+def create_flow(flow, user_id):
+    flow.send(message_update(0, user_id, '➕ Startup yaratish'))
+    flow.send(message_update(0, user_id, f'Startup {user_id}'))
+    flow.send(message_update(0, user_id, f'Startup {user_id} tavsifi: mobil ilova, talabalar uchun platforma'))
+    flow.send(photo_update(0, user_id))
+    flow.send(message_update(0, user_id, f'https://t.me/startup_{user_id}'))
+
+
+def moderate_flow(flow, startup_id):
+    admin = main.ADMIN_ID
+    flow.send(message_update(0, admin, '🛠 Admin panel'))
+    flow.tap(admin, router.encode('pending', 1))
+    flow.tap(admin, router.encode('admin_view', startup_id))
+    flow.tap(admin, router.encode('admin_ok', startup_id))
+
+
+def browse_flow(flow, user_id):
+    flow.send(message_update(0, user_id, '🌐 Startuplar'))
+    for _ in range(5):
+        data = api.button(user_id, '⏭️ Keyingi')
+        if data is None:
+            break
+        flow.tap(user_id, data)
+
+
+def join_flow(flow, user_id):
+    # Har bir foydalanuvchi boshqa foydalanuvchining startupiga qo'shiladi
+    owner = FIRST_USER + (user_id - FIRST_USER + 1) % USERS
+    startup_id = main.db.fetchvalue('SELECT startup_id FROM startups WHERE owner_id = ?', (owner,))
+    flow.tap(user_id, router.encode('join', startup_id))
+    request_id = main.get_join_request_id(startup_id, user_id)
+    flow.tap(owner, router.encode('join_ok', request_id))
+
+
+if __name__ == '__main__':
+    main.init_db()
+    main.save_user(main.ADMIN_ID, 'admin', 'Admin')
+    users = list(range(FIRST_USER, FIRST_USER + USERS * 5))
+    creators = users[:USERS * 2]
+
+    rows = [run(Flow('start'), start_flow, users)]
+    rows.append(run(Flow('create'), create_flow, creators))
+    pending = [row['startup_id'] for row in main.db.fetchall("SELECT startup_id FROM startups WHERE status = 'pending'")]
+    # Admin bitta: moderatsiya ketma-ket
+    concurrency, USERS = USERS, 1
+    rows.append(run(Flow('moderate'), moderate_flow, pending))
+    USERS = concurrency
+    rows.append(run(Flow('browse'), browse_flow, users))
+    rows.append(run(Flow('join'), join_flow, users[:USERS * 2]))
+
+    print(f'{USERS} concurrent users, Bot API latency {LATENCY * 1000:.0f} ms')
+    print(f"{'flow':9} {'runs':>5} {'updates':>7} {'upd/s':>7} {'p50 ms':>7} {'p99 ms':>7} {'calls/run':>9}  by method")
+    for name, runs, updates, rate, p50, p99, calls, per_run in rows:
+        methods = ', '.join(f'{method} {count:g}' for method, count in per_run.items())
+        print(f'{name:9} {runs:5} {updates:7} {rate:7.1f} {p50:7.1f} {p99:7.1f} {calls:9.1f}  {methods}')
+    total_updates = sum(row[2] for row in rows)
+    print(f'all calls: {dict(api.calls)}; {total_updates} updates')
+    assert main.get_statistics()['active_startups'] == len(pending), main.get_statistics()
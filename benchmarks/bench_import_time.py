@@ -0,0 +1,87 @@
+# benchmarks/bench_import_time.py
+"""Import time of main.py per process role, with budgets (``python -X importtime``).
+
+Each role runs in a fresh interpreter against an already migrated
+database. The bench process holds the SQLite write lock the whole time,
+so a role that tried to write during startup (schema setup, seeding the
+admin row) would stall and blow its budget.
+
+    import   import main                      no Flask, no telebot
+    worker   import main; main.create_bot()   no Flask
+    web      import main; main.create_app()   no bot handlers, no telebot
+
+For each role it prints the wall time, the modules loaded and the
+slowest imports. It exits non-zero if a budget or a forbidden module
+check fails.
+
+    python benchmarks/bench_import_time.py [runs]
+"""
+import os
+import re
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RUNS = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+ROLES = {
+    # rol: (kod, budjet ms, yuklanmasligi kerak bo'lgan modullar)
+    'import': ('import main', 80, ('flask', 'telebot', 'bot_handlers', 'web')),
+    'worker': ('import main; main.create_bot()', 250, ('flask', 'werkzeug', 'web')),
+    'web': ('import main; main.create_app()', 250, ('telebot', 'bot_handlers')),
+}
+SCRIPT = '''
+import sys, time
+sys.stderr.write('-- start\\n')
+start = time.perf_counter()
+{code}
+elapsed = time.perf_counter() - start
+print(round(elapsed * 1000, 1), ' '.join(sorted(name for name in sys.modules if '.' not in name)))
+'''
+_IMPORTTIME = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$')
+
+
+def run(code: str, env) -> tuple:
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', SCRIPT.format(code=code)], cwd=ROOT,
+                            env=env, capture_output=True, text=True, timeout=60)
+    if result.returncode != 0:
+        sys.exit(result.stderr)
+    elapsed, modules = result.stdout.strip().splitlines()[-1].split(' ', 1)
+    # Interpretator ishga tushishi (site) hisobga olinmaydi; main va u chaqirgan modullar
+    top = {}
+    for line in result.stderr.split('-- start\n', 1)[1].splitlines():
+        match = _IMPORTTIME.match(line)
+        if match and len(match.group(3)) <= 2:
+            top[match.group(4)] = int(match.group(2)) / 1000
+    return float(elapsed), set(modules.split()), top
+
+
+if __name__ == '__main__':
+    env = dict(os.environ, DB_PATH=os.path.join(tempfile.mkdtemp(), 'import.db'))
+    subprocess.run([sys.executable, '-c', 'import main; main.init_db()'], cwd=ROOT, env=env, check=True,
+                   capture_output=True)
+
+    lock = sqlite3.connect(env['DB_PATH'], isolation_level=None)
+    lock.execute('BEGIN IMMEDIATE')
+    failures = []
+    for role, (code, budget, forbidden) in ROLES.items():
+        runs = [run(code, env) for _ in range(RUNS)]
+        elapsed = statistics.median(r[0] for r in runs)
+        modules, top = runs[-1][1], runs[-1][2]
+        loaded = [name for name in forbidden if name in modules]
+        print(f'{role:7} {elapsed:7.1f} ms (budget {budget} ms)  {len(modules)} top-level modules'
+              f"{'  LOADED: ' + ', '.join(loaded) if loaded else ''}")
+        for name, ms in sorted(top.items(), key=lambda item: -item[1])[:6]:
+            print(f'          {ms:6.1f} ms  {name}')
+        if elapsed > budget:
+            failures.append(f'{role}: {elapsed} ms > {budget} ms')
+        if loaded:
+            failures.append(f"{role}: imported {', '.join(loaded)}")
+    lock.execute('ROLLBACK')
+
+    for failure in failures:
+        print(f'FAIL {failure}')
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,71 @@
+# benchmarks/bench_metrics.py
+"""Instrumentation overhead and a sample /metrics scrape.
+
+Times a primary-key lookup through db.fetchvalue with and without the
+metrics wrapper. It then drives a few bot updates against the local fake
+Bot API (with simulated latency) and prints how the handler, Telegram
+and SQLite histograms split the time, as read from /metrics.
+
+    python benchmarks/bench_metrics.py [repeats]
+"""
+import os
+import re
+import sys
+import tempfile
+import time
+
+os.environ['DB_PATH'] = os.path.join(tempfile.mkdtemp(), 'metrics.db')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_bot_api import FakeBotAPI, message_update  # noqa: E402
+
+import telebot  # noqa: E402
+from telebot import apihelper  # noqa: E402
+
+import db  # noqa: E402
+import main  # noqa: E402
+
+REPEATS = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+
+
+def per_call(fn) -> float:
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        fn()
+    return (time.perf_counter() - start) / REPEATS * 1e6
+
+
+def totals(text: str, metric: str):
+    """{label: (count, sum)} for one histogram in the scrape."""
+    out = {}
+    for label, value in re.findall(rf'^{metric}_sum\{{\w+="([^"]+)"\}} (\S+)$', text, re.M):
+        count = re.search(rf'^{metric}_count\{{\w+="{re.escape(label)}"\}} (\S+)$', text, re.M).group(1)
+        out[label] = (int(count), float(value))
+    return out
+
+
+if __name__ == '__main__':
+    main.init_db()
+    main.save_user(1, 'user', 'Ali')
+    raw = db.fetchone.__wrapped__
+    plain = per_call(lambda: raw('SELECT * FROM users WHERE user_id = ?', (1,)))
+    wrapped = per_call(lambda: db.fetchone('SELECT * FROM users WHERE user_id = ?', (1,)))
+    print(f'db.fetchone: {plain:.2f} us plain, {wrapped:.2f} us instrumented (+{wrapped - plain:.2f} us)')
+
+    api = FakeBotAPI(latency=0.02).start()
+    apihelper.API_URL = api.api_url
+    main.bot.threaded = False
+    for i, text in enumerate(['/start', '🌐 Startuplar', '👤 Profil', '📌 Mening startuplarim'] * 5):
+        main.bot.process_new_updates([telebot.types.Update.de_json(message_update(i + 1, 1, text))])
+
+    client = main.app.test_client()
+    response = client.get('/metrics')
+    assert response.status_code == 200 and response.content_type.startswith('text/plain')
+    text = response.get_data(as_text=True)
+    for metric, title in (('garajhub_handler_seconds', 'handler'), ('garajhub_telegram_request_seconds', 'telegram'),
+                          ('garajhub_db_query_seconds', 'sqlite')):
+        rows = sorted(totals(text, metric).items(), key=lambda item: -item[1][1])[:5]
+        print(f'{title}:')
+        for label, (count, total) in rows:
+            print(f'  {label:28} {count:4} calls  {total / count * 1000:7.2f} ms avg')
+    print(f'/metrics: {len(text.splitlines())} lines, {len(text)} bytes')
@@ -0,0 +1,86 @@
+# benchmarks/bench_navigation.py
+"""Telegram API calls per navigation tap with edit-in-place pagination.
+
+Drives real updates through main.bot against the local fake Bot API. An
+owner walks the whole 🌐 Startuplar feed, pages through 📌 Mening
+startuplarim, and opens each startup card and goes back. Some startups
+have a logo, so text <-> photo switches that must fall back to
+delete+send are included. Each callback is built from the chat's last
+message as the fake API saw it.
+
+    python benchmarks/bench_navigation.py [startups]
+"""
+import os
+import sys
+import tempfile
+
+os.environ['DB_PATH'] = os.path.join(tempfile.mkdtemp(), 'navigation.db')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_bot_api import FakeBotAPI, callback_update, message_update  # noqa: E402
+
+import telebot  # noqa: E402
+from telebot import apihelper  # noqa: E402
+
+import main  # noqa: E402
+import router  # noqa: E402
+
+STARTUPS = int(sys.argv[1]) if len(sys.argv) > 1 else 12
+OWNER = 42
+
+api = FakeBotAPI(latency=0).start()
+apihelper.API_URL = api.api_url
+main.bot.threaded = False
+update_id = 0
+
+
+def send(update):
+    global update_id
+    update_id += 1
+    update['update_id'] = update_id
+    main.bot.process_new_updates([telebot.types.Update.de_json(update)])
+
+
+def tap(data):
+    message_id, photo = api.last_message[OWNER]
+    send(callback_update(0, OWNER, data, message_id=message_id, photo=photo))
+
+
+def buttons(data_prefix=''):
+    """Callback data of the last message's buttons starting with ``data_prefix``."""
+    return [button['callback_data'] for row in api.last_markup.get(OWNER, []) for button in row
+            if button.get('callback_data', '').startswith(data_prefix)]
+
+
+def button(text):
+    return api.button(OWNER, text)
+
+
+if __name__ == '__main__':
+    main.save_user(OWNER, 'owner', 'Owner')
+    for i in range(STARTUPS):
+        startup_id = main.create_startup(f'Startup {i}', 'Tavsif', 'logo-file-id' if i % 3 == 0 else '',
+                                         'https://t.me/x', OWNER)
+        main.update_startup_status(startup_id, 'active')
+
+    send(message_update(0, OWNER, '🌐 Startuplar'))
+    for direction in ('⏭️ Keyingi', '⏮️ Oldingi'):
+        while button(direction):
+            tap(button(direction))
+
+    send(message_update(0, OWNER, '📌 Mening startuplarim'))
+    pages = (STARTUPS + 4) // 5
+    for page in range(2, pages + 1):
+        tap(router.encode('my', page))
+    for page in range(1, pages + 1):
+        tap(router.encode('my', page))
+        for view in buttons(router.encode('view')):
+            tap(view)
+            tap(router.encode('my_back'))
+            tap(router.encode('my', page))
+
+    stats = main.navigation_stats()
+    print(f"{stats['taps']} navigation taps: {stats['edited']} edited in place, {stats['resent']} delete+send")
+    print(f"API calls per tap: {stats['calls_per_tap']} (delete+send every time: 2.0)")
+    print(f"saved API calls: {stats['saved_calls']}")
+    print('all calls:', dict(api.calls))
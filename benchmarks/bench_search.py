@@ -0,0 +1,80 @@
+# benchmarks/bench_search.py
+"""Startup search latency (FTS5, search.py) on a seeded catalogue.
+
+Seeds a temporary database with random names and descriptions, inserted
+through the normal triggers so the index is kept in sync. It then times
+search_startups() for rare, common, prefix and multi-word queries,
+together with the total count, as the bot and /api/startups call it.
+
+    python benchmarks/bench_search.py [startups] [repeats]
+"""
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+os.environ['DB_PATH'] = os.path.join(tempfile.mkdtemp(), 'search.db')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import db  # noqa: E402
+import migrations  # noqa: E402
+import search  # noqa: E402
+
+STARTUPS = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+REPEATS = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+WORDS = ('garaj hub startap loyiha platforma talaba maktab taom yetkazish ta\'lim sog\'liq moliya '
+         'to\'lov savdo bozor fermer qishloq xo\'jalik sport kitob kurs dastur mobil ilova sayt '
+         'robot sun\'iy intellekt ekologiya energiya quyosh suv transport taksi turizm mehmonxona '
+         'dizayn kiyim moda musiqa kino o\'yin bolalar ona shifokor dori apteka qurilish uy ijara').split()
+RARE = [f'noyob{i}' for i in range(200)]
+
+QUERIES = {
+    'rare word': 'noyob7',
+    'common word': 'loyiha',
+    'prefix': 'plat',
+    'two words': 'mobil ilova',
+    'three words': 'sun\'iy intellekt talaba',
+    'no match': 'zzzzqqq',
+}
+
+
+def seed(rng: random.Random):
+    def text(n):
+        words = rng.choices(WORDS, k=n)
+        if rng.random() < 0.01:
+            words.append(rng.choice(RARE))
+        return ' '.join(words)
+
+    with db.transaction() as conn:
+        conn.executemany('INSERT INTO users (user_id, username, first_name) VALUES (?, ?, ?)',
+                         [(i, f'user{i}', f'User {i}') for i in range(1, 1001)])
+        conn.executemany('''
+            INSERT INTO startups (name, description, logo, group_link, owner_id, status)
+            VALUES (?, ?, '', 'https://t.me/x', ?, ?)
+        ''', [(text(2).title(), text(30), rng.randint(1, 1000), rng.choice(('active', 'active', 'pending')))
+              for _ in range(STARTUPS)])
+
+
+def timed(query: str, status):
+    samples = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        rows, total = search.search_startups(query, status=status, page=1, per_page=10)
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.95) - 1], total
+
+
+if __name__ == '__main__':
+    migrations.migrate()
+    start = time.perf_counter()
+    seed(random.Random(42))
+    print(f'seeded {STARTUPS} startups (FTS kept in sync by triggers) in {time.perf_counter() - start:.1f}s')
+    print(f"{'query':14} {'status':7} {'p50 ms':>8} {'p95 ms':>8} {'matches':>8}")
+    for name, query in QUERIES.items():
+        for status in (None, 'active'):
+            p50, p95, total = timed(query, status)
+            print(f'{name:14} {status or "all":7} {p50:8.2f} {p95:8.2f} {total:8}')
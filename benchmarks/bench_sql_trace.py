@@ -0,0 +1,87 @@
+# benchmarks/bench_sql_trace.py
+"""Which SQL dominates: run a mixed workload with SQL_TRACE=1 and print the top queries.
+
+Seeds users, startups and join requests. Bot updates (start, feed,
+profile, my startups, startup details, join and approve) and admin API
+calls (/api/startups, /api/users) are then driven against the local fake
+Bot API. The script prints /api/sql's top statements by total time, one
+per-update trace, and the first slow-log entry with its query plan.
+
+    python benchmarks/bench_sql_trace.py [rounds]
+"""
+import json
+import os
+import sys
+import tempfile
+
+_tmp = tempfile.mkdtemp()
+os.environ['DB_PATH'] = os.path.join(_tmp, 'trace.db')
+os.environ['SQL_TRACE'] = '1'
+os.environ.setdefault('SQL_SLOW_MS', '0.2')
+os.environ['SQL_SLOW_LOG'] = os.path.join(_tmp, 'slow.ndjson')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_bot_api import FakeBotAPI, callback_update, message_update  # noqa: E402
+
+import telebot  # noqa: E402
+from telebot import apihelper  # noqa: E402
+
+import db  # noqa: E402
+import main  # noqa: E402
+import router  # noqa: E402
+
+ROUNDS = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+OWNER = 42
+
+
+def send(update):
+    main.bot.process_new_updates([telebot.types.Update.de_json(update)])
+
+
+if __name__ == '__main__':
+    main.init_db()
+    with db.transaction() as conn:
+        conn.executemany('INSERT INTO users (user_id, username, first_name) VALUES (?, ?, ?)',
+                         [(i, f'user{i}', f'User {i}') for i in range(1000, 21000)])
+    main.save_user(OWNER, 'owner', 'Owner')
+    startup_ids = []
+    for i in range(200):
+        startup_id = main.create_startup(f'Startup {i}', 'Tavsif ' * 30, '', 'https://t.me/x', OWNER)
+        main.update_startup_status(startup_id, 'active')
+        startup_ids.append(startup_id)
+
+    api = FakeBotAPI(latency=0).start()
+    apihelper.API_URL = api.api_url
+    main.bot.threaded = False
+    client = main.app.test_client()
+    client.set_cookie('session_id', main.create_web_session(OWNER))
+    main.sqltrace.reset()
+
+    for n in range(ROUNDS):
+        user = 1000 + n
+        for text in ('/start', '🌐 Startuplar', '👤 Profil', '📌 Mening startuplarim'):
+            send(message_update(0, user, text))
+        send(callback_update(0, OWNER, router.encode('view', startup_ids[n])))
+        send(callback_update(0, user, router.encode('join', startup_ids[n])))
+        send(callback_update(0, OWNER, router.encode('join_ok', main.get_join_request_id(startup_ids[n], user))))
+        client.get('/api/startups?status=all&per_page=20')
+        client.get('/api/users?per_page=20')
+
+    report = client.get('/api/sql?n=12').get_json()
+    print(f"{'total ms':>9} {'count':>6} {'avg ms':>7} {'rows':>6}  where / sql")
+    for entry in report['top']:
+        print(f"{entry['total_ms']:9.2f} {entry['count']:6} {entry['avg_ms']:7.3f} {entry['rows']:6}  "
+              f"{entry['where']}: {entry['sql'][:70]}")
+
+    trace = next(t for t in reversed(report['recent']) if t['name'].startswith('callback:join_ok'))
+    print(f"\ntrace {trace['name']}: {len(trace['statements'])} statements, "
+          f"{trace['sql_ms']:.2f} ms SQL of {trace['ms']:.2f} ms")
+    for statement in trace['statements']:
+        print(f"  {statement['ms']:7.3f} ms {statement['rows']:4} rows  {statement['where']}: {statement['sql'][:60]}")
+
+    with open(os.environ['SQL_SLOW_LOG']) as f:
+        lines = f.readlines()
+    entry = next(e for e in map(json.loads, lines) if e['sql'].startswith('SELECT') and e['context'])
+    print(f'\nslow log: {len(lines)} entries over {report["slow_ms"]} ms; first SELECT inside an update:')
+    print(json.dumps(entry, ensure_ascii=False, indent=1))
+    assert entry['plan'], 'missing query plan'
@@ -0,0 +1,59 @@
+# benchmarks/bench_startup_cards.py
+"""Render time per startup card: full render vs the (startup_id, version, kind) cache.
+
+Covers the three views: the feed card, the owner's detail card and the
+admin's detail card. A render builds the caption, formats dates and
+serializes the keyboard. A hit returns the stored card and only fills in
+live values.
+
+    python benchmarks/bench_startup_cards.py [repeats]
+"""
+import os
+import sys
+import tempfile
+import time
+
+os.environ['DB_PATH'] = os.path.join(tempfile.mkdtemp(), 'cards.db')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bot_handlers  # noqa: E402
+import main  # noqa: E402
+
+REPEATS = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+
+
+def per_call(fn) -> float:
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        fn()
+    return (time.perf_counter() - start) / REPEATS * 1e6
+
+
+if __name__ == '__main__':
+    main.init_db()
+    main.save_user(1, 'owner', 'Ali')
+    main.update_user_field(1, 'last_name', 'Valiyev')
+    startup_id = main.create_startup('GarajHub', 'Tavsif ' * 60, 'photo-file-id', 'https://t.me/x', 1)
+    main.update_startup_status(startup_id, 'active')
+    startup = main.get_startup(startup_id)
+    entries, next_cursor, prev_cursor, total = main.get_active_startups()
+    entry = entries[0]
+    feed_kind = ('feed', 1, total, bool(prev_cursor), bool(next_cursor))
+
+    views = {
+        'feed': (lambda: bot_handlers.render_feed_card(entry, 1, total, prev_cursor, next_cursor).text(),
+                 lambda: bot_handlers.startup_card(startup_id, entry.version, feed_kind,
+                                           lambda: bot_handlers.render_feed_card(entry, 1, total, prev_cursor,
+                                                                         next_cursor)).text()),
+        'owner': (lambda: bot_handlers.render_owner_card(startup).text(3),
+                  lambda: bot_handlers.startup_card(startup_id, startup['version'], 'owner',
+                                            lambda: bot_handlers.render_owner_card(startup)).text(3)),
+        'admin': (lambda: bot_handlers.render_admin_card(startup).text(),
+                  lambda: bot_handlers.startup_card(startup_id, startup['version'], 'admin',
+                                            lambda: bot_handlers.render_admin_card(startup)).text()),
+    }
+    for kind, (render, cached) in views.items():
+        assert render() == cached(), kind
+        miss, hit = per_call(render), per_call(cached)
+        print(f'{kind:6} render {miss:7.1f} us   cached {hit:5.1f} us  ({miss / hit:.0f}x)')
+    print('cache:', main.startup_cards.stats())
@@ -0,0 +1,55 @@
+# benchmarks/bench_startup_feed.py
+"""⏭️ taps through the 🌐 Startuplar feed: SQL keyset page vs in-memory catalogue.
+
+Seeds a temporary database with active startups and walks the feed one
+startup per page, as the bot does, on both paths. Also checks that both
+paths return the same sequence.
+
+    python benchmarks/bench_startup_feed.py [startups] [taps]
+"""
+import os
+import sys
+import tempfile
+import time
+
+os.environ['DB_PATH'] = os.path.join(tempfile.mkdtemp(), 'feed.db')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import db  # noqa: E402
+import main  # noqa: E402
+
+STARTUPS = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+TAPS = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+
+
+def seed():
+    with db.transaction() as conn:
+        conn.executemany('INSERT INTO users (user_id, username, first_name) VALUES (?, ?, ?)',
+                         [(i, f'user{i}', f'User {i}') for i in range(1, STARTUPS + 1)])
+        conn.executemany('''
+            INSERT INTO startups (name, description, logo, group_link, owner_id, status, created_at)
+            VALUES (?, ?, '', 'https://t.me/x', ?, 'active', datetime('2026-01-01', ? || ' minutes'))
+        ''', [(f'Startup {i}', 'Tavsif ' * 40, i, i) for i in range(1, STARTUPS + 1)])
+
+
+def walk(page):
+    ids, cursor = [], None
+    start = time.perf_counter()
+    for _ in range(TAPS):
+        rows, cursor, _, _ = page(cursor)
+        ids.append(rows[0]['startup_id'] if isinstance(rows[0], dict) else rows[0].startup_id)
+        if not cursor:
+            break
+    return (time.perf_counter() - start) / len(ids), ids
+
+
+if __name__ == '__main__':
+    main.init_db()
+    seed()
+    main.active_startups.load()
+    sql_time, sql_ids = walk(lambda cursor: main.get_startups_page('active', cursor, 1))
+    mem_time, mem_ids = walk(lambda cursor: main.get_active_startups(cursor))
+    assert sql_ids == mem_ids, 'paths disagree'
+    print(f'{STARTUPS} active startups, {len(sql_ids)} taps')
+    print(f'SQL keyset + stats: {sql_time * 1e6:8.1f} us/tap')
+    print(f'in-memory catalogue: {mem_time * 1e6:8.1f} us/tap  ({sql_time / mem_time:.0f}x)')
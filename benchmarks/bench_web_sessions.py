@@ -0,0 +1,68 @@
+# benchmarks/bench_web_sessions.py
+"""validate_web_session cost: SQL lookup vs the in-process session cache.
+
+Times the previous per-call SELECT against WebSessionStore.validate. It
+counts the SQL statements issued on the cached path, then seeds expired
+sessions and times the batched sweep.
+
+    python benchmarks/bench_web_sessions.py [repeats] [expired]
+"""
+import os
+import sys
+import tempfile
+import time
+
+os.environ['DB_PATH'] = os.path.join(tempfile.mkdtemp(), 'sessions.db')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import db  # noqa: E402
+import migrations  # noqa: E402
+import sessions  # noqa: E402
+
+REPEATS = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+EXPIRED = int(sys.argv[2]) if len(sys.argv) > 2 else 100000
+
+
+def per_call(fn) -> float:
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        fn()
+    return (time.perf_counter() - start) / REPEATS * 1e6
+
+
+def sql_lookup(session_id):
+    return db.fetchvalue('SELECT user_id FROM web_sessions WHERE session_id = ? AND expires_at > ?',
+                         (session_id, time.time()))
+
+
+if __name__ == '__main__':
+    migrations.migrate()
+    store = sessions.WebSessionStore()
+    store.start = lambda: None  # sweep faqat quyida, qo'lda
+    session_id = store.create(1)
+
+    statements = []
+    with db.connection() as conn:
+        conn.set_trace_callback(statements.append)
+        sql = per_call(lambda: sql_lookup(session_id))
+        sql_statements = len(statements)
+        statements.clear()
+        cached = per_call(lambda: store.validate(session_id))
+        conn.set_trace_callback(None)
+    print(f'SQL lookup   {sql:6.1f} us/call  {sql_statements / REPEATS:.2f} statements/call')
+    print(f'cached       {cached:6.1f} us/call  {len(statements) / REPEATS:.4f} statements/call  ({sql / cached:.0f}x)')
+    print('cache:', store.cache.stats())
+
+    past = time.time() - 1
+    with db.transaction() as conn:
+        conn.executemany('INSERT INTO web_sessions (session_id, user_id, expires_at) VALUES (?, 1, ?)',
+                         ((f'expired{i}', past) for i in range(EXPIRED)))
+        conn.executemany('INSERT INTO admin_tokens (token, user_id, expires_at) VALUES (?, 1, ?)',
+                         ((f'token{i}', past) for i in range(EXPIRED // 10)))
+    start = time.perf_counter()
+    removed = store.sweep()
+    elapsed = time.perf_counter() - start
+    print(f'sweep: {removed} expired rows in {elapsed * 1000:.0f} ms '
+          f'({removed // sessions.SWEEP_BATCH + 1} batches of {sessions.SWEEP_BATCH})')
+    assert store.validate(session_id) == 1
+    assert db.fetchvalue('SELECT COUNT(*) FROM web_sessions') == 1
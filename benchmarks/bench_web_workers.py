@@ -0,0 +1,141 @@
+# benchmarks/bench_web_workers.py
+"""Web panel throughput under gunicorn (gunicorn.conf.py) for 1, 2 and 4 workers.
+
+Seeds a temporary database with benchmarks/seed.py, then for each worker
+count starts ``gunicorn -c gunicorn.conf.py main:app`` on a local port.
+CLIENTS client processes keep one keep-alive connection each and loop
+over the read endpoints for DURATION seconds with a valid session
+cookie. Before each measurement, it touches a startup so every worker
+has to pick up a new catalogue and dashboard version.
+
+It prints requests/s and p50/p99 latency per worker count. It also
+prints, for every worker a client ended up on, how many times that
+worker built the catalogue and dashboard itself versus loaded them from
+``shared_snapshots`` (from /api/cache).
+Scaling stops at the number of CPUs; ``nproc`` is printed first.
+
+    python benchmarks/bench_web_workers.py [users] [startups] [duration_s] [clients]
+"""
+import http.client
+import json
+import multiprocessing
+import os
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), 'web_workers.db')
+os.environ['DB_PATH'] = DB_PATH
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import seed  # noqa: E402
+
+import db  # noqa: E402
+
+USERS = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+STARTUPS = int(sys.argv[2]) if len(sys.argv) > 2 else 10000
+DURATION = float(sys.argv[3]) if len(sys.argv) > 3 else 5
+CLIENTS = int(sys.argv[4]) if len(sys.argv) > 4 else 8
+WORKER_COUNTS = (1, 2, 4)
+PATHS = ('/api/dashboard', '/api/startups?status=active&per_page=20', '/api/stats', '/api/users?per_page=20')
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(workers: int, port: int) -> subprocess.Popen:
+    env = dict(os.environ, DB_PATH=DB_PATH, PORT=str(port), WEB_CONCURRENCY=str(workers), WEBHOOK_URL='')
+    server = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '--log-level', 'warning',
+                               'main:app'], cwd=ROOT, env=env)
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+            conn.request('GET', '/login')
+            if conn.getresponse().status == 200:
+                conn.close()
+                # Hamma ishchilar ishga tushsin
+                time.sleep(0.5 * workers)
+                return server
+        except OSError:
+            time.sleep(0.1)
+    server.kill()
+    sys.exit('gunicorn did not start')
+
+
+def client(port: int, cookie: str, deadline: float, results):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    headers = {'Cookie': f'session_id={cookie}'}
+    latencies = []
+    errors = 0
+    i = os.getpid()
+    while time.monotonic() < deadline:
+        path = PATHS[i % len(PATHS)]
+        i += 1
+        start = time.perf_counter()
+        conn.request('GET', path, headers=headers)
+        response = conn.getresponse()
+        response.read()
+        latencies.append(time.perf_counter() - start)
+        if response.status != 200:
+            errors += 1
+    conn.request('GET', '/api/cache', headers=headers)
+    response = conn.getresponse()
+    results.put((latencies, errors, response.read()))
+    conn.close()
+
+
+def measure(workers: int, cookie: str):
+    port = free_port()
+    server = start_server(workers, port)
+    try:
+        # Yangi versiya: ishchilardan bittasi quradi, qolganlari shared_snapshots dan oladi
+        db.execute("UPDATE startups SET name = name || '' WHERE startup_id = "
+                   "(SELECT MIN(startup_id) FROM startups WHERE status = 'active')")
+        results = multiprocessing.Queue()
+        deadline = time.monotonic() + DURATION
+        processes = [multiprocessing.Process(target=client, args=(port, cookie, deadline, results))
+                     for _ in range(CLIENTS)]
+        for process in processes:
+            process.start()
+        collected = [results.get() for _ in processes]
+        for process in processes:
+            process.join()
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=30)
+    latencies = sorted(latency for batch, _, _ in collected for latency in batch)
+    errors = sum(errors for _, errors, _ in collected)
+    caches = {body for _, _, body in collected}
+    return len(latencies) / DURATION, latencies, errors, caches
+
+
+if __name__ == '__main__':
+    started = time.perf_counter()
+    data = seed.seed(USERS, STARTUPS)
+    session_id = data['sessions'][0]
+    print(f'seeded {USERS} users, {STARTUPS} startups in {time.perf_counter() - started:.1f} s; '
+          f'nproc {os.cpu_count()}, {CLIENTS} clients, {DURATION:g} s per run')
+    print(f"{'workers':>7} {'req/s':>8} {'p50 ms':>7} {'p99 ms':>7} {'errors':>6}  scaling  "
+          f"builds/shared loads (catalogue + dashboard) per worker seen")
+    baseline = None
+    for workers in WORKER_COUNTS:
+        rate, latencies, errors, caches = measure(workers, session_id)
+        baseline = baseline or rate
+        p99 = statistics.quantiles(latencies, n=100)[98]
+        seen = set()
+        for body in caches:
+            cache = json.loads(body)
+            builds = cache['catalogue']['reloads'] - cache['catalogue']['shared_loads'] + cache['dashboard']['builds']
+            seen.add(f"{builds}/{cache['catalogue']['shared_loads'] + cache['dashboard']['shared_loads']}")
+        print(f'{workers:7} {rate:8.0f} {statistics.median(latencies) * 1000:7.2f} {p99 * 1000:7.2f} '
+              f"{errors:6}  {rate / baseline:.2f}x  {', '.join(sorted(seen))}")
+        assert errors == 0, f'{errors} failed requests with {workers} workers'
@@ -0,0 +1,68 @@
+# benchmarks/check_broadcast_rate.py
+"""Broadcasts from several processes together must stay within BROADCAST_RATE.
+
+Starts PROCESSES processes on one database (like gunicorn workers plus the
+bot). Each one runs its own BroadcastEngine with a store and submits a
+job of RECIPIENTS messages at the same moment. Sends are recorded, not
+delivered. The combined rate after the initial burst (bucket capacity)
+must stay within TOLERANCE of ``rate``. For comparison, the same run is
+repeated with per-process buckets (no store). It also prints how many
+write transactions the shared bucket took per message.
+
+    python benchmarks/check_broadcast_rate.py [processes] [recipients] [rate]
+"""
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+os.environ.setdefault('DB_PATH', os.path.join(tempfile.mkdtemp(), 'broadcast.db'))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import broadcast  # noqa: E402
+import migrations  # noqa: E402
+
+PROCESSES = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+RECIPIENTS = int(sys.argv[2]) if len(sys.argv) > 2 else 60
+RATE = float(sys.argv[3]) if len(sys.argv) > 3 else 25
+TOLERANCE = 1.15
+
+
+def sender(index: int, shared: bool, start_at: float, sent, transactions):
+    engine = broadcast.BroadcastEngine(lambda user_id, text: sent.put(time.time()), rate=RATE,
+                                       store=broadcast.BroadcastStore() if shared else None)
+    time.sleep(max(0.0, start_at - time.time()))
+    job = engine.submit(range(index * RECIPIENTS, (index + 1) * RECIPIENTS), 'check')
+    while not job.done:
+        time.sleep(0.05)
+    transactions.put(getattr(engine.bucket, 'transactions', 0))
+
+
+def run(shared: bool):
+    ctx = multiprocessing.get_context('spawn')
+    sent = ctx.Queue()
+    transactions = ctx.Queue()
+    start_at = time.time() + 3
+    processes = [ctx.Process(target=sender, args=(i, shared, start_at, sent, transactions)) for i in range(PROCESSES)]
+    for process in processes:
+        process.start()
+    times = sorted(sent.get(timeout=120) for _ in range(PROCESSES * RECIPIENTS))
+    writes = sum(transactions.get(timeout=30) for _ in processes)
+    for process in processes:
+        process.join(30)
+    # Boshlang'ich "portlash" (bucket sig'imi) hisobga olinmaydi
+    burst = int(RATE)
+    return (len(times) - burst) / (times[-1] - times[burst - 1]), writes / len(times)
+
+
+if __name__ == '__main__':
+    migrations.migrate()
+    local, _ = run(shared=False)
+    shared, writes = run(shared=True)
+    print(f'{PROCESSES} processes x {RECIPIENTS} messages, BROADCAST_RATE {RATE:g}/s')
+    print(f'  per-process buckets:  {local:6.1f} msg/s combined')
+    print(f'  shared SQLite bucket: {shared:6.1f} msg/s combined, {writes:.2f} write transactions per message')
+    ok = shared <= RATE * TOLERANCE
+    print('OK' if ok else f'FAIL combined rate {shared:.1f} > {RATE * TOLERANCE:.1f}')
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,128 @@
+# benchmarks/check_cluster.py
+"""Checks of the dispatcher/worker mode (cluster.py) against the local fake Bot API.
+
+- unsubscribe: USERS users pass the channel check with /start. Then the
+  channel reports that they left (``chat_member`` updates), and each of
+  them sends /start again. Every user must now get the subscription
+  prompt from whichever worker serves them. getChatMember still says
+  "member", so a stale per-worker cache would let them through.
+- thread: ``cluster.run`` started outside the main thread (as
+  ``python main.py`` does) must not fail on the SIGTERM handler.
+- entry: with main.py as ``__main__`` (``python main.py``), a spawned
+  worker must not load main.py a second time as ``__mp_main__``.
+
+Exits non-zero if any check fails.
+
+    python benchmarks/check_cluster.py [workers] [users]
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ['BOT_TOKEN'] = '1:check'
+os.environ['DB_PATH'] = os.path.join(tempfile.mkdtemp(), 'cluster.db')
+
+from fake_bot_api import FakeBotAPI, message_update  # noqa: E402
+
+import cluster  # noqa: E402
+import main  # noqa: E402
+from telebot import apihelper  # noqa: E402
+
+WORKERS = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+USERS = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+FIRST_USER = 1000
+CHANNEL = {'id': -1001234567890, 'type': 'channel', 'title': 'GarajHub', 'username': main.CHANNEL_USERNAME[1:]}
+ENTRY_CODE = '''
+import sys
+import main
+queue.put((getattr(sys.modules.get('__mp_main__'), '__file__', None), main.__file__))
+'''
+
+
+def left_update(update_id: int, user_id: int):
+    user = {'id': user_id, 'is_bot': False, 'first_name': f'User {user_id}'}
+    return {'update_id': update_id, 'chat_member': {
+        'chat': CHANNEL, 'from': user, 'date': int(time.time()),
+        'old_chat_member': {'user': user, 'status': 'member'},
+        'new_chat_member': {'user': user, 'status': 'left'},
+    }}
+
+
+def prompted(api: FakeBotAPI, user_id: int) -> bool:
+    return any(button.get('text') == '✅ Tekshirish' for row in api.last_markup.get(user_id, []) for button in row)
+
+
+def check_unsubscribe(api: FakeBotAPI) -> list:
+    ingest = cluster.Cluster(os.environ['BOT_TOKEN'], WORKERS)
+    ingest.start()
+    users = range(FIRST_USER, FIRST_USER + USERS)
+    try:
+        rounds = [[message_update(0, user, '/start') for user in users],
+                  [left_update(0, user) for user in users] + [message_update(0, user, '/start') for user in users]]
+        update_id = 0
+        for updates in rounds:
+            for update in updates:
+                update_id += 1
+                update['update_id'] = update_id
+            api.add_updates(updates)
+            while ingest.dispatched < update_id:
+                ingest.poll_once(timeout=1)
+        if not api.wait_for('sendMessage', 2 * USERS, timeout=60):
+            return [f"unsubscribe: only {api.calls['sendMessage']} of {2 * USERS} replies"]
+    finally:
+        ingest.stop()
+    workers = {ingest.ring.get(cluster.raw_chat_key(left_update(0, user))) for user in users}
+    stale = [user for user in users if not prompted(api, user)]
+    print(f'unsubscribe: {USERS} users on {len(workers)} workers, {len(stale)} still let through '
+          f"(getChatMember calls: {api.calls['getChatMember']})")
+    return [f'unsubscribe: users {stale} passed the gate after leaving the channel'] if stale else []
+
+
+def check_thread(api: FakeBotAPI) -> list:
+    errors = []
+
+    def target():
+        try:
+            cluster.run(os.environ['BOT_TOKEN'], 1)
+        except Exception as e:
+            errors.append(repr(e))
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    thread.join(2)
+    print(f"thread: cluster.run outside the main thread {'failed: ' + errors[0] if errors else 'is running'}")
+    return [f'thread: {errors[0]}'] if errors else []
+
+
+def check_entry() -> list:
+    import multiprocessing
+    ctx = multiprocessing.get_context('spawn')
+    queue = ctx.Queue()
+    # python main.py: __main__ shu modulning o'zi (main.py oxiridagi blok)
+    original = sys.modules['__main__']
+    sys.modules['__main__'] = main
+    try:
+        process = ctx.Process(target=exec, args=(ENTRY_CODE, {'queue': queue}), daemon=True)
+        with cluster._entry_main():
+            process.start()
+    finally:
+        sys.modules['__main__'] = original
+    mp_main, main_file = queue.get(timeout=60)
+    process.join(10)
+    print(f'entry: child __mp_main__ = {mp_main and os.path.basename(mp_main)}, main = {os.path.basename(main_file)}')
+    if mp_main and os.path.samefile(mp_main, main_file):
+        return ['entry: main.py loaded twice in the spawned worker']
+    return []
+
+
+if __name__ == '__main__':
+    main.init_db()
+    api = FakeBotAPI(latency=0.005).start()
+    apihelper.API_URL = api.api_url
+    failures = check_unsubscribe(api) + check_entry() + check_thread(api)
+    for failure in failures:
+        print(f'FAIL {failure}')
+    print('FAIL' if failures else 'OK')
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,116 @@
+# benchmarks/check_export.py
+"""Export check: stream 1M seeded users through /api/export under an RSS ceiling.
+
+Seeds users, startups and members, starts the web app on a local port
+and downloads /api/export/users (CSV and NDJSON) over HTTP. It samples
+the process's anonymous RSS while streaming. Exits non-zero if a row is missing or
+duplicated, if the status filter does not match /api/startups, or if RSS
+grows by more than RSS_CEILING_MB during a download.
+
+    python benchmarks/check_export.py [users]
+"""
+import csv
+import http.client
+import io
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+os.environ['DB_PATH'] = os.path.join(tempfile.mkdtemp(), 'export.db')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from werkzeug.serving import make_server  # noqa: E402
+
+import db  # noqa: E402
+import main  # noqa: E402
+
+USERS = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+STARTUPS = 3000
+RSS_CEILING_MB = 40  # SQLite sahifa keshi (PRAGMA cache_size, 16 MB) ham shu ichida
+
+
+def rss_mb() -> float:
+    # Faqat anonim xotira: mmap qilingan baza sahifalari (PRAGMA mmap_size) fayl keshi, hisobga olinmaydi
+    with open('/proc/self/status') as f:
+        return next(int(line.split()[1]) for line in f if line.startswith('RssAnon:')) / 1024
+
+
+def seed():
+    with db.transaction() as conn:
+        conn.executemany('INSERT INTO users (user_id, username, first_name, last_name, bio) VALUES (?, ?, ?, ?, ?)',
+                         ((i, f'user{i}', f'Ism, "{i}"', 'Familiya', 'Bio\nikki qator') for i in range(1, USERS + 1)))
+        conn.executemany('''
+            INSERT INTO startups (name, description, logo, group_link, owner_id, status)
+            VALUES (?, 'Tavsif', '', 'https://t.me/x', ?, ?)
+        ''', ((f'Startup {i}', i % USERS + 1, ('active', 'pending', 'completed')[i % 3]) for i in range(STARTUPS)))
+        conn.executemany('INSERT INTO startup_members (startup_id, user_id, status) VALUES (?, ?, ?)',
+                         ((i % STARTUPS + 1, i + 1, ('pending', 'accepted')[i % 2]) for i in range(20000)))
+
+
+def download(port, session_id, path):
+    conn = http.client.HTTPConnection('127.0.0.1', port)
+    conn.request('GET', path, headers={'Cookie': f'session_id={session_id}'})
+    response = conn.getresponse()
+    assert response.status == 200, (path, response.status)
+    return response
+
+
+def check_users(port, session_id, fmt):
+    response = download(port, session_id, f'/api/export/users?format={fmt}')
+    baseline = peak = rss_mb()
+    total = db.fetchvalue('SELECT COUNT(*) FROM users')
+    count, last_id, started = 0, 0, time.perf_counter()
+    reader = csv.reader(io.TextIOWrapper(response, encoding='utf-8', newline='')) if fmt == 'csv' else None
+    if reader is not None:
+        header = next(reader)
+        assert header[0] == 'user_id', header
+        rows = ((int(row[0]), row[2], row[7]) for row in reader)
+    else:
+        rows = ((item['user_id'], item['first_name'], item['bio']) for item in map(json.loads, response))
+    for user_id, first_name, bio in rows:
+        assert user_id > last_id, (fmt, user_id, last_id)
+        if user_id <= USERS:
+            assert first_name == f'Ism, "{user_id}"' and bio == 'Bio\nikki qator', (fmt, first_name, bio)
+        last_id = user_id
+        count += 1
+        if count % 20000 == 0:
+            peak = max(peak, rss_mb())
+    elapsed = time.perf_counter() - started
+    growth = peak - baseline
+    print(f'users.{fmt:6} {count} rows in {elapsed:.1f}s ({count / elapsed:,.0f} rows/s), '
+          f'RSS {baseline:.0f} MB -> peak {peak:.0f} MB (+{growth:.1f} MB)')
+    assert count == total, (fmt, count, total)
+    assert growth < RSS_CEILING_MB, f'RSS grew by {growth:.1f} MB'
+
+
+def check_filters(port, session_id):
+    client = main.app.test_client()
+    client.set_cookie('session_id', session_id)
+    for status in ('active', 'pending', 'completed'):
+        body = client.get(f'/api/export/startups?format=ndjson&status={status}').get_data(as_text=True)
+        exported = [json.loads(line) for line in body.splitlines()]
+        listed = client.get(f'/api/startups?status={status}&per_page=1').get_json()['total']
+        assert len(exported) == listed and all(s['status'] == status for s in exported), status
+    members = client.get('/api/export/members?status=accepted').get_data(as_text=True).splitlines()
+    assert len(members) - 1 == 10000, len(members)
+    assert client.get('/api/export/nope').status_code == 404
+    assert client.get('/api/export/users?format=xml').status_code == 404
+    print('status filters match /api/startups; members filter OK')
+
+
+if __name__ == '__main__':
+    main.init_db()
+    start = time.perf_counter()
+    seed()
+    print(f'seeded {USERS} users, {STARTUPS} startups, 20000 members in {time.perf_counter() - start:.1f}s')
+    session_id = main.create_web_session(1)
+    server = make_server('127.0.0.1', 0, main.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    check_filters(server.server_port, session_id)
+    for fmt in ('csv', 'ndjson'):
+        check_users(server.server_port, session_id, fmt)
+    print('OK')
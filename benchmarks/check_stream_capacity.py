@@ -0,0 +1,93 @@
+# benchmarks/check_stream_capacity.py
+"""Open dashboards must not take every gunicorn thread.
+
+Starts ``gunicorn -c gunicorn.conf.py main:app`` with one worker and a
+small WEB_THREADS. Then it opens one /api/stream more than the
+subscriber cap (WEB_THREADS - main.STREAM_RESERVED_THREADS) and keeps
+them all open. The extra stream must get 503. /login, /api/stats and
+/metrics must still answer within TIMEOUT seconds. Exits non-zero
+otherwise.
+
+    python benchmarks/check_stream_capacity.py [threads]
+"""
+import http.client
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+THREADS = int(sys.argv[1]) if len(sys.argv) > 1 else 12
+os.environ['DB_PATH'] = os.path.join(tempfile.mkdtemp(), 'streams.db')
+os.environ['WEB_THREADS'] = str(THREADS)
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import main  # noqa: E402
+
+TIMEOUT = 5
+CAP = max(1, THREADS - main.STREAM_RESERVED_THREADS)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def get(port: int, path: str, cookie: str) -> http.client.HTTPResponse:
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=TIMEOUT)
+    conn.request('GET', path, headers={'Cookie': f'session_id={cookie}'})
+    return conn.getresponse()
+
+
+if __name__ == '__main__':
+    main.init_db()
+    session_id = main.create_web_session(main.ADMIN_ID)
+
+    port = free_port()
+    env = dict(os.environ, PORT=str(port), WEB_CONCURRENCY='1', WEBHOOK_URL='')
+    server = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '--log-level', 'warning',
+                               'main:app'], cwd=ROOT, env=env, start_new_session=True)
+    failures = []
+    streams = []
+    try:
+        deadline = time.monotonic() + 60
+        while True:
+            try:
+                if get(port, '/login', session_id).status == 200:
+                    break
+            except OSError:
+                if time.monotonic() > deadline:
+                    sys.exit('gunicorn did not start')
+                time.sleep(0.1)
+
+        streams += [get(port, '/api/stream', session_id) for _ in range(CAP + 1)]
+        statuses = [response.status for response in streams]
+        print(f'{THREADS} threads, cap {CAP}: stream statuses {statuses}')
+        if statuses != [200] * CAP + [503]:
+            failures.append(f'expected {CAP} x 200 then 503, got {statuses}')
+
+        for path in ('/login', '/api/stats', '/metrics'):
+            start = time.perf_counter()
+            try:
+                status = get(port, path, session_id).status
+            except OSError as e:
+                status = repr(e)
+            elapsed = (time.perf_counter() - start) * 1000
+            print(f'  {path:11} {status} in {elapsed:.1f} ms with {CAP} streams open')
+            if status != 200:
+                failures.append(f'{path}: {status}')
+    finally:
+        for response in streams:
+            response.close()
+        # Ochiq oqimlar graceful_timeout gacha kutdiradi: master va ishchini birdan to'xtatamiz
+        os.killpg(server.pid, signal.SIGKILL)
+        server.wait()
+
+    for failure in failures:
+        print(f'FAIL {failure}')
+    print('FAIL' if failures else 'OK')
+    sys.exit(1 if failures else 0)
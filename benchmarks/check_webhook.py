@@ -0,0 +1,111 @@
+# benchmarks/check_webhook.py
+"""End-to-end check of webhook mode.
+
+Posts synthetic updates to /telegram/webhook through the Flask test
+client. Bot API calls are recorded locally instead of reaching Telegram.
+Exits non-zero if the route does not acknowledge at once, does not
+dedupe retries, or does not run the handlers.
+
+    python benchmarks/check_webhook.py
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+
+os.environ.setdefault('WEBHOOK_SECRET', 'check-secret')
+os.environ['DB_PATH'] = os.path.join(tempfile.mkdtemp(), 'webhook.db')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import telebot.apihelper  # noqa: E402
+
+import main  # noqa: E402
+import web  # noqa: E402
+
+calls = Counter()
+HANDLER_DELAY = 0.2
+
+
+def fake_request(token, method_name, method='get', params=None, files=None):
+    calls[method_name] += 1
+    time.sleep(HANDLER_DELAY)  # sekin Telegram
+    if method_name == 'getChatMember':
+        return {'status': 'member', 'user': {'id': 1, 'is_bot': False, 'first_name': 'U'}}
+    if method_name in ('sendMessage', 'sendPhoto', 'editMessageText'):
+        return {'message_id': 1, 'date': 0, 'chat': {'id': int(params.get('chat_id', 1)), 'type': 'private'}}
+    return True
+
+
+def message_update(update_id, user_id, text):
+    user = {'id': user_id, 'is_bot': False, 'first_name': f'User {user_id}'}
+    return {'update_id': update_id, 'message': {
+        'message_id': update_id, 'date': int(time.time()), 'text': text, 'from': user,
+        'chat': {'id': user_id, 'type': 'private'},
+        'entities': [{'type': 'bot_command', 'offset': 0, 'length': len(text)}] if text.startswith('/') else [],
+    }}
+
+
+def callback_update(update_id, user_id, data):
+    user = {'id': user_id, 'is_bot': False, 'first_name': f'User {user_id}'}
+    return {'update_id': update_id, 'callback_query': {
+        'id': str(update_id), 'from': user, 'chat_instance': '1', 'data': data,
+        'message': {'message_id': 1, 'date': 0, 'chat': {'id': user_id, 'type': 'private'}, 'from': user},
+    }}
+
+
+def post(client, update, secret=os.environ['WEBHOOK_SECRET']):
+    start = time.perf_counter()
+    response = client.post('/telegram/webhook', data=json.dumps(update),
+                           headers={'X-Telegram-Bot-Api-Secret-Token': secret,
+                                    'Content-Type': 'application/json'})
+    return response.status_code, time.perf_counter() - start
+
+
+def main_check():
+    telebot.apihelper._make_request = fake_request
+    client = main.app.test_client()
+    failures = []
+
+    status, _ = post(client, message_update(1, 100, '/start'), secret='wrong')
+    if status != 404:
+        failures.append(f'wrong secret answered {status}')
+
+    updates = [message_update(10 + i, 100 + i, '/start') for i in range(20)]
+    updates.append(callback_update(40, 100, '1:admin_stats'))
+    slowest = 0.0
+    for update in updates:
+        status, elapsed = post(client, update)
+        slowest = max(slowest, elapsed)
+        if status != 200:
+            failures.append(f'update {update["update_id"]} answered {status}')
+    if slowest >= HANDLER_DELAY:
+        failures.append(f'route waited for the handler ({slowest:.3f}s)')
+
+    # Telegram qayta yuborishi
+    status, _ = post(client, updates[0])
+    if status != 200:
+        failures.append(f'duplicate answered {status}')
+
+    web.updates.join()
+    stats = web.updates.stats()
+    if stats['duplicates'] != 1:
+        failures.append(f'expected 1 duplicate, got {stats}')
+    if calls['getChatMember'] != 20:
+        failures.append(f'expected 20 getChatMember calls, got {calls["getChatMember"]}')
+    if calls['answerCallbackQuery'] != 1:
+        failures.append(f'expected 1 answerCallbackQuery, got {calls["answerCallbackQuery"]}')
+    if not main.get_user(119):
+        failures.append('handler did not save the user')
+
+    print(f'slowest ack: {slowest * 1000:.1f} ms, dispatcher: {stats}, api calls: {dict(calls)}')
+    for failure in failures:
+        print(f'FAIL {failure}')
+    if failures:
+        sys.exit(1)
+    print('OK')
+
+
+if __name__ == '__main__':
+    main_check()
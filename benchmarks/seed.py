@@ -0,0 +1,111 @@
+# benchmarks/seed.py
+"""Seed a GarajHub database with realistic data at a configurable scale.
+
+Generates ``users``, ``startups``, ``startup_members`` and ``web_sessions``.
+The same arguments always produce the same rows (fixed random seed):
+
+- users join over two years. Some have a profile filled in, and a few
+  have blocked the bot (``is_active = 0``).
+- startups are owned by random users and spread over the same period.
+  About 60% are active, 15% pending, 20% completed and 5% rejected.
+- join requests are (startup, user) pairs, mostly accepted.
+- web sessions are mostly expired, as in a table the sweeper has not
+  cleaned yet.
+
+Rows are inserted with executemany in one transaction per table, so the
+counter, catalogue and search triggers fire exactly as they do in
+production.
+
+    python benchmarks/seed.py garajhub_1m.db [users] [startups]
+"""
+import os
+import random
+import sys
+import time
+from typing import Dict, List
+
+if __name__ == '__main__' and len(sys.argv) > 1:
+    os.environ['DB_PATH'] = sys.argv[1]
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import db  # noqa: E402
+import migrations  # noqa: E402
+
+EPOCH = 1704067200            # 2024-01-01 UTC
+PERIOD = 2 * 365 * 86400      # ma'lumotlar ikki yilga tarqaladi
+STATUSES = ('active',) * 12 + ('pending',) * 3 + ('completed',) * 4 + ('rejected',)
+NAMES = ('Aziz', 'Dilnoza', 'Jasur', 'Madina', 'Sardor', 'Nilufar', 'Bekzod', 'Shahnoza', 'Otabek', 'Zarina')
+WORDS = ('mobil', 'ilova', 'talabalar', 'uchun', 'platforma', 'onlayn', "ta'lim", 'yetkazib', 'berish',
+         'xizmat', "sun'iy", 'intellekt', 'bozor', 'fermerlar', 'sayohat', 'tibbiyot')
+
+
+def _timestamp(rng: random.Random) -> str:
+    return time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(EPOCH + rng.randrange(PERIOD)))
+
+
+def _text(rng: random.Random, words: int) -> str:
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+
+def seed(users: int = 1000000, startups: int = 100000, members: int = None, sessions: int = 20000,
+         first_user: int = 1, seed: int = 1) -> Dict[str, List]:
+    """Insert the rows; return ``{'users': [...], 'startups': [...], 'sessions': [...]}`` (ids, valid sessions)."""
+    migrations.migrate()
+    rng = random.Random(seed)
+    members = startups * 3 if members is None else members
+    user_ids = list(range(first_user, first_user + users))
+
+    def user_rows():
+        for user_id in user_ids:
+            profile = rng.random() < 0.3
+            yield (user_id, f'user{user_id}', rng.choice(NAMES), 'Familiya' if profile else '',
+                   '+99890' + str(user_id).zfill(7)[-7:] if profile else '', _text(rng, 12) if profile else '',
+                   _timestamp(rng), 0 if rng.random() < 0.05 else 1)
+
+    def startup_rows():
+        for i in range(startups):
+            yield (f'Startup {i} {rng.choice(WORDS)}', _text(rng, 30), 'logo-file-id', f'https://t.me/startup_{i}',
+                   rng.choice(user_ids), rng.choice(STATUSES), _timestamp(rng))
+
+    with db.transaction() as conn:
+        conn.executemany('''
+            INSERT INTO users (user_id, username, first_name, last_name, phone, bio, joined_at, is_active)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', user_rows())
+    with db.transaction() as conn:
+        start = conn.execute('SELECT COALESCE(MAX(startup_id), 0) FROM startups').fetchone()[0]
+        conn.executemany('''
+            INSERT INTO startups (name, description, logo, group_link, owner_id, status, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', startup_rows())
+    startup_ids = list(range(start + 1, start + startups + 1))
+
+    pairs = set()
+    while startup_ids and len(pairs) < min(members, startups * users):
+        pairs.add((rng.choice(startup_ids), rng.choice(user_ids)))
+    with db.transaction() as conn:
+        conn.executemany('''
+            INSERT INTO startup_members (startup_id, user_id, status, joined_at) VALUES (?, ?, ?, ?)
+        ''', ((startup_id, user_id, 'accepted' if rng.random() < 0.7 else 'pending', _timestamp(rng))
+              for startup_id, user_id in sorted(pairs)))
+
+    now = time.time()
+    session_rows = [(f'seed-{i:08d}', rng.choice(user_ids),
+                     now + 3600 if rng.random() < 0.2 else now - rng.randrange(1, 30 * 86400))
+                    for i in range(sessions)]
+    with db.transaction() as conn:
+        conn.executemany('INSERT INTO web_sessions (session_id, user_id, expires_at) VALUES (?, ?, ?)', session_rows)
+    return {'users': user_ids, 'startups': startup_ids,
+            'sessions': [session_id for session_id, _, expires_at in session_rows if expires_at > now]}
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        sys.exit(__doc__)
+    users = int(sys.argv[2]) if len(sys.argv) > 2 else 1000000
+    startups = int(sys.argv[3]) if len(sys.argv) > 3 else 100000
+    started = time.perf_counter()
+    seed(users, startups)
+    print(f'{db.DB_PATH}: {users} users, {startups} startups in {time.perf_counter() - started:.1f} s')
+    for table in ('users', 'startups', 'startup_members', 'web_sessions'):
+        print(f"  {table:16} {db.fetchvalue(f'SELECT COUNT(*) FROM {table}')}")
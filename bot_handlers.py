@@ -0,0 +1,1024 @@
+# bot_handlers.py
+"""Telegram bot handlers: commands, menus, conversations and callback routes.
+
+Importing this module registers every handler on the shared TeleBot from
+``main.telegram_client()``. Only processes that handle updates import it:
+the polling bot, cluster workers, and the web process in webhook mode
+(``main.create_bot``). The data helpers live in main.py.
+"""
+import html
+import logging
+from datetime import datetime
+from typing import Dict, Optional
+
+import telebot
+from telebot import types
+from telebot.types import InlineKeyboardMarkup, InlineKeyboardButton, ReplyKeyboardMarkup, KeyboardButton
+
+import catalogue
+import conversations
+import metrics
+import pagination
+import router
+import search
+import sqltrace
+from main import (ADMIN_ID, CHANNEL_USERNAME, SEARCH_PER_PAGE, SUBSCRIBED_STATUSES, WEB_PORT, active_startups,
+                  add_startup_member, broadcaster, count_navigation, create_startup, get_active_startups,
+                  get_all_users, get_join_request, get_join_request_id, get_member_count, get_pending_startups,
+                  get_startup, get_startups_by_owner, get_statistics, get_user, recompute_statistics, save_user,
+                  startup_cards, subscriptions, telegram_client, update_join_request, update_startup_status,
+                  update_user_field)
+
+bot = telegram_client()
+callbacks = router.CallbackRouter()
+conversation = conversations.ConversationStore()
+
+# ==================== TELEGRAM BOT ====================
+def is_subscribed(user_id: int, recheck: bool = False) -> bool:
+    # "Tekshirish" tugmasi bosilganda salbiy javobni keshdan olmaymiz
+    if recheck and subscriptions.get(user_id) is False:
+        subscriptions.invalidate(user_id)
+    return subscriptions.get_or_load(
+        user_id,
+        lambda: bot.get_chat_member(CHANNEL_USERNAME, user_id).status in SUBSCRIBED_STATUSES
+    )
+
+def has_conversation(message) -> bool:
+    if message.from_user is None:
+        return False
+    message.conversation_state = conversation.get(message.chat.id, message.from_user.id)
+    return message.conversation_state is not None
+
+# Boshqa handlerlardan oldin: dialog davom etayotgan bo'lsa, xabar keyingi bosqichga tegishli
+@bot.message_handler(func=has_conversation, content_types=telebot.util.content_type_media)
+def continue_conversation(message):
+    conversation.dispatch(message, message.conversation_state)
+
+@bot.message_handler(commands=['start', 'help'])
+def start_command(message):
+    user_id = message.from_user.id
+    username = message.from_user.username or ""
+    first_name = message.from_user.first_name or ""
+    
+    save_user(user_id, username, first_name)
+    
+    # Check subscription
+    try:
+        if is_subscribed(user_id):
+            show_main_menu(message)
+        else:
+            ask_for_subscription(message)
+    except Exception as e:
+        logging.error(f"Subscription check error: {e}")
+        ask_for_subscription(message)
+
+def ask_for_subscription(message):
+    markup = InlineKeyboardMarkup()
+    markup.row(
+        InlineKeyboardButton('🔗 Kanalga o\'tish', url=f'https://t.me/{CHANNEL_USERNAME[1:]}'),
+        InlineKeyboardButton('✅ Tekshirish', callback_data=router.encode('sub'))
+    )
+    bot.send_message(
+        message.chat.id,
+        "🤖 <b>GarajHub Bot</b>\n\n"
+        "Botdan foydalanish uchun avval kanalimizga obuna bo'ling 👇",
+        reply_markup=markup
+    )
+
+@callbacks.route('sub')
+def check_subscription_callback(call):
+    user_id = call.from_user.id
+    try:
+        if is_subscribed(user_id, recheck=True):
+            show_main_menu(call)
+            bot.answer_callback_query(call.id, "✅ Obuna tasdiqlandi!")
+        else:
+            bot.answer_callback_query(call.id, "❌ Iltimos, kanalga obuna bo'ling!", show_alert=True)
+    except Exception as e:
+        logging.error(f"Subscription check error: {e}")
+        bot.answer_callback_query(call.id, "⚠️ Xatolik yuz berdi!", show_alert=True)
+
+@bot.chat_member_handler()
+def handle_channel_member_update(update):
+    # Bot kanalda admin bo'lsa, obuna o'zgarishlari keshni darhol yangilaydi
+    if (update.chat.username or '').lower() != CHANNEL_USERNAME[1:].lower():
+        return
+    subscriptions.set(update.new_chat_member.user.id,
+                      update.new_chat_member.status in SUBSCRIBED_STATUSES)
+
+def show_main_menu(message_or_call):
+    if isinstance(message_or_call, types.CallbackQuery):
+        chat_id = message_or_call.message.chat.id
+        try:
+            bot.delete_message(chat_id, message_or_call.message.message_id)
+        except:
+            pass
+    else:
+        chat_id = message_or_call.chat.id
+    
+    markup = ReplyKeyboardMarkup(resize_keyboard=True, row_width=2)
+    buttons = [
+        KeyboardButton('🌐 Startuplar'),
+        KeyboardButton('📌 Mening startuplarim'),
+        KeyboardButton('➕ Startup yaratish'),
+        KeyboardButton('👤 Profil'),
+        KeyboardButton('🔎 Qidirish')
+    ]
+    markup.add(*buttons)
+    
+    if chat_id == ADMIN_ID:
+        markup.add(KeyboardButton('🛠 Admin panel'))
+    
+    text = "👋 <b>Assalomu alaykum!</b>\n\n🚀 <b>GarajHub</b> — startaplar uchun platforma.\n\nQuyidagilardan birini tanlang:"
+    
+    bot.send_message(chat_id, text, reply_markup=markup)
+
+# ==================== PROFIL ====================
+@bot.message_handler(func=lambda message: message.text == '👤 Profil')
+def show_profile(message):
+    user = get_user(message.from_user.id)
+    if not user:
+        save_user(message.from_user.id, message.from_user.username or "", message.from_user.first_name or "")
+        user = get_user(message.from_user.id)
+    
+    profile_text = (
+        "👤 <b>Profil ma'lumotlari:</b>\n\n"
+        f"🧑 <b>Ism:</b> {user.get('first_name', '—')}\n"
+        f"🧾 <b>Familiya:</b> {user.get('last_name', '—')}\n"
+        f"⚧️ <b>Jins:</b> {user.get('gender', '—')}\n"
+        f"📞 <b>Telefon:</b> {user.get('phone', '+998*')}\n"
+        f"🎂 <b>Tug'ilgan sana:</b> {user.get('birth_date', '—')}\n"
+        f"📝 <b>Bio:</b> {user.get('bio', '—')}"
+    )
+    
+    markup = InlineKeyboardMarkup(row_width=2)
+    markup.add(
+        InlineKeyboardButton('✏️ Ism', callback_data=router.encode('edit', 'first_name')),
+        InlineKeyboardButton('✏️ Familiya', callback_data=router.encode('edit', 'last_name')),
+        InlineKeyboardButton('📞 Telefon', callback_data=router.encode('edit', 'phone')),
+        InlineKeyboardButton('⚧️ Jins', callback_data=router.encode('edit', 'gender')),
+        InlineKeyboardButton('🎂 Tug\'ilgan sana', callback_data=router.encode('edit', 'birth_date')),
+        InlineKeyboardButton('📝 Bio', callback_data=router.encode('edit', 'bio'))
+    )
+    
+    markup.add(InlineKeyboardButton('🔙 Asosiy menyu', callback_data=router.encode('menu')))
+    
+    bot.send_message(message.chat.id, profile_text, reply_markup=markup)
+
+@callbacks.route('edit', str)
+def handle_edit_profile(call, field):
+    if field == 'first_name':
+        bot.send_message(call.message.chat.id, "📝 <b>Ismingizni kiriting:</b>")
+        conversation.set(call.message.chat.id, call.from_user.id, 'first_name', {'prev_message_id': call.message.message_id})
+    
+    elif field == 'last_name':
+        bot.send_message(call.message.chat.id, "📝 <b>Familiyangizni kiriting:</b>")
+        conversation.set(call.message.chat.id, call.from_user.id, 'last_name', {'prev_message_id': call.message.message_id})
+    
+    elif field == 'phone':
+        bot.send_message(call.message.chat.id, 
+                         "📱 <b>Telefon raqamingizni kiriting:</b>\n\n"
+                         "Masalan: <code>+998901234567</code>")
+        conversation.set(call.message.chat.id, call.from_user.id, 'phone', {'prev_message_id': call.message.message_id})
+    
+    elif field == 'gender':
+        markup = InlineKeyboardMarkup(row_width=2)
+        markup.add(
+            InlineKeyboardButton('👨 Erkak', callback_data=router.encode('gender', 'male')),
+            InlineKeyboardButton('👩 Ayol', callback_data=router.encode('gender', 'female'))
+        )
+        bot.send_message(call.message.chat.id, "⚧️ <b>Jinsingizni tanlang:</b>", reply_markup=markup)
+    
+    elif field == 'birth_date':
+        bot.send_message(call.message.chat.id, 
+                         "🎂 <b>Tug'ilgan sanangizni kiriting (kun-oy-yil)</b>\n"
+                         "Masalan: <code>30-04-2010</code>")
+        conversation.set(call.message.chat.id, call.from_user.id, 'birth_date', {'prev_message_id': call.message.message_id})
+    
+    elif field == 'bio':
+        bot.send_message(call.message.chat.id, "📝 <b>Bio kiriting:</b>")
+        conversation.set(call.message.chat.id, call.from_user.id, 'bio', {'prev_message_id': call.message.message_id})
+    
+    bot.answer_callback_query(call.id)
+
+@conversation.step('first_name')
+def process_first_name(message, data):
+    update_user_field(message.from_user.id, 'first_name', message.text)
+    bot.send_message(message.chat.id, "✅ <b>Ismingiz muvaffaqiyatli saqlandi</b>")
+    show_profile(message)
+
+@conversation.step('last_name')
+def process_last_name(message, data):
+    update_user_field(message.from_user.id, 'last_name', message.text)
+    bot.send_message(message.chat.id, "✅ <b>Familiyangiz muvaffaqiyatli saqlandi</b>")
+    show_profile(message)
+
+@conversation.step('phone')
+def process_phone(message, data):
+    update_user_field(message.from_user.id, 'phone', message.text)
+    bot.send_message(message.chat.id, "✅ <b>Telefon raqami muvaffaqiyatli saqlandi</b>")
+    show_profile(message)
+
+@callbacks.route('gender', str)
+def process_gender(call, choice):
+    gender = 'Erkak' if choice == 'male' else 'Ayol'
+    update_user_field(call.from_user.id, 'gender', gender)
+    bot.send_message(call.message.chat.id, "✅ <b>Jins muvaffaqiyatli saqlandi</b>")
+    show_profile(call.message)
+    bot.answer_callback_query(call.id)
+
+@conversation.step('birth_date')
+def process_birth_date(message, data):
+    update_user_field(message.from_user.id, 'birth_date', message.text)
+    bot.send_message(message.chat.id, "✅ <b>Tug'ilgan sana muvaffaqiyatli saqlandi</b>")
+    show_profile(message)
+
+@conversation.step('bio')
+def process_bio(message, data):
+    update_user_field(message.from_user.id, 'bio', message.text)
+    bot.send_message(message.chat.id, "✅ <b>Bio saqlandi</b>")
+    show_profile(message)
+
+# ==================== XABARNI JOYIDA YANGILASH ====================
+def edit_in_place(message, text: str, markup=None, photo: Optional[str] = None) -> bool:
+    """Replace ``message`` with new content; False if Telegram refused the edit."""
+    try:
+        if photo:
+            bot.edit_message_media(types.InputMediaPhoto(photo, caption=text, parse_mode='HTML'),
+                                   message.chat.id, message.message_id, reply_markup=markup)
+        else:
+            bot.edit_message_text(text, message.chat.id, message.message_id, reply_markup=markup)
+    except telebot.apihelper.ApiTelegramException as e:
+        if 'message is not modified' in e.description:
+            return True
+        logging.info(f"Edit in place failed, resending: {e.description}")
+        return False
+    return True
+
+def show_message(chat_id, text: str, markup=None, photo: Optional[str] = None, call=None):
+    """Send a new message, or update ``call.message`` in place when navigating."""
+    message = call.message if call is not None else None
+    if isinstance(message, types.InaccessibleMessage):
+        # 48 soatdan eski xabar: tahrirlab ham, o'chirib ham bo'lmaydi
+        count_navigation('resent', 1)
+    elif message is not None:
+        # Matnli xabarni rasmga (yoki aksincha) tahrirlab bo'lmaydi
+        editable = (message.content_type == 'photo') == bool(photo)
+        if editable and edit_in_place(message, text, markup, photo):
+            count_navigation('edited', 1)
+            return
+        try:
+            bot.delete_message(chat_id, message.message_id)
+        except telebot.apihelper.ApiTelegramException:
+            pass
+        count_navigation('resent', 3 if editable else 2)
+    if photo:
+        bot.send_photo(chat_id, photo, caption=text, reply_markup=markup)
+    else:
+        bot.send_message(chat_id, text, reply_markup=markup)
+
+# ==================== STARTUP KARTOCHKALARI ====================
+STATUS_TEXTS = {
+    'pending': '⏳ Kutilmoqda',
+    'active': '▶️ Boshlangan',
+    'completed': '✅ Yakunlangan',
+    'rejected': '❌ Rad etilgan'
+}
+
+class StartupCard:
+    """Finished caption and keyboard JSON; live values (member count) go between ``parts``."""
+    __slots__ = ('parts', 'markup', 'logo')
+
+    def __init__(self, parts, markup, logo):
+        self.parts = tuple(parts)
+        self.markup = markup.to_json()
+        self.logo = logo or None
+
+    def text(self, *values) -> str:
+        out = [self.parts[0]]
+        for value, part in zip(values, self.parts[1:]):
+            out.append(str(value))
+            out.append(part)
+        return ''.join(out)
+
+def startup_card(startup_id: int, version: int, kind, render) -> StartupCard:
+    # Kalitda qator versiyasi bor: startup o'zgarsa eski kartochka ishlatilmaydi
+    return startup_cards.get_or_load((startup_id, version, kind), render)
+
+def send_card(chat_id, card: StartupCard, *values, call=None):
+    show_message(chat_id, card.text(*values), card.markup, photo=card.logo, call=call)
+
+def owner_display_name(owner_id: int) -> str:
+    user = get_user(owner_id)
+    return f"{user.get('first_name', '')} {user.get('last_name', '')}".strip() if user else "Noma'lum"
+
+def render_feed_card(startup: catalogue.StartupEntry, page: int, total: int,
+                     prev_cursor: Optional[str], next_cursor: Optional[str]) -> StartupCard:
+    text = (
+        f"<b>🌐 Startuplar</b>\n"
+        f"📄 Sahifa: <b>{page}/{max(1, total)}</b>\n\n"
+        f"🎯 <b>{startup.name}</b>\n"
+        f"📌 {startup.description[:200]}...\n"
+        f"👤 <b>Muallif:</b> {startup.owner_name}"
+    )
+    
+    markup = InlineKeyboardMarkup()
+    markup.add(InlineKeyboardButton('🤝 Startupga qo\'shilish', 
+                                   callback_data=router.encode('join', startup.startup_id)))
+    
+    nav_buttons = []
+    if prev_cursor:
+        nav_buttons.append(InlineKeyboardButton('⏮️ Oldingi', callback_data=router.encode('feed', max(1, page-1), prev_cursor)))
+    if next_cursor:
+        nav_buttons.append(InlineKeyboardButton('⏭️ Keyingi', callback_data=router.encode('feed', page+1, next_cursor)))
+    
+    if nav_buttons:
+        markup.row(*nav_buttons)
+    
+    markup.add(InlineKeyboardButton('🔙 Asosiy menyu', callback_data=router.encode('menu')))
+    return StartupCard([text], markup, startup.logo)
+
+def render_owner_card(startup: Dict) -> StartupCard:
+    startup_id = startup['startup_id']
+    status_text = STATUS_TEXTS.get(startup['status'], startup['status'])
+    
+    start_date = startup.get('started_at', '—')
+    if start_date and start_date != '—':
+        try:
+            start_date = datetime.strptime(start_date, '%Y-%m-%d %H:%M:%S').strftime('%d-%m-%Y')
+        except:
+            pass
+    
+    # A'zolar soni keshlanmaydi, u ikki qism orasiga qo'yiladi
+    parts = [
+        f"🎯 <b>Nomi:</b> {startup['name']}\n"
+        f"📊 <b>Holati:</b> {status_text}\n"
+        f"📅 <b>Boshlanish sanasi:</b> {start_date}\n"
+        f"👤 <b>Muallif:</b> {owner_display_name(startup['owner_id'])}\n"
+        f"👥 <b>A'zolar:</b> ",
+        f" ta\n"
+        f"📌 <b>Tavsif:</b> {startup['description']}"
+    ]
+    
+    markup = InlineKeyboardMarkup()
+    
+    if startup['status'] == 'pending':
+        markup.add(InlineKeyboardButton('⏳ Admin tasdigini kutyapti', callback_data=router.encode('info')))
+    elif startup['status'] == 'active':
+        markup.add(InlineKeyboardButton('👥 A\'zolar', callback_data=router.encode('members', startup_id, 1)))
+        markup.add(InlineKeyboardButton('⏹️ Yakunlash', callback_data=router.encode('complete', startup_id)))
+    elif startup['status'] == 'completed':
+        markup.add(InlineKeyboardButton('👥 A\'zolar', callback_data=router.encode('members', startup_id, 1)))
+        if startup.get('results'):
+            markup.add(InlineKeyboardButton('📊 Natijalar', callback_data=router.encode('results', startup_id)))
+    elif startup['status'] == 'rejected':
+        markup.add(InlineKeyboardButton('❌ Rad etilgan', callback_data=router.encode('info')))
+    
+    markup.add(InlineKeyboardButton('🔙 Orqaga', callback_data=router.encode('my_back')))
+    return StartupCard(parts, markup, startup.get('logo'))
+
+def render_admin_card(startup: Dict) -> StartupCard:
+    startup_id = startup['startup_id']
+    text = (
+        f"🖼 <b>Startup ma'lumotlari</b>\n\n"
+        f"🎯 <b>Nomi:</b> {startup['name']}\n"
+        f"📌 <b>Tavsif:</b> {startup['description']}\n\n"
+        f"👤 <b>Muallif:</b> {owner_display_name(startup['owner_id'])}\n"
+        f"🔗 <b>Guruh havolasi:</b> {startup['group_link']}\n"
+        f"📅 <b>Yaratilgan sana:</b> {startup['created_at'][:10] if startup.get('created_at') else '—'}\n"
+        f"📊 <b>Holati:</b> {startup['status']}"
+    )
+    
+    markup = InlineKeyboardMarkup()
+    
+    if startup['status'] == 'pending':
+        markup.add(
+            InlineKeyboardButton('✅ Tasdiqlash', callback_data=router.encode('admin_ok', startup_id)),
+            InlineKeyboardButton('❌ Rad etish', callback_data=router.encode('admin_no', startup_id))
+        )
+    
+    markup.add(InlineKeyboardButton('🔙 Orqaga', callback_data=router.encode('pending', 1)))
+    return StartupCard([text], markup, startup.get('logo'))
+
+# ==================== STARTUPLAR ====================
+@bot.message_handler(func=lambda message: message.text == '🌐 Startuplar')
+def show_startups(message):
+    show_startup_page(message.chat.id, 1)
+
+def show_startup_page(chat_id, page, cursor=None, call=None):
+    startups, next_cursor, prev_cursor, total = get_active_startups(cursor)
+    
+    if not startups and cursor:
+        # Startup o'chirilgan yoki holati o'zgargan bo'lsa, boshidan ko'rsatamiz
+        startups, next_cursor, prev_cursor, total = get_active_startups()
+    
+    if not startups:
+        bot.send_message(chat_id, "📭 <b>Hozircha startup mavjud emas.</b>")
+        return
+    
+    startup = startups[0]
+    page = active_startups.position(startup.startup_id) or 1
+    card = startup_card(startup.startup_id, startup.version, ('feed', page, total, bool(prev_cursor), bool(next_cursor)),
+                        lambda: render_feed_card(startup, page, total, prev_cursor, next_cursor))
+    
+    try:
+        send_card(chat_id, card, call=call)
+    except Exception as e:
+        logging.error(f"Error sending message: {e}")
+        bot.send_message(chat_id, card.text(), reply_markup=card.markup)
+
+@callbacks.route('feed', int, str)
+def handle_startup_page(call, page, cursor=None):
+    show_startup_page(call.message.chat.id, page, cursor, call=call)
+    bot.answer_callback_query(call.id)
+
+@callbacks.route('join', int)
+def handle_join_startup(call, startup_id):
+    user_id = call.from_user.id
+    
+    # Check if already requested
+    request_id = get_join_request_id(startup_id, user_id)
+    
+    if request_id:
+        bot.answer_callback_query(call.id, "📩 Sizning so'rovingiz hali ko'rib chiqilmoqda!", show_alert=True)
+        return
+    
+    # Add join request
+    add_startup_member(startup_id, user_id)
+    request_id = get_join_request_id(startup_id, user_id)
+    
+    # Send notification to startup owner
+    startup = get_startup(startup_id)
+    user = get_user(user_id)
+    
+    if startup and user:
+        text = (
+            f"🆕 <b>Startupga qo'shilish so'rovi</b>\n\n"
+            f"👤 <b>Foydalanuvchi:</b> {user.get('first_name', '')} {user.get('last_name', '')}\n"
+            f"📱 <b>Telefon:</b> {user.get('phone', '—')}\n"
+            f"📝 <b>Bio:</b> {user.get('bio', '—')}\n"
+            f"🎯 <b>Startup:</b> {startup['name']}\n\n"
+            f"🆔 <b>So'rov ID:</b> {request_id}"
+        )
+        
+        markup = InlineKeyboardMarkup()
+        markup.add(
+            InlineKeyboardButton('✅ Tasdiqlash', callback_data=router.encode('join_ok', request_id)),
+            InlineKeyboardButton('❌ Rad etish', callback_data=router.encode('join_no', request_id))
+        )
+        
+        try:
+            bot.send_message(startup['owner_id'], text, reply_markup=markup)
+        except:
+            pass
+    
+    bot.answer_callback_query(call.id, "✅ So'rov yuborildi. Startup egasi tasdiqlasa, sizga havola yuboriladi.")
+
+@callbacks.route('join_ok', int)
+def approve_join_request(call, request_id):
+    
+    # Get request details
+    join_request = get_join_request(request_id)
+    
+    if not join_request:
+        bot.answer_callback_query(call.id, "❌ So'rov topilmadi!", show_alert=True)
+        return
+    
+    startup_id, user_id = join_request['startup_id'], join_request['user_id']
+    update_join_request(request_id, 'accepted')
+    
+    # Send group link to user
+    startup = get_startup(startup_id)
+    if startup:
+        try:
+            bot.send_message(
+                user_id,
+                f"🎉 <b>Tabriklaymiz!</b>\n\n"
+                f"✅ Sizning so'rovingiz qabul qilindi.\n\n"
+                f"🎯 <b>Startup:</b> {startup['name']}\n"
+                f"🔗 <b>Guruhga qo'shilish:</b> {startup['group_link']}"
+            )
+        except:
+            pass
+    
+    try:
+        bot.edit_message_text(
+            "✅ <b>So'rov tasdiqlandi va foydalanuvchiga havola yuborildi.</b>",
+            call.message.chat.id,
+            call.message.message_id
+        )
+    except:
+        bot.send_message(call.message.chat.id, "✅ <b>So'rov tasdiqlandi.</b>")
+    
+    bot.answer_callback_query(call.id)
+
+@callbacks.route('join_no', int)
+def reject_join_request(call, request_id):
+    
+    # Get user_id for notification
+    join_request = get_join_request(request_id)
+    
+    if not join_request:
+        bot.answer_callback_query(call.id, "❌ So'rov topilmadi!", show_alert=True)
+        return
+    
+    user_id = join_request['user_id']
+    update_join_request(request_id, 'rejected')
+    
+    # Notify user
+    try:
+        bot.send_message(user_id, "❌ <b>So'rovingiz rad etildi.</b>")
+    except:
+        pass
+    
+    try:
+        bot.edit_message_text(
+            "❌ <b>So'rov rad etildi.</b>",
+            call.message.chat.id,
+            call.message.message_id
+        )
+    except:
+        bot.send_message(call.message.chat.id, "❌ <b>So'rov rad etildi.</b>")
+    
+    bot.answer_callback_query(call.id)
+
+# ==================== QIDIRUV ====================
+@bot.message_handler(commands=['search'])
+@bot.message_handler(func=lambda message: message.text == '🔎 Qidirish')
+def search_command(message):
+    query = telebot.util.extract_arguments(message.text) if message.text.startswith('/') else ''
+    if search.normalize(query):
+        show_search_results(message.chat.id, query, 1)
+        return
+    bot.send_message(message.chat.id, "🔎 <b>Startup nomi yoki tavsifidan so'z kiriting:</b>")
+    conversation.set(message.chat.id, message.from_user.id, 'search', {})
+
+@conversation.step('search')
+def process_search(message, data):
+    show_search_results(message.chat.id, message.text or '', 1)
+
+def search_callback(page: int, query: str) -> str:
+    try:
+        return router.encode('find', page, query)
+    except router.CallbackDataError:
+        # 64 baytga sig'masa, so'rov bazada qoladi: tugmada sahifa va qisqa kalit
+        return router.encode('findk', page, search.query_key(query))
+
+def show_search_results(chat_id, text: str, page: int, call=None):
+    query = search.normalize(text)
+    if not query:
+        show_message(chat_id, "🔎 <b>Qidiruv uchun kamida 2 harfli so'z kiriting.</b>", call=call)
+        return
+    
+    startups, total = search.search_startups(query, status='active', page=page, per_page=SEARCH_PER_PAGE)
+    if not startups:
+        markup = InlineKeyboardMarkup()
+        markup.add(InlineKeyboardButton('🔙 Asosiy menyu', callback_data=router.encode('menu')))
+        show_message(chat_id, f"🔎 <b>{html.escape(query)}</b> bo'yicha hech narsa topilmadi.", markup, call=call)
+        return
+    
+    total_pages = (total + SEARCH_PER_PAGE - 1) // SEARCH_PER_PAGE
+    start_idx = (page - 1) * SEARCH_PER_PAGE
+    text = f"🔎 <b>Qidiruv:</b> {html.escape(query)}\n📄 Sahifa: <b>{page}/{total_pages}</b> · {total} ta natija\n\n"
+    markup = InlineKeyboardMarkup()
+    for i, startup in enumerate(startups, start=start_idx + 1):
+        text += f"{i}. <b>{html.escape(startup['name'])}</b>\n{startup['snippet']}\n\n"
+        markup.add(InlineKeyboardButton(f'{i}. {startup["name"][:30]}',
+                                        callback_data=router.encode('found', startup['startup_id'])))
+    
+    nav_buttons = []
+    if page > 1:
+        nav_buttons.append(InlineKeyboardButton('⏮️ Oldingi', callback_data=search_callback(page - 1, query)))
+    if page < total_pages:
+        nav_buttons.append(InlineKeyboardButton('⏭️ Keyingi', callback_data=search_callback(page + 1, query)))
+    if nav_buttons:
+        markup.row(*nav_buttons)
+    
+    markup.add(InlineKeyboardButton('🔙 Asosiy menyu', callback_data=router.encode('menu')))
+    show_message(chat_id, text, markup, call=call)
+
+@callbacks.route('find', int, str)
+def handle_search_page(call, page, query=None):
+    show_search_results(call.message.chat.id, query or '', page, call=call)
+    bot.answer_callback_query(call.id)
+
+@callbacks.route('findk', int, str)
+def handle_search_page_by_key(call, page, key):
+    query = search.lookup_query(key)
+    if query is None:
+        bot.answer_callback_query(call.id, "❌ Qidiruv topilmadi, qaytadan qidiring.", show_alert=True)
+        return
+    show_search_results(call.message.chat.id, query, page, call=call)
+    bot.answer_callback_query(call.id)
+
+@callbacks.route('found', int)
+def show_found_startup(call, startup_id):
+    if active_startups.get(startup_id) is None:
+        bot.answer_callback_query(call.id, "❌ Startup topilmadi!", show_alert=True)
+        return
+    # Lentani shu startupdan ochamiz: qo'shnisining cursori aynan unga olib keladi
+    newer, older = active_startups.neighbours(startup_id)
+    if older:
+        cursor = pagination.encode_cursor(older.created_at, older.startup_id, before=True)
+    elif newer:
+        cursor = pagination.encode_cursor(newer.created_at, newer.startup_id)
+    else:
+        cursor = None
+    show_startup_page(call.message.chat.id, 0, cursor, call=call)
+    bot.answer_callback_query(call.id)
+
+# ==================== MENING STARTUPLARIM ====================
+@bot.message_handler(func=lambda message: message.text == '📌 Mening startuplarim')
+def show_my_startups(message):
+    show_my_startups_page(message.chat.id, message.from_user.id, 1)
+
+def show_my_startups_page(chat_id, user_id, page, call=None):
+    startups = get_startups_by_owner(user_id)
+    
+    if not startups:
+        bot.send_message(chat_id, "📭 <b>Sizda hali startup mavjud emas.</b>")
+        return
+    
+    per_page = 5
+    total = len(startups)
+    total_pages = (total + per_page - 1) // per_page
+    page = min(max(1, page), total_pages)
+    
+    start_idx = (page - 1) * per_page
+    end_idx = min(start_idx + per_page, total)
+    page_startups = startups[start_idx:end_idx]
+    
+    text = f"<b>📌 Mening startuplarim</b>\n📄 Sahifa: <b>{page}/{total_pages}</b>\n\n"
+    for i, startup in enumerate(page_startups, start=start_idx + 1):
+        status_emoji = {
+            'pending': '⏳',
+            'active': '▶️',
+            'completed': '✅',
+            'rejected': '❌'
+        }.get(startup['status'], '❓')
+        text += f"{i}. {startup['name']} {status_emoji}\n"
+    
+    markup = InlineKeyboardMarkup(row_width=5)
+    
+    # Page numbers
+    buttons = []
+    for i in range(1, min(6, total_pages + 1)):
+        buttons.append(InlineKeyboardButton(str(i), callback_data=router.encode('my', i)))
+    if buttons:
+        markup.row(*buttons)
+    
+    # Navigation
+    if page > 1:
+        markup.add(InlineKeyboardButton('⏮️ Oldingi', callback_data=router.encode('my', page-1)))
+    if page < total_pages:
+        markup.add(InlineKeyboardButton('⏭️ Keyingi', callback_data=router.encode('my', page+1)))
+    
+    # Startup selection
+    if page_startups:
+        for i, startup in enumerate(page_startups):
+            markup.add(InlineKeyboardButton(f'{start_idx + i + 1}. {startup["name"][:15]}...', 
+                                           callback_data=router.encode('view', startup["startup_id"])))
+    
+    markup.add(InlineKeyboardButton('🔙 Asosiy menyu', callback_data=router.encode('menu')))
+    
+    show_message(chat_id, text, markup, call=call)
+
+@callbacks.route('my', int)
+def handle_my_startup_page(call, page):
+    show_my_startups_page(call.message.chat.id, call.from_user.id, page, call=call)
+    bot.answer_callback_query(call.id)
+
+@callbacks.route('view', int)
+def view_startup_details(call, startup_id):
+    startup = get_startup(startup_id)
+    
+    if not startup:
+        bot.answer_callback_query(call.id, "❌ Startup topilmadi!", show_alert=True)
+        return
+    
+    card = startup_card(startup_id, startup['version'], 'owner', lambda: render_owner_card(startup))
+    send_card(call.message.chat.id, card, get_member_count(startup_id), call=call)
+    bot.answer_callback_query(call.id)
+
+@callbacks.route('my_back')
+def back_to_my_startups(call):
+    show_my_startups_page(call.message.chat.id, call.from_user.id, 1, call=call)
+    bot.answer_callback_query(call.id)
+
+# ==================== STARTUP YARATISH ====================
+@bot.message_handler(func=lambda message: message.text == '➕ Startup yaratish')
+def start_creation(message):
+    bot.send_message(message.chat.id, "🚀 <b>Yangi startup yaratamiz!</b>\n\n📝 <b>Startup nomini kiriting:</b>")
+    conversation.set(message.chat.id, message.from_user.id, 'startup_name', {'owner_id': message.from_user.id})
+
+@conversation.step('startup_name')
+def process_startup_name(message, data):
+    data['name'] = message.text
+    bot.send_message(message.chat.id, "📝 <b>Startup tavsifini kiriting:</b>")
+    conversation.set(message.chat.id, message.from_user.id, 'startup_description', data)
+
+@conversation.step('startup_description')
+def process_startup_description(message, data):
+    data['description'] = message.text
+    bot.send_message(message.chat.id, "🖼 <b>Logo (rasm) yuboring:</b>")
+    conversation.set(message.chat.id, message.from_user.id, 'startup_logo', data)
+
+@conversation.step('startup_logo')
+def process_startup_logo(message, data):
+    if message.photo:
+        data['logo'] = message.photo[-1].file_id
+        bot.send_message(message.chat.id, 
+                         "🔗 <b>Guruh yoki kanal havolasini kiriting (majburiy):</b>\n\n"
+                         "Masalan: <code>https://t.me/group_name</code>")
+        conversation.set(message.chat.id, message.from_user.id, 'startup_group_link', data)
+    else:
+        bot.send_message(message.chat.id, "⚠️ <b>Iltimos, rasm yuboring!</b>")
+        conversation.set(message.chat.id, message.from_user.id, 'startup_logo', data)
+
+@conversation.step('startup_group_link')
+def process_startup_group_link(message, data):
+    data['group_link'] = message.text
+    startup_id = create_startup(
+        data['name'],
+        data['description'],
+        data['logo'],
+        data['group_link'],
+        data['owner_id']
+    )
+    
+    # Send to admin for approval
+    startup = get_startup(startup_id)
+    user = get_user(data['owner_id'])
+    owner_name = f"{user.get('first_name', '')} {user.get('last_name', '')}".strip() if user else "Noma'lum"
+    
+    text = (
+        f"🆕 <b>Yangi startup yaratildi!</b>\n\n"
+        f"🎯 <b>Nomi:</b> {startup['name']}\n"
+        f"📌 <b>Tavsif:</b> {startup['description'][:200]}...\n"
+        f"👤 <b>Muallif:</b> {owner_name}\n"
+        f"👤 <b>Muallif ID:</b> {data['owner_id']}"
+    )
+    
+    markup = InlineKeyboardMarkup()
+    markup.add(
+        InlineKeyboardButton('✅ Tasdiqlash', callback_data=router.encode('admin_ok', startup_id)),
+        InlineKeyboardButton('❌ Rad etish', callback_data=router.encode('admin_no', startup_id))
+    )
+    
+    try:
+        if startup.get('logo'):
+            bot.send_photo(ADMIN_ID, startup['logo'], caption=text, reply_markup=markup)
+        else:
+            bot.send_message(ADMIN_ID, text, reply_markup=markup)
+    except Exception as e:
+        logging.error(f"Admin notification error: {e}")
+    
+    bot.send_message(message.chat.id, 
+                    "✅ <b>Startup yaratildi va tekshiruvga yuborildi!</b>\n\n"
+                    "⏳ <i>Administrator tekshirgandan so'ng kanalga joylanadi.</i>")
+    show_main_menu(message)
+
+# ==================== ADMIN PANEL (TELEGRAM) ====================
+@bot.message_handler(func=lambda message: message.text == '🛠 Admin panel' and message.chat.id == ADMIN_ID)
+def admin_panel(message):
+    stats = get_statistics()
+    
+    text = (
+        f"👨‍💼 <b>Admin Panel</b>\n\n"
+        f"📊 <b>Statistikalar:</b>\n"
+        f"├ 👥 Foydalanuvchilar: <b>{stats['total_users']}</b>\n"
+        f"├ 🚀 Startuplar: <b>{stats['total_startups']}</b>\n"
+        f"├ ⏳ Kutilayotgan: <b>{stats['pending_startups']}</b>\n"
+        f"├ ▶️ Faol: <b>{stats['active_startups']}</b>\n"
+        f"├ ✅ Yakunlangan: <b>{stats['completed_startups']}</b>\n"
+        f"└ 📨 So'rovlar: <b>{stats['pending_requests']}</b>\n\n"
+        f"🌐 <b>Web Admin:</b> /admin_link"
+    )
+    
+    markup = InlineKeyboardMarkup()
+    markup.add(
+        InlineKeyboardButton('⏳ Kutilayotgan startuplar', callback_data=router.encode('pending', 1)),
+        InlineKeyboardButton('📊 Statistika', callback_data=router.encode('admin_stats')),
+        InlineKeyboardButton('📢 Xabar yuborish', callback_data=router.encode('admin_broadcast'))
+    )
+    
+    bot.send_message(message.chat.id, text, reply_markup=markup)
+
+@callbacks.route('pending', int, str)
+def show_pending_startups_admin(call, page=1, cursor=None):
+    startups, next_cursor, prev_cursor, total = get_pending_startups(cursor)
+    if not startups and cursor:
+        page = 1
+        startups, next_cursor, prev_cursor, total = get_pending_startups()
+    
+    if not startups:
+        text = "⏳ <b>Kutilayotgan startuplar yo'q.</b>"
+        markup = InlineKeyboardMarkup()
+    else:
+        total_pages = max(1, (total + 9) // 10)
+        text = f"⏳ <b>Kutilayotgan startuplar</b>\n📄 Sahifa: <b>{page}/{total_pages}</b>\n\n"
+        
+        for i, startup in enumerate(startups, start=(page-1)*10+1):
+            text += f"{i}. <b>{startup['name']}</b>\n   👤 {startup['first_name']} {startup['last_name']}\n\n"
+        
+        markup = InlineKeyboardMarkup()
+        
+        # Page navigation
+        nav_buttons = []
+        if prev_cursor:
+            nav_buttons.append(InlineKeyboardButton('⏮️', callback_data=router.encode('pending', max(1, page-1), prev_cursor)))
+        
+        nav_buttons.append(InlineKeyboardButton(f'{page}/{total_pages}', callback_data=router.encode('noop')))
+        
+        if next_cursor:
+            nav_buttons.append(InlineKeyboardButton('⏭️', callback_data=router.encode('pending', page+1, next_cursor)))
+        
+        if nav_buttons:
+            markup.row(*nav_buttons)
+        
+        # Startup selection
+        for i, startup in enumerate(startups):
+            markup.add(InlineKeyboardButton(f'{i+1}. {startup["name"][:20]}...', 
+                                           callback_data=router.encode('admin_view', startup["startup_id"])))
+    
+    markup.add(InlineKeyboardButton('🔙 Admin panel', callback_data=router.encode('admin_back')))
+    
+    try:
+        bot.edit_message_text(text, call.message.chat.id, call.message.message_id, reply_markup=markup)
+    except:
+        bot.send_message(call.message.chat.id, text, reply_markup=markup)
+    
+    bot.answer_callback_query(call.id)
+
+@callbacks.route('admin_view', int)
+def admin_view_startup_details(call, startup_id):
+    startup = get_startup(startup_id)
+    
+    if not startup:
+        bot.answer_callback_query(call.id, "❌ Startup topilmadi!", show_alert=True)
+        return
+    
+    card = startup_card(startup_id, startup['version'], 'admin', lambda: render_admin_card(startup))
+    send_card(call.message.chat.id, card, call=call)
+    bot.answer_callback_query(call.id)
+
+@callbacks.route('admin_ok', int)
+def admin_approve_startup(call, startup_id):
+    update_startup_status(startup_id, 'active')
+    
+    # Notify owner
+    startup = get_startup(startup_id)
+    if startup:
+        try:
+            bot.send_message(
+                startup['owner_id'],
+                f"🎉 <b>Tabriklaymiz!</b>\n\n"
+                f"✅ Sizning '<b>{startup['name']}</b>' startupingiz tasdiqlandi va kanalga joylandi!"
+            )
+        except:
+            pass
+    
+    # Post to channel
+    try:
+        user = get_user(startup['owner_id'])
+        owner_name = f"{user.get('first_name', '')} {user.get('last_name', '')}".strip() if user else "Noma'lum"
+        
+        channel_text = (
+            f"🎯 <b>Nomi:</b> {startup['name']}\n"
+            f"📝 <b>Tavsif:</b> {startup['description']}\n\n"
+            f"👤 <b>Muallif:</b> {owner_name}\n\n"
+            f"👉 <b>Startupga qo'shilish uchun @GarajHub_bot orqali ro'yxatdan o'ting</b>\n"
+            f"👉 <b>O'z startupingizni @GarajHub_bot orqali yarating</b>"
+        )
+        
+        markup = InlineKeyboardMarkup()
+        markup.add(InlineKeyboardButton('🤝 Startupga qo\'shilish', 
+                                       url=f'https://t.me/{bot.get_me().username}?start=join_{startup_id}'))
+        
+        if startup.get('logo'):
+            bot.send_photo(CHANNEL_USERNAME, startup['logo'], caption=channel_text, reply_markup=markup)
+        else:
+            bot.send_message(CHANNEL_USERNAME, channel_text, reply_markup=markup)
+    except Exception as e:
+        logging.error(f"Channel post error: {e}")
+    
+    bot.answer_callback_query(call.id, "✅ Startup tasdiqlandi!")
+    show_pending_startups_admin(call)
+
+@callbacks.route('admin_no', int)
+def admin_reject_startup(call, startup_id):
+    update_startup_status(startup_id, 'rejected')
+    
+    # Notify owner
+    startup = get_startup(startup_id)
+    if startup:
+        try:
+            bot.send_message(
+                startup['owner_id'],
+                f"❌ <b>Xabar!</b>\n\n"
+                f"Sizning '<b>{startup['name']}</b>' startupingiz rad etildi."
+            )
+        except:
+            pass
+    
+    bot.answer_callback_query(call.id, "❌ Startup rad etildi!")
+    show_pending_startups_admin(call)
+
+# ==================== BOSHQA HANDLERLAR ====================
+@bot.message_handler(commands=['admin_link'])
+def send_admin_link(message):
+    if message.chat.id == ADMIN_ID:
+        bot.send_message(
+            message.chat.id,
+            f"🌐 <b>Web Admin Panel:</b>\n\n"
+            f"🔗 <code>http://localhost:{WEB_PORT}/admin</code>\n\n"
+            f"🆔 <b>Admin ID:</b> <code>{ADMIN_ID}</code>"
+        )
+    else:
+        bot.send_message(message.chat.id, "❌ Ruxsat yo'q!")
+
+@bot.message_handler(commands=['recompute'])
+def recompute_command(message):
+    if message.chat.id != ADMIN_ID:
+        bot.send_message(message.chat.id, "❌ Ruxsat yo'q!")
+        return
+    
+    drift = recompute_statistics()
+    if not drift:
+        bot.send_message(message.chat.id, "✅ <b>Statistika to'g'ri, farq topilmadi.</b>")
+        return
+    
+    text = "🔧 <b>Statistika qayta hisoblandi.</b>\n\n"
+    for field, (stored, actual) in drift.items():
+        text += f"├ {field}: <b>{stored}</b> → <b>{actual}</b>\n"
+    bot.send_message(message.chat.id, text)
+
+@callbacks.route('menu')
+def handle_main_menu(call):
+    show_main_menu(call)
+
+@callbacks.route('admin_back')
+def handle_admin_back(call):
+    admin_panel(call.message)
+
+@callbacks.route('info')
+def handle_info(call):
+    bot.answer_callback_query(call.id, "Ma'lumot ko'rsatilmoqda...")
+
+@callbacks.route('admin_stats')
+def handle_admin_stats(call):
+    stats = get_statistics()
+    text = (
+        f"📊 <b>Statistikalar:</b>\n\n"
+        f"👥 Foydalanuvchilar: <b>{stats['total_users']}</b>\n"
+        f"🚀 Startuplar: <b>{stats['total_startups']}</b>\n"
+        f"⏳ Kutilayotgan: <b>{stats['pending_startups']}</b>\n"
+        f"▶️ Faol: <b>{stats['active_startups']}</b>\n"
+        f"✅ Yakunlangan: <b>{stats['completed_startups']}</b>\n"
+        f"📨 So'rovlar: <b>{stats['pending_requests']}</b>"
+    )
+    bot.answer_callback_query(call.id, text, show_alert=True)
+
+@callbacks.route('admin_broadcast')
+def handle_admin_broadcast(call):
+    bot.send_message(call.message.chat.id, "📢 <b>Xabaringizni yozing:</b>")
+    conversation.set(call.message.chat.id, call.from_user.id, 'admin_broadcast')
+
+@conversation.step('admin_broadcast')
+def process_admin_broadcast(message, data):
+    text = message.text
+    chat_id = message.chat.id
+    
+    def report(job):
+        bot.send_message(
+            chat_id,
+            f"✅ <b>Xabar yuborish yakunlandi!</b>\n\n"
+            f"✅ Yuborildi: {job.sent} ta\n"
+            f"❌ Yuborilmadi: {job.failed} ta"
+        )
+    
+    job = broadcaster.submit(get_all_users(), f"📢 <b>Yangilik!</b>\n\n{text}", on_done=report)
+    bot.send_message(chat_id, f"📤 <b>Xabar yuborilmoqda...</b>\n\n👥 Qabul qiluvchilar: {job.total} ta")
+
+# ==================== CALLBACK ROUTER ====================
+# Eski formatdagi tugmalar (avval yuborilgan xabarlarda qolgan)
+for _old, _action in [('check_subscription', 'sub'), ('main_menu', 'menu'), ('admin_back', 'admin_back'),
+                      ('waiting_approval', 'info'), ('rejected_info', 'info'), ('admin_stats', 'admin_stats'),
+                      ('admin_broadcast', 'admin_broadcast'), ('back_to_my_startups', 'my_back')]:
+    callbacks.legacy(_old, _action)
+for _old, _action in [('edit_', 'edit'), ('gender_', 'gender'), ('startup_page_', 'feed'),
+                      ('join_startup_', 'join'), ('approve_join_', 'join_ok'), ('reject_join_', 'join_no'),
+                      ('my_startup_page_', 'my'), ('view_startup_', 'view'), ('pending_startups_', 'pending'),
+                      ('admin_view_startup_', 'admin_view'), ('admin_approve_', 'admin_ok'),
+                      ('admin_reject_', 'admin_no')]:
+    callbacks.legacy(_old, _action, prefix=True)
+
+@bot.callback_query_handler(func=lambda call: True)
+def handle_callback(call):
+    if not callbacks.dispatch(call):
+        bot.answer_callback_query(call.id)
+
+# Barcha handlerlar ro'yxatdan o'tgandan keyin: har biri o'z nomi bilan o'lchanadi
+metrics.instrument_bot(bot, routes=callbacks.routes, steps=conversation.steps)
+if sqltrace.ENABLED:
+    sqltrace.instrument_bot(bot, routes=callbacks.routes, steps=conversation.steps)
@@ -0,0 +1,425 @@
+# broadcast.py
+"""Background broadcast engine that stays inside Telegram's rate limits.
+
+Messages go out from a small pool of sender threads. All of them draw from
+one token bucket, so sends never exceed ``rate`` messages per second. A 429
+pauses the bucket for ``retry_after`` seconds and puts the recipient back in
+the queue instead of counting a failure.
+
+Any process can run the engine: the bot, and every gunicorn worker that
+accepts /api/broadcast. With a store, the bucket is therefore kept in
+SQLite (``SharedTokenBucket``), so the rate and 429 pauses hold for the
+bot token as a whole, not per process. Each process reserves tokens a
+few at a time, so the shared bucket costs one write per TOKEN_BATCH sends.
+
+With a ``BroadcastStore`` attached, jobs and per-recipient delivery state
+live in SQLite. Outcomes are checkpointed in batches, and each running job
+holds a lease. When a process dies mid-broadcast, its lease expires and
+whichever process runs the engine next picks the job up, sending only to
+the recipients still marked ``pending``.
+"""
+import logging
+import os
+import secrets
+import socket
+import threading
+import time
+from collections import OrderedDict
+from queue import Queue
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import db
+
+BROADCAST_RATE = float(os.getenv('BROADCAST_RATE', '25'))
+BROADCAST_WORKERS = int(os.getenv('BROADCAST_WORKERS', '8'))
+MAX_RETRIES = 3
+MAX_RATE_LIMIT_RETRIES = 10
+KEEP_FINISHED_JOBS = 50
+CHECKPOINT_BATCH = 200
+CHECKPOINT_INTERVAL = 1.0
+LEASE_SECONDS = 60
+ORPHAN_SCAN_INTERVAL = 30
+# SharedTokenBucket: bitta yozish tranzaksiyasida olinadigan tokenlar
+TOKEN_BATCH = 5
+_RATE_LIMIT_SQL = 'SELECT tokens, updated, paused_until FROM rate_limits WHERE name = ?'
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def pause(self, seconds: float):
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.tokens = 0
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    wait = self.paused_until - now
+                else:
+                    self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                    self.updated = now
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class SharedTokenBucket:
+    """Token bucket in ``rate_limits`` (migration 13), shared by every process using the database.
+
+    Tokens are reserved up to ``batch`` at a time, in one short write
+    transaction, and handed out locally. A reservation expires after
+    ``batch / rate`` seconds, so unused tokens are dropped rather than
+    spent late. One thread per process polls at a time; the others wait
+    on the local lock.
+    """
+
+    def __init__(self, name: str, rate: float, capacity: Optional[float] = None, batch: int = TOKEN_BATCH):
+        self.name = name
+        self.rate = rate
+        self.capacity = capacity or rate
+        self.batch = max(1, min(batch, int(self.capacity)))
+        self.transactions = 0
+        self._reserved = 0
+        self._reserved_until = 0.0
+        self._lock = threading.Lock()
+
+    def pause(self, seconds: float):
+        # Lokal zaxira ham bekor: 429 dan keyin shu jarayon darhol yubormaydi
+        self._reserved = 0
+        now = time.time()
+        db.execute('''
+            INSERT INTO rate_limits (name, tokens, updated, paused_until) VALUES (?, 0, ?, ?)
+            ON CONFLICT (name) DO UPDATE SET tokens = 0, updated = excluded.updated,
+                paused_until = MAX(paused_until, excluded.paused_until)
+        ''', (self.name, now, now + seconds))
+
+    def _state(self, row, now: float) -> Tuple[float, float]:
+        if row is None:
+            return self.capacity, 0.0
+        return min(self.capacity, row['tokens'] + max(0.0, now - row['updated']) * self.rate), row['paused_until']
+
+    def _wait(self, tokens: float, paused_until: float, now: float) -> float:
+        if now < paused_until:
+            return paused_until - now
+        # Bitta token emas, butun partiya yig'ilguncha kutamiz: aks holda har xabar alohida tranzaksiya
+        return 0.0 if tokens >= 1 else (self.batch - tokens) / self.rate
+
+    def _reserve(self) -> float:
+        """Reserve up to ``batch`` tokens; return 0, or how long to wait before trying again."""
+        # Jarayonlar orasida monotonic soat umumiy emas: devor soati
+        now = time.time()
+        # Kutish kerakligini yozish qulfisiz o'qib bilamiz
+        wait = self._wait(*self._state(db.fetchone(_RATE_LIMIT_SQL, (self.name,)), now), now)
+        if wait:
+            return wait
+        with db.transaction() as conn:
+            self.transactions += 1
+            now = time.time()
+            tokens, paused_until = self._state(conn.execute(_RATE_LIMIT_SQL, (self.name,)).fetchone(), now)
+            wait = self._wait(tokens, paused_until, now)
+            if wait:
+                return wait
+            taken = min(int(tokens), self.batch)
+            conn.execute('''
+                INSERT INTO rate_limits (name, tokens, updated, paused_until) VALUES (?, ?, ?, ?)
+                ON CONFLICT (name) DO UPDATE SET tokens = excluded.tokens, updated = excluded.updated
+            ''', (self.name, tokens - taken, now, paused_until))
+        self._reserved = taken
+        self._reserved_until = time.monotonic() + taken / self.rate
+        return 0.0
+
+    def acquire(self):
+        with self._lock:
+            while True:
+                if self._reserved > 0 and time.monotonic() < self._reserved_until:
+                    self._reserved -= 1
+                    return
+                wait = self._reserve()
+                if wait:
+                    time.sleep(wait)
+
+
+def retry_after(error: Exception) -> Optional[float]:
+    """Seconds Telegram asked us to wait, or None if this is not a 429."""
+    if getattr(error, 'error_code', None) != 429:
+        return None
+    result_json = getattr(error, 'result_json', None) or {}
+    return float(result_json.get('parameters', {}).get('retry_after', 1))
+
+
+def is_permanent(error: Exception) -> bool:
+    # 400 (chat topilmadi) va 403 (bot bloklangan) qayta urinib bo'lmaydi
+    return getattr(error, 'error_code', None) in (400, 403)
+
+
+def is_blocked(error: Exception) -> bool:
+    # 403: bot bloklangan, foydalanuvchi o'chirilgan yoki chatdan chiqarilgan
+    return getattr(error, 'error_code', None) == 403
+
+
+class BroadcastJob:
+    def __init__(self, text: str, total: int, on_done: Optional[Callable] = None,
+                 job_id: Optional[str] = None, sent: int = 0, failed: int = 0,
+                 created_at: Optional[float] = None):
+        self.job_id = job_id or secrets.token_hex(8)
+        self.text = text
+        self.total = total
+        self.sent = sent
+        self.failed = failed
+        self.done = sent + failed >= total
+        self.status = 'done' if self.done else 'running'
+        self.created_at = created_at or time.time()
+        self.finished_at = self.created_at if self.done else None
+        self.on_done = on_done
+        self.pending_results: List[Tuple[int, str, Optional[str]]] = []
+        self.checkpoint_lock = threading.Lock()
+        self._lock = threading.Lock()
+
+    def record(self, user_id: int, status: str, error: Optional[str] = None) -> bool:
+        """Count one delivery outcome; return True if it finished the job."""
+        with self._lock:
+            if status == 'sent':
+                self.sent += 1
+            else:
+                self.failed += 1
+            self.pending_results.append((user_id, status, error))
+            if self.sent + self.failed < self.total:
+                return False
+            self.done = True
+            self.status = 'done'
+            self.finished_at = time.time()
+            return True
+
+    def take_results(self) -> List[Tuple[int, str, Optional[str]]]:
+        with self._lock:
+            results, self.pending_results = self.pending_results, []
+            return results
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                'job_id': self.job_id,
+                'status': self.status,
+                'total': self.total,
+                'sent': self.sent,
+                'failed': self.failed,
+                'remaining': self.total - self.sent - self.failed,
+                'created_at': self.created_at,
+                'finished_at': self.finished_at,
+            }
+
+
+class BroadcastStore:
+    """SQLite persistence for broadcast jobs (tables from migration 4)."""
+
+    def create(self, job: BroadcastJob, recipients: List[int], owner: str):
+        with db.transaction() as conn:
+            conn.execute('''
+                INSERT INTO broadcast_jobs (job_id, text, status, total, owner, lease_until, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (job.job_id, job.text, job.status, job.total, owner,
+                  time.time() + LEASE_SECONDS, job.created_at))
+            conn.executemany('INSERT OR IGNORE INTO broadcast_recipients (job_id, user_id) VALUES (?, ?)',
+                             ((job.job_id, user_id) for user_id in recipients))
+
+    def checkpoint(self, job: BroadcastJob, owner: str):
+        results = job.take_results()
+        snapshot = job.snapshot()
+        blocked = [(user_id,) for user_id, status, _ in results if status == 'blocked']
+        with db.transaction() as conn:
+            if results:
+                conn.executemany('''
+                    UPDATE broadcast_recipients SET status = ?, error = ?
+                    WHERE job_id = ? AND user_id = ?
+                ''', ((status, error, job.job_id, user_id) for user_id, status, error in results))
+            if blocked:
+                conn.executemany('UPDATE users SET is_active = 0 WHERE user_id = ?', blocked)
+            conn.execute('''
+                UPDATE broadcast_jobs SET sent = ?, failed = ?, status = ?, finished_at = ?, lease_until = ?
+                WHERE job_id = ? AND owner = ?
+            ''', (snapshot['sent'], snapshot['failed'], snapshot['status'], snapshot['finished_at'],
+                  time.time() + LEASE_SECONDS, job.job_id, owner))
+
+    def claim_orphans(self, owner: str) -> List[Tuple[BroadcastJob, List[int]]]:
+        now = time.time()
+        claimed = []
+        with db.transaction() as conn:
+            rows = conn.execute('''
+                SELECT * FROM broadcast_jobs WHERE status = "running" AND lease_until < ?
+            ''', (now,)).fetchall()
+            for row in rows:
+                conn.execute('UPDATE broadcast_jobs SET owner = ?, lease_until = ? WHERE job_id = ?',
+                             (owner, now + LEASE_SECONDS, row['job_id']))
+                pending = [r['user_id'] for r in conn.execute(
+                    'SELECT user_id FROM broadcast_recipients WHERE job_id = ? AND status = "pending"',
+                    (row['job_id'],))]
+                # Checkpoint yozilmagan natijalar qayta yuboriladi, shuning uchun hisob qayta tiklanadi
+                job = BroadcastJob(row['text'], row['total'], job_id=row['job_id'],
+                                   sent=row['total'] - len(pending) - row['failed'], failed=row['failed'],
+                                   created_at=row['created_at'])
+                claimed.append((job, pending))
+        return claimed
+
+    def load(self, job_id: str) -> Optional[Dict]:
+        row = db.fetchdict('SELECT * FROM broadcast_jobs WHERE job_id = ?', (job_id,))
+        if not row:
+            return None
+        return {
+            'job_id': row['job_id'],
+            'status': row['status'],
+            'total': row['total'],
+            'sent': row['sent'],
+            'failed': row['failed'],
+            'remaining': row['total'] - row['sent'] - row['failed'],
+            'created_at': row['created_at'],
+            'finished_at': row['finished_at'],
+        }
+
+
+class BroadcastEngine:
+    def __init__(self, send: Callable[[int, str], object], workers: int = BROADCAST_WORKERS,
+                 rate: float = BROADCAST_RATE, store: Optional[BroadcastStore] = None):
+        self.send = send
+        self.workers = workers
+        self.store = store
+        self.owner = f'{socket.gethostname()}:{os.getpid()}:{secrets.token_hex(4)}'
+        # Store bo'lsa, tezlik barcha jarayonlar uchun umumiy (web ishchilari + bot)
+        self.bucket = SharedTokenBucket('broadcast', rate) if store else TokenBucket(rate)
+        self.jobs: 'OrderedDict[str, BroadcastJob]' = OrderedDict()
+        self._queue = Queue()
+        self._threads = []
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start sender threads and, with a store, the checkpoint/resume loop."""
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._worker, name=f'broadcast-{i}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+            if self.store:
+                thread = threading.Thread(target=self._checkpointer, name='broadcast-checkpoint', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, recipients: Iterable[int], text: str, on_done: Optional[Callable] = None) -> BroadcastJob:
+        recipients = list(recipients)
+        job = BroadcastJob(text, len(recipients), on_done)
+        if self.store:
+            self.store.create(job, recipients, self.owner)
+        self._track(job)
+        if not recipients:
+            self._finish(job)
+            return job
+        self.start()
+        for user_id in recipients:
+            self._queue.put((job, user_id, 0, 0))
+        return job
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        job = self.jobs.get(job_id)
+        if job:
+            return job.snapshot()
+        if self.store:
+            return self.store.load(job_id)
+        return None
+
+    def resume(self) -> int:
+        """Claim jobs whose owner stopped renewing its lease; return how many were resumed."""
+        if not self.store:
+            return 0
+        claimed = self.store.claim_orphans(self.owner)
+        for job, pending in claimed:
+            logging.info(f'Broadcast {job.job_id} resumed: {len(pending)} recipients left')
+            self._track(job)
+            if not pending:
+                job.done, job.status, job.finished_at = True, 'done', time.time()
+                self._finish(job)
+                continue
+            self.start()
+            for user_id in pending:
+                self._queue.put((job, user_id, 0, 0))
+        return len(claimed)
+
+    def _track(self, job: BroadcastJob):
+        with self._lock:
+            self.jobs[job.job_id] = job
+            finished = [job_id for job_id, j in self.jobs.items() if j.done]
+            for job_id in finished[:max(0, len(finished) - KEEP_FINISHED_JOBS)]:
+                del self.jobs[job_id]
+
+    def _checkpoint(self, job: BroadcastJob):
+        try:
+            # Eski holat yangisining ustidan yozilmasligi uchun ketma-ket
+            with job.checkpoint_lock:
+                self.store.checkpoint(job, self.owner)
+        except Exception as e:
+            logging.error(f'Broadcast checkpoint error: {e}')
+
+    def _finish(self, job: BroadcastJob):
+        if self.store:
+            self._checkpoint(job)
+        logging.info(f'Broadcast {job.job_id} finished: {job.sent} sent, {job.failed} failed')
+        if job.on_done:
+            try:
+                job.on_done(job)
+            except Exception as e:
+                logging.error(f'Broadcast callback error: {e}')
+
+    def _checkpointer(self):
+        last_scan = 0.0
+        while True:
+            time.sleep(CHECKPOINT_INTERVAL)
+            for job in list(self.jobs.values()):
+                if not job.done:
+                    self._checkpoint(job)
+            if time.monotonic() - last_scan >= ORPHAN_SCAN_INTERVAL:
+                last_scan = time.monotonic()
+                try:
+                    self.resume()
+                except Exception as e:
+                    logging.error(f'Broadcast resume error: {e}')
+
+    def _worker(self):
+        while True:
+            job, user_id, attempts, throttled = self._queue.get()
+            try:
+                self._deliver(job, user_id, attempts, throttled)
+            except Exception as e:
+                logging.error(f'Broadcast worker error: {e}')
+            finally:
+                self._queue.task_done()
+
+    def _deliver(self, job: BroadcastJob, user_id: int, attempts: int, throttled: int):
+        self.bucket.acquire()
+        status, error = 'sent', None
+        try:
+            self.send(user_id, job.text)
+        except Exception as e:
+            wait = retry_after(e)
+            if wait is not None and throttled < MAX_RATE_LIMIT_RETRIES:
+                self.bucket.pause(wait)
+                self._queue.put((job, user_id, attempts, throttled + 1))
+                return
+            if wait is None and not is_permanent(e) and attempts + 1 < MAX_RETRIES:
+                self._queue.put((job, user_id, attempts + 1, throttled))
+                return
+            status, error = ('blocked' if is_blocked(e) else 'failed'), str(e)[:200]
+        finished = job.record(user_id, status, error)
+        if finished:
+            self._finish(job)
+        elif self.store and len(job.pending_results) >= CHECKPOINT_BATCH:
+            self._checkpoint(job)
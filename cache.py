@@ -0,0 +1,154 @@
+# cache.py
+"""Small in-process caches with TTL, LRU bounding and request coalescing."""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+import metrics
+
+MISSING = object()
+
+# Nomi bo'yicha barcha keshlar (statistika uchun)
+registry: Dict[str, 'TTLCache'] = {}
+
+
+class _Flight:
+    __slots__ = ('event', 'value', 'error')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class TTLCache:
+    """Thread-safe TTL + LRU cache.
+
+    ``negative_ttl`` applies to falsy values, so "no" answers can expire
+    sooner than "yes" answers. Concurrent ``get_or_load`` calls for the same
+    missing key share a single loader call.
+    """
+
+    def __init__(self, name: str, ttl: float, negative_ttl: Optional[float] = None, maxsize: int = 10000):
+        self.name = name
+        self.ttl = ttl
+        self.negative_ttl = ttl if negative_ttl is None else negative_ttl
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self._data: 'OrderedDict[Hashable, tuple]' = OrderedDict()
+        self._inflight: Dict[Hashable, _Flight] = {}
+        self._lock = threading.Lock()
+        registry[name] = self
+
+    def _lookup(self, key: Hashable) -> Any:
+        entry = self._data.get(key)
+        if entry is None:
+            return MISSING
+        value, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return MISSING
+        self._data.move_to_end(key)
+        return value
+
+    def _store(self, key: Hashable, value: Any, ttl: Optional[float]):
+        if ttl is None:
+            ttl = self.ttl if value else self.negative_ttl
+        self._data[key] = (value, time.monotonic() + ttl)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            value = self._lookup(key)
+            if value is MISSING:
+                self.misses += 1
+                return default
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        with self._lock:
+            self._store(key, value, ttl)
+
+    def invalidate(self, key: Hashable):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def discard(self, predicate: Callable[[Hashable], bool]) -> int:
+        """Drop every key matching ``predicate``; return how many were dropped."""
+        with self._lock:
+            keys = [key for key in self._data if predicate(key)]
+            for key in keys:
+                del self._data[key]
+            return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        with self._lock:
+            value = self._lookup(key)
+            if value is not MISSING:
+                self.hits += 1
+                return value
+            self.misses += 1
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = loader()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+                if flight.error is None:
+                    self._store(key, flight.value, None)
+            flight.event.set()
+        return flight.value
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'size': len(self._data),
+                'hits': self.hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced,
+                'evictions': self.evictions,
+            }
+
+
+def all_stats() -> Dict[str, Dict]:
+    return {name: c.stats() for name, c in registry.items()}
+
+
+def _read(field: str) -> Callable[[], Dict[tuple, int]]:
+    return lambda: {(name,): stats[field] for name, stats in all_stats().items()}
+
+
+# Keshlar qaysi jarayonda ishlatilsa, o'sha jarayonning /metrics (yoki METRICS_PORT) sahifasida
+metrics.Gauge('garajhub_cache_entries', 'Entries in the in-process TTL cache', ['cache'], read=_read('size'))
+metrics.Counter('garajhub_cache_hits', 'TTL cache hits', ['cache'], read=_read('hits'))
+metrics.Counter('garajhub_cache_misses', 'TTL cache misses (loader called)', ['cache'], read=_read('misses'))
+metrics.Counter('garajhub_cache_coalesced', 'TTL cache misses that waited for a loader already running', ['cache'],
+                read=_read('coalesced'))
+metrics.Counter('garajhub_cache_evictions', 'TTL cache LRU evictions', ['cache'], read=_read('evictions'))
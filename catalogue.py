@@ -0,0 +1,213 @@
+# catalogue.py
+"""In-memory snapshot of active startups for the 🌐 Startuplar feed.
+
+The feed shows one startup per page and changes only when an admin
+approves or rejects something. Browsing it is served from compact
+``__slots__`` records with the owner name already joined in. They are
+kept in ``(created_at, startup_id)`` order, the same key pagination.py
+uses, so a cursor token means the same thing on both paths.
+
+Changes made through this process are applied row by row (``refresh``).
+Other processes bump ``stats.catalogue_version`` through triggers
+(migration 6). That single integer is re-read at most every
+``RECHECK_INTERVAL`` seconds, and a full reload happens only when it moved.
+
+With a ``store`` (snapshots.SharedStore), a reload first looks for the
+entries another process already loaded for that version. They are kept
+as one marshal blob, which decodes several times faster than re-running
+the join.
+"""
+import bisect
+import marshal
+import threading
+import time
+from typing import List, Optional, Tuple
+
+import db
+import pagination
+
+RECHECK_INTERVAL = 5.0
+SNAPSHOT_NAME = 'catalogue'
+
+CATALOGUE_SQL = '''
+    SELECT s.startup_id, s.name, s.description, s.logo, s.owner_id, s.created_at, s.version,
+           u.first_name, u.last_name
+    FROM startups s JOIN users u ON s.owner_id = u.user_id
+'''
+
+
+class StartupEntry:
+    __slots__ = ('startup_id', 'name', 'description', 'logo', 'owner_id', 'owner_name', 'created_at', 'version')
+
+    def __init__(self, row):
+        self.startup_id = row['startup_id']
+        self.name = row['name']
+        self.description = row['description'] or ''
+        self.logo = row['logo']
+        self.owner_id = row['owner_id']
+        self.owner_name = f"{row['first_name'] or ''} {row['last_name'] or ''}".strip()
+        self.created_at = row['created_at']
+        self.version = row['version']
+
+    def to_tuple(self) -> tuple:
+        return tuple(getattr(self, slot) for slot in self.__slots__)
+
+    @classmethod
+    def from_tuple(cls, values) -> 'StartupEntry':
+        entry = cls.__new__(cls)
+        for slot, value in zip(cls.__slots__, values):
+            setattr(entry, slot, value)
+        return entry
+
+    @property
+    def key(self) -> Tuple[str, int]:
+        return self.created_at, self.startup_id
+
+
+class ActiveCatalogue:
+    """Active startups, oldest first in memory and served newest first."""
+
+    def __init__(self, recheck_interval: float = RECHECK_INTERVAL, store=None):
+        self.recheck_interval = recheck_interval
+        self.store = store
+        self.version: Optional[int] = None
+        self.reloads = 0
+        self.shared_loads = 0
+        self._keys: List[Tuple[str, int]] = []
+        self._entries: List[StartupEntry] = []
+        self._by_id = {}
+        self._checked_at = 0.0
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def read_version() -> int:
+        return db.fetchvalue('SELECT catalogue_version FROM stats WHERE id = 1', default=0)
+
+    def load(self):
+        # Versiya qatorlardan oldin o'qiladi: oraliqdagi o'zgarish keyingi tekshiruvda qayta yuklanadi
+        version = self.read_version()
+        entries = self._load_shared(version)
+        if entries is None:
+            rows = db.fetchall(CATALOGUE_SQL + " WHERE s.status = 'active' ORDER BY s.created_at, s.startup_id")
+            entries = [StartupEntry(row) for row in rows]
+            if self.store is not None:
+                self.store.save(SNAPSHOT_NAME, version, marshal.dumps([entry.to_tuple() for entry in entries]))
+        with self._lock:
+            self._entries = entries
+            self._keys = [entry.key for entry in entries]
+            self._by_id = {entry.startup_id: entry for entry in entries}
+            self.version = version
+            self._checked_at = time.monotonic()
+            self.reloads += 1
+
+    def _load_shared(self, version: int) -> Optional[List[StartupEntry]]:
+        if self.store is None:
+            return None
+        blob = self.store.load(SNAPSHOT_NAME, version)
+        if blob is None:
+            return None
+        try:
+            entries = [StartupEntry.from_tuple(values) for values in marshal.loads(blob)]
+        except (ValueError, EOFError, TypeError):
+            # Boshqa Python versiyasi yozgan bo'lishi mumkin: SQL orqali yuklanadi
+            return None
+        self.shared_loads += 1
+        return entries
+
+    def stats(self):
+        return {'version': self.version, 'entries': len(self._entries), 'reloads': self.reloads,
+                'shared_loads': self.shared_loads}
+
+    def _ensure_fresh(self):
+        if self.version is None:
+            self.load()
+        elif time.monotonic() - self._checked_at >= self.recheck_interval:
+            self._checked_at = time.monotonic()
+            if self.read_version() != self.version:
+                self.load()
+
+    def _remove(self, startup_id: int):
+        entry = self._by_id.pop(startup_id, None)
+        if entry is not None:
+            i = bisect.bisect_left(self._keys, entry.key)
+            del self._keys[i]
+            del self._entries[i]
+
+    def _insert(self, entry: StartupEntry):
+        i = bisect.bisect_left(self._keys, entry.key)
+        self._keys.insert(i, entry.key)
+        self._entries.insert(i, entry)
+        self._by_id[entry.startup_id] = entry
+
+    def refresh(self, startup_id: int, before: int, after: int):
+        """Apply this process's change to one startup.
+
+        ``before``/``after`` are ``catalogue_version`` read around the write,
+        inside the same transaction, so other writers cannot sit in between.
+        """
+        with self._lock:
+            if self.version is None or after == before:
+                return
+            if self.version != before:
+                # Oraliqda boshqa jarayon ham o'zgartirgan
+                self.load()
+                return
+            row = db.fetchone(CATALOGUE_SQL + " WHERE s.startup_id = ? AND s.status = 'active'", (startup_id,))
+            self._remove(startup_id)
+            if row is not None:
+                self._insert(StartupEntry(row))
+            self.version = after
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._ensure_fresh()
+            return len(self._entries)
+
+    def get(self, startup_id: int) -> Optional[StartupEntry]:
+        with self._lock:
+            self._ensure_fresh()
+            return self._by_id.get(startup_id)
+
+    def position(self, startup_id: int) -> int:
+        """1-based position in the newest-first feed, or 0 if not active."""
+        with self._lock:
+            self._ensure_fresh()
+            entry = self._by_id.get(startup_id)
+            if entry is None:
+                return 0
+            return len(self._keys) - bisect.bisect_left(self._keys, entry.key)
+
+    def neighbours(self, startup_id: int) -> Tuple[Optional[StartupEntry], Optional[StartupEntry]]:
+        """(newer, older) neighbours of a startup in the feed."""
+        with self._lock:
+            self._ensure_fresh()
+            entry = self._by_id.get(startup_id)
+            if entry is None:
+                return None, None
+            i = bisect.bisect_left(self._keys, entry.key)
+            newer = self._entries[i + 1] if i + 1 < len(self._entries) else None
+            older = self._entries[i - 1] if i > 0 else None
+            return newer, older
+
+    def page(self, cursor: Optional[str] = None,
+             per_page: int = 1) -> Tuple[List[StartupEntry], Optional[str], Optional[str], int]:
+        """Same contract as ``main.get_startups_page``: (entries, next_cursor, prev_cursor, total)."""
+        with self._lock:
+            self._ensure_fresh()
+            total = len(self._entries)
+            decoded = pagination.decode_cursor(cursor)
+            if decoded and decoded[0]:
+                # Yangiroqlari: kalitdan keyin turganlar
+                start = bisect.bisect_right(self._keys, (decoded[1], decoded[2]))
+                end = min(total, start + per_page)
+            else:
+                end = bisect.bisect_left(self._keys, (decoded[1], decoded[2])) if decoded else total
+                start = max(0, end - per_page)
+            entries = self._entries[start:end][::-1]
+
+        next_cursor = prev_cursor = None
+        if entries and start > 0:
+            next_cursor = pagination.encode_cursor(entries[-1].created_at, entries[-1].startup_id)
+        if entries and end < total:
+            prev_cursor = pagination.encode_cursor(entries[0].created_at, entries[0].startup_id, before=True)
+        return entries, next_cursor, prev_cursor, total
@@ -0,0 +1,212 @@
+# cluster.py
+"""Dispatcher/worker mode: one ingest process, N bot worker processes.
+
+Only one process may call getUpdates for a token. The ingest process
+long-polls, reads the chat id from each raw update and forwards it to a
+worker picked on a consistent-hash ring. A chat therefore always lands on
+the same worker and its updates are handled in order, one at a time.
+Adding or removing a worker moves only about 1/N of the chats.
+
+Conversation state lives in SQLite (see conversations.py), so it does not
+depend on which process handles a chat. The subscription cache is per
+process, so ``chat_member`` updates from the channel are routed by the
+member's user id: the worker that serves the user's private chat is the
+one whose cache they update.
+
+The offset is advanced once an update is queued. An update still queued
+when a worker dies is lost, like an update in flight in plain polling mode.
+"""
+import bisect
+import hashlib
+import logging
+import multiprocessing
+import signal
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from queue import Full
+from typing import Dict, Iterable, List, Optional
+
+import telebot
+from telebot import apihelper
+
+VIRTUAL_NODES = 64
+QUEUE_SIZE = 1000
+POLL_LIMIT = 100
+POLL_TIMEOUT = 30
+RESTART_DELAY = 1.0
+
+_MESSAGE_KEYS = ('message', 'edited_message', 'channel_post', 'edited_channel_post',
+                 'business_message', 'edited_business_message')
+_CHAT_KEYS = ('my_chat_member', 'chat_join_request', 'message_reaction',
+              'message_reaction_count', 'chat_boost', 'removed_chat_boost')
+_USER_KEYS = ('inline_query', 'chosen_inline_result', 'shipping_query', 'pre_checkout_query',
+              'poll_answer')
+
+
+def raw_chat_key(update: Dict) -> int:
+    """Chat (or user) id of a raw update dict; same rules as ``webhook.chat_key``."""
+    for key in _MESSAGE_KEYS:
+        message = update.get(key)
+        if message:
+            return message['chat']['id']
+    call = update.get('callback_query')
+    if call:
+        message = call.get('message')
+        return message['chat']['id'] if message else call['from']['id']
+    member = update.get('chat_member')
+    if member:
+        # Kanal a'zoligi: obuna keshi foydalanuvchining shaxsiy chati turgan ishchida
+        return member['new_chat_member']['user']['id']
+    for key in _CHAT_KEYS:
+        event = update.get(key)
+        if event:
+            return event['chat']['id']
+    for key in _USER_KEYS:
+        event = update.get(key)
+        if event and (event.get('from') or event.get('user')):
+            return (event.get('from') or event.get('user'))['id']
+    return 0
+
+
+def _hash(value: str) -> int:
+    return int.from_bytes(hashlib.md5(value.encode()).digest()[:8], 'big')
+
+
+class HashRing:
+    """Consistent-hash ring with virtual nodes."""
+
+    def __init__(self, nodes: Iterable[int], vnodes: int = VIRTUAL_NODES):
+        points = sorted((_hash(f'{node}#{i}'), node) for node in nodes for i in range(vnodes))
+        self._hashes = [h for h, _ in points]
+        self._nodes = [node for _, node in points]
+
+    def get(self, key) -> int:
+        i = bisect.bisect(self._hashes, _hash(str(key)))
+        return self._nodes[i % len(self._nodes)]
+
+
+def worker_main(index: int, queue, api_url: Optional[str] = None):
+    """Worker process: handle raw updates from ``queue`` in order until ``None``."""
+    if api_url:
+        apihelper.API_URL = api_url
+    import main
+    main.bot.threaded = False
+    logging.info(f'Bot worker {index} ready')
+    while True:
+        raw = queue.get()
+        if raw is None:
+            break
+        try:
+            main.bot.process_new_updates([telebot.types.Update.de_json(raw)])
+        except Exception as e:
+            logging.error(f"Worker {index}: update {raw.get('update_id')} failed: {e}")
+
+
+@contextmanager
+def _entry_main():
+    """spawn re-imports ``__main__`` in each child; with ``python main.py`` that is main.py itself.
+
+    The child would then hold main.py twice (``__mp_main__`` and, after
+    ``import main`` in worker_main, ``main``). bot_worker is the importable
+    entry point, so the child imports main once, under its own name.
+    """
+    current = sys.modules['__main__']
+    if current is not sys.modules.get('main'):
+        yield
+        return
+    import bot_worker
+    sys.modules['__main__'] = bot_worker
+    try:
+        yield
+    finally:
+        sys.modules['__main__'] = current
+
+
+class Cluster:
+    def __init__(self, token: str, workers: int, allowed_updates: Optional[List[str]] = None,
+                 queue_size: int = QUEUE_SIZE):
+        self.token = token
+        self.workers = workers
+        self.allowed_updates = allowed_updates
+        # spawn: ishchilar ota jarayonning SQLite ulanishlarini meros qilib olmasligi uchun
+        self._ctx = multiprocessing.get_context('spawn')
+        self.queues = [self._ctx.Queue(maxsize=queue_size) for _ in range(workers)]
+        self.processes: List = [None] * workers
+        self.ring = HashRing(range(workers))
+        self.offset = None
+        self.dispatched = 0
+        self.restarts = 0
+        self._running = False
+
+    def _spawn(self, index: int):
+        process = self._ctx.Process(target=worker_main, args=(index, self.queues[index], apihelper.API_URL),
+                                    name=f'bot-worker-{index}', daemon=True)
+        with _entry_main():
+            process.start()
+        self.processes[index] = process
+
+    def start(self):
+        for index in range(self.workers):
+            self._spawn(index)
+
+    def _check_workers(self):
+        for index, process in enumerate(self.processes):
+            if not process.is_alive():
+                logging.error(f'Bot worker {index} exited with code {process.exitcode}, restarting')
+                self.restarts += 1
+                self._spawn(index)
+
+    def dispatch(self, raw: Dict):
+        self.queues[self.ring.get(raw_chat_key(raw))].put(raw)
+        self.dispatched += 1
+
+    def poll_once(self, timeout: int = POLL_TIMEOUT) -> int:
+        updates = apihelper.get_updates(self.token, offset=self.offset, limit=POLL_LIMIT,
+                                        allowed_updates=self.allowed_updates, long_polling_timeout=timeout)
+        for raw in updates:
+            self.dispatch(raw)
+            self.offset = raw['update_id'] + 1
+        return len(updates)
+
+    def run(self):
+        self._running = True
+        self.start()
+        try:
+            while self._running:
+                try:
+                    self.poll_once()
+                except Exception as e:
+                    logging.error(f'getUpdates failed: {e}')
+                    time.sleep(RESTART_DELAY)
+                self._check_workers()
+        finally:
+            self.stop()
+
+    def stop(self, timeout: float = 10):
+        self._running = False
+        for queue in self.queues:
+            try:
+                queue.put(None, timeout=timeout)
+            except Full:
+                pass
+        for process in self.processes:
+            if process is not None:
+                process.join(timeout)
+                if process.is_alive():
+                    process.terminate()
+
+
+def run(token: str, workers: int, allowed_updates: Optional[List[str]] = None):
+    cluster = Cluster(token, workers, allowed_updates)
+
+    def _terminate(signum, frame):
+        raise SystemExit(0)
+    # python main.py botni alohida oqimda ishga tushiradi: u holda to'xtatishni chaqiruvchi boshqaradi
+    if threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGTERM, _terminate)
+    try:
+        cluster.run()
+    except (KeyboardInterrupt, SystemExit):
+        logging.info('Ingest stopping')
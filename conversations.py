@@ -0,0 +1,88 @@
+# conversations.py
+"""Conversation state for multi-step dialogs, stored in SQLite.
+
+Replaces telebot's in-memory ``register_next_step_handler``. Steps survive
+restarts, any bot process can continue a dialog, and abandoned dialogs
+expire after ``ttl`` seconds. Expired rows are swept in small batches.
+"""
+import json
+import logging
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+import db
+
+CONVERSATION_TTL = 3600
+SWEEP_INTERVAL = 300
+SWEEP_BATCH = 500
+
+
+class ConversationStore:
+    def __init__(self, ttl: float = CONVERSATION_TTL):
+        self.ttl = ttl
+        self.steps: Dict[str, Callable] = {}
+        self._last_sweep = 0.0
+        self._sweep_lock = threading.Lock()
+
+    def step(self, name: str):
+        """Register ``handler(message, data)`` as the handler for step ``name``."""
+        def decorator(handler: Callable) -> Callable:
+            self.steps[name] = handler
+            return handler
+        return decorator
+
+    def get(self, chat_id: int, user_id: int) -> Optional[Tuple[str, Dict]]:
+        row = db.fetchone('SELECT step, data, expires_at FROM conversations WHERE chat_id = ? AND user_id = ?',
+                          (chat_id, user_id))
+        if row is None or row['expires_at'] <= time.time():
+            return None
+        return row['step'], json.loads(row['data'])
+
+    def set(self, chat_id: int, user_id: int, step: str, data: Optional[Dict] = None):
+        if step not in self.steps:
+            raise KeyError(f'unknown conversation step: {step!r}')
+        now = time.time()
+        db.execute('''
+            INSERT OR REPLACE INTO conversations (chat_id, user_id, step, data, updated_at, expires_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', (chat_id, user_id, step, json.dumps(data or {}), now, now + self.ttl))
+        self.maybe_sweep()
+
+    def clear(self, chat_id: int, user_id: int):
+        db.execute('DELETE FROM conversations WHERE chat_id = ? AND user_id = ?', (chat_id, user_id))
+
+    def sweep(self, batch: int = SWEEP_BATCH) -> int:
+        """Delete expired conversations in batches; return how many were removed."""
+        removed = 0
+        while True:
+            cursor = db.execute('''
+                DELETE FROM conversations WHERE (chat_id, user_id) IN (
+                    SELECT chat_id, user_id FROM conversations WHERE expires_at <= ? LIMIT ?
+                )
+            ''', (time.time(), batch))
+            removed += cursor.rowcount
+            if cursor.rowcount < batch:
+                return removed
+
+    def maybe_sweep(self):
+        now = time.monotonic()
+        if now - self._last_sweep < SWEEP_INTERVAL or not self._sweep_lock.acquire(blocking=False):
+            return
+        try:
+            self._last_sweep = now
+            removed = self.sweep()
+            if removed:
+                logging.info(f'Expired conversations removed: {removed}')
+        finally:
+            self._sweep_lock.release()
+
+    def dispatch(self, message, state: Tuple[str, Dict]):
+        """Run the stored step for ``message``. The state is consumed first, so the step sets the next one."""
+        step, data = state
+        self.clear(message.chat.id, message.from_user.id)
+        handler = self.steps.get(step)
+        if handler is None:
+            logging.warning(f'Conversation step {step!r} has no handler')
+            return
+        handler(message, data)
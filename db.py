@@ -0,0 +1,179 @@
+# db.py
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from queue import Empty, LifoQueue
+from typing import Any, Dict, Iterable, List, Optional
+
+DB_PATH = os.getenv('DB_PATH', 'garajhub.db')
+POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '8'))
+POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', '30'))
+
+# Har bir yangi ulanishda bir marta bajariladi
+PRAGMAS = (
+    'PRAGMA journal_mode = WAL',
+    'PRAGMA synchronous = NORMAL',
+    'PRAGMA busy_timeout = 5000',
+    'PRAGMA temp_store = MEMORY',
+    'PRAGMA cache_size = -16000',
+    'PRAGMA mmap_size = 134217728',
+)
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class ConnectionPool:
+    """Bounded SQLite connection pool with thread-affine checkout.
+
+    A thread keeps the same connection for the whole (possibly nested)
+    ``connection()`` block, then hands it back to the idle stack so the
+    next thread can reuse it along with its prepared statement cache.
+    """
+
+    def __init__(self, path: str = DB_PATH, max_size: int = POOL_SIZE, timeout: float = POOL_TIMEOUT):
+        self.path = path
+        self.max_size = max_size
+        self.timeout = timeout
+        self._idle = LifoQueue()
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._all = []
+        self.created = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.path,
+            check_same_thread=False,
+            isolation_level=None,
+            cached_statements=256,
+        )
+        conn.row_factory = sqlite3.Row
+        for pragma in PRAGMAS:
+            conn.execute(pragma)
+        with self._lock:
+            self._all.append(conn)
+            self.created += 1
+        return conn
+
+    def _acquire(self) -> sqlite3.Connection:
+        if not self._slots.acquire(timeout=self.timeout):
+            raise PoolTimeout(f'No free database connection after {self.timeout}s')
+        try:
+            return self._idle.get_nowait()
+        except Empty:
+            pass
+        try:
+            return self._connect()
+        except Exception:
+            self._slots.release()
+            raise
+
+    def _release(self, conn: sqlite3.Connection):
+        if conn.in_transaction:
+            conn.rollback()
+        self._idle.put(conn)
+        self._slots.release()
+
+    @contextmanager
+    def connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            self._local.depth += 1
+            try:
+                yield conn
+            finally:
+                self._local.depth -= 1
+            return
+
+        conn = self._acquire()
+        self._local.conn = conn
+        self._local.depth = 1
+        try:
+            yield conn
+        finally:
+            self._local.conn = None
+            self._local.depth = 0
+            self._release(conn)
+
+    def close_all(self):
+        with self._lock:
+            conns, self._all = self._all, []
+        for conn in conns:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        self._idle = LifoQueue()
+        self._slots = threading.BoundedSemaphore(self.max_size)
+
+
+pool = ConnectionPool()
+
+
+def configure(path: str = None, max_size: int = None):
+    """Point the shared pool at another database file (benchmarks, scripts)."""
+    global pool
+    pool.close_all()
+    pool = ConnectionPool(path or DB_PATH, max_size or POOL_SIZE)
+    return pool
+
+
+# ==================== YORDAMCHI FUNKTSIYALAR ====================
+@contextmanager
+def connection():
+    with pool.connection() as conn:
+        yield conn
+
+
+@contextmanager
+def transaction():
+    """Run several statements atomically on the thread's connection."""
+    with pool.connection() as conn:
+        if conn.in_transaction:
+            yield conn
+            return
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield conn
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+
+
+def fetchone(sql: str, params: Iterable[Any] = ()) -> Optional[sqlite3.Row]:
+    with pool.connection() as conn:
+        return conn.execute(sql, params).fetchone()
+
+
+def fetchall(sql: str, params: Iterable[Any] = ()) -> List[sqlite3.Row]:
+    with pool.connection() as conn:
+        return conn.execute(sql, params).fetchall()
+
+
+def fetchvalue(sql: str, params: Iterable[Any] = (), default: Any = None) -> Any:
+    row = fetchone(sql, params)
+    return row[0] if row else default
+
+
+def fetchdict(sql: str, params: Iterable[Any] = ()) -> Optional[Dict]:
+    row = fetchone(sql, params)
+    return dict(row) if row else None
+
+
+def fetchdicts(sql: str, params: Iterable[Any] = ()) -> List[Dict]:
+    return [dict(row) for row in fetchall(sql, params)]
+
+
+def execute(sql: str, params: Iterable[Any] = ()) -> sqlite3.Cursor:
+    with pool.connection() as conn:
+        return conn.execute(sql, params)
+
+
+def executescript(script: str):
+    with pool.connection() as conn:
+        conn.executescript(script)
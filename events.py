@@ -0,0 +1,129 @@
+# events.py
+"""Server-Sent Events fan-out for the admin dashboard.
+
+A single poller thread per process calls ``poll(state)`` and hands the
+events it returns to every subscriber's queue. Database work therefore
+stays the same no matter how many dashboards are open. The poller runs
+only while someone is subscribed. ``notify()`` wakes it immediately; the
+write path in this process uses it, and writes from other processes are
+picked up on the next ``interval`` tick.
+
+A subscriber that stops reading is dropped once its queue fills up.
+The browser's EventSource then reconnects and reloads the page data.
+"""
+import json
+import logging
+import queue
+import threading
+from typing import Any, Callable, Iterator, List, Optional, Set, Tuple
+
+POLL_INTERVAL = 1.0
+HEARTBEAT_INTERVAL = 15.0
+QUEUE_SIZE = 100
+MAX_SUBSCRIBERS = 100
+RETRY_MS = 5000
+
+Event = Tuple[str, Any]
+CLOSED = object()
+
+
+class TooManySubscribers(Exception):
+    pass
+
+
+def format_event(event_id: int, name: str, data: Any) -> str:
+    return f'id: {event_id}\nevent: {name}\ndata: {json.dumps(data, default=str)}\n\n'
+
+
+class EventHub:
+    def __init__(self, poll: Callable[[Any], Tuple[Any, List[Event]]], interval: float = POLL_INTERVAL,
+                 max_subscribers: int = MAX_SUBSCRIBERS, queue_size: int = QUEUE_SIZE):
+        self.poll = poll
+        self.interval = interval
+        self.max_subscribers = max_subscribers
+        self.queue_size = queue_size
+        self.polls = 0
+        self.published = 0
+        self.dropped = 0
+        self._subscribers: Set[queue.Queue] = set()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._event_id = 0
+
+    def subscribe(self) -> queue.Queue:
+        with self._lock:
+            if len(self._subscribers) >= self.max_subscribers:
+                raise TooManySubscribers()
+            subscriber = queue.Queue(self.queue_size)
+            self._subscribers.add(subscriber)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='event-hub', daemon=True)
+                self._thread.start()
+            return subscriber
+
+    def unsubscribe(self, subscriber: queue.Queue):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def notify(self):
+        """Something was written: poll now instead of waiting for the next tick."""
+        self._wake.set()
+
+    def publish(self, name: str, data: Any):
+        with self._lock:
+            self._event_id += 1
+            message = format_event(self._event_id, name, data)
+            subscribers = list(self._subscribers)
+        self.published += 1
+        for subscriber in subscribers:
+            try:
+                subscriber.put_nowait(message)
+            except queue.Full:
+                # O'qimayotgan mijoz: uzamiz, brauzer qayta ulanadi
+                self.unsubscribe(subscriber)
+                self.dropped += 1
+                with subscriber.mutex:
+                    subscriber.queue.clear()
+                subscriber.put_nowait(CLOSED)
+
+    def stream(self, subscriber: queue.Queue, heartbeat: float = HEARTBEAT_INTERVAL) -> Iterator[str]:
+        """SSE body for one subscriber; unsubscribes when the client goes away."""
+        try:
+            yield f'retry: {RETRY_MS}\n\n'
+            while True:
+                try:
+                    message = subscriber.get(timeout=heartbeat)
+                except queue.Empty:
+                    # Proksi ulanishni yopib qo'ymasligi uchun izoh satri
+                    yield ': ping\n\n'
+                    continue
+                if message is CLOSED:
+                    return
+                yield message
+        finally:
+            self.unsubscribe(subscriber)
+
+    def stats(self) -> dict:
+        with self._lock:
+            subscribers = len(self._subscribers)
+        return {'subscribers': subscribers, 'polls': self.polls,
+                'published': self.published, 'dropped': self.dropped}
+
+    def _run(self):
+        state = None
+        while True:
+            with self._lock:
+                if not self._subscribers:
+                    self._thread = None
+                    return
+            try:
+                state, events = self.poll(state)
+                self.polls += 1
+            except Exception:
+                logging.exception('Dashboard event poll failed')
+                events = []
+            for name, data in events:
+                self.publish(name, data)
+            self._wake.wait(self.interval)
+            self._wake.clear()
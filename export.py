@@ -0,0 +1,95 @@
+# export.py
+"""Streaming CSV / NDJSON export of users, startups and startup members.
+
+Rows are read in primary-key order, ``BATCH`` rows per query
+(``WHERE id > last ORDER BY id LIMIT ?``), and each batch is written out
+before the next one is read. Memory stays flat no matter the table size,
+with no COUNT(*) and no OFFSET. Between batches the pooled connection is
+released, so a slow download neither holds a pool slot nor keeps a read
+snapshot open, which would stop WAL checkpoints.
+"""
+import csv
+import io
+import json
+from typing import Dict, Iterator, List, Optional
+
+import db
+
+BATCH = 1000
+FORMATS = {'csv': 'text/csv; charset=utf-8', 'ndjson': 'application/x-ndjson'}
+
+
+class Export:
+    __slots__ = ('select_sql', 'key', 'status_column', 'columns')
+
+    def __init__(self, select_sql: str, key: str, columns: List[str], status_column: Optional[str] = None):
+        self.select_sql = select_sql
+        self.key = key
+        self.columns = columns
+        self.status_column = status_column
+
+    def batches(self, status: Optional[str] = None, batch: int = BATCH) -> Iterator[List[tuple]]:
+        conditions, params = [f'{self.key} > ?'], [0]
+        if status and self.status_column:
+            # Unar '+': status indeksi + har partiyada saralash o'rniga kalit bo'yicha yurish
+            conditions.append(f'+{self.status_column} = ?')
+            params.append(status)
+        sql = f"{self.select_sql} WHERE {' AND '.join(conditions)} ORDER BY {self.key} LIMIT ?"
+        while True:
+            # Kalit birinchi ustun: keyingi partiya shu qiymatdan boshlanadi
+            rows = [tuple(row) for row in db.fetchall(sql, params + [batch])]
+            if rows:
+                yield rows
+            if len(rows) < batch:
+                return
+            params[0] = rows[-1][0]
+
+
+EXPORTS: Dict[str, Export] = {
+    'users': Export(
+        'SELECT user_id, username, first_name, last_name, phone, gender, birth_date, bio, joined_at, '
+        'is_admin, is_active FROM users',
+        'user_id',
+        ['user_id', 'username', 'first_name', 'last_name', 'phone', 'gender', 'birth_date', 'bio', 'joined_at',
+         'is_admin', 'is_active']),
+    'startups': Export(
+        'SELECT s.startup_id, s.name, s.description, s.logo, s.group_link, s.owner_id, u.username, '
+        'u.first_name, u.last_name, s.status, s.created_at, s.started_at, s.ended_at, s.results, s.views '
+        'FROM startups s JOIN users u ON s.owner_id = u.user_id',
+        's.startup_id',
+        ['startup_id', 'name', 'description', 'logo', 'group_link', 'owner_id', 'owner_username',
+         'owner_first_name', 'owner_last_name', 'status', 'created_at', 'started_at', 'ended_at', 'results',
+         'views'],
+        status_column='s.status'),
+    'members': Export(
+        'SELECT m.id, m.startup_id, s.name, m.user_id, u.username, u.first_name, u.last_name, m.status, '
+        'm.joined_at FROM startup_members m JOIN startups s ON m.startup_id = s.startup_id '
+        'JOIN users u ON m.user_id = u.user_id',
+        'm.id',
+        ['id', 'startup_id', 'startup_name', 'user_id', 'username', 'first_name', 'last_name', 'status',
+         'joined_at'],
+        status_column='m.status'),
+}
+
+
+def stream(name: str, fmt: str = 'csv', status: Optional[str] = None) -> Iterator[str]:
+    """Yield the export as text chunks, one chunk per batch (CSV starts with a header)."""
+    export = EXPORTS[name]
+    if fmt == 'csv':
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(export.columns)
+        for rows in export.batches(status):
+            writer.writerows(rows)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+    elif fmt == 'ndjson':
+        columns = export.columns
+        for rows in export.batches(status):
+            yield ''.join(json.dumps(dict(zip(columns, row)), ensure_ascii=False, default=str) + '\n'
+                          for row in rows)
+    else:
+        raise ValueError(f'unknown export format: {fmt!r}')
@@ -0,0 +1,41 @@
+# gunicorn.conf.py
+"""Gunicorn settings for the web panel (``gunicorn -c gunicorn.conf.py main:app``).
+
+By default the app is preloaded: the master imports main.py, migrates
+the schema and fills the catalogue and dashboard caches once, then forks
+``WEB_CONCURRENCY`` gthread workers that inherit them. SQLite connections
+are closed before every fork. Each worker opens its own, and WAL lets
+their readers run alongside the one writer.
+
+After a write, the first worker to see the new version rebuilds the
+catalogue or dashboard and stores it in ``shared_snapshots``. The other
+workers load it from there (snapshots.SharedStore).
+
+``WEB_WORKER_CLASS=gevent`` needs the gevent package. Preload is then off
+by default, because the master must not import the app before gevent
+patches it. SQLite calls still block the event loop, so gthread is the
+better default.
+"""
+import multiprocessing
+import os
+
+worker_class = os.getenv('WEB_WORKER_CLASS', 'gthread')
+# Webhook rejimida chat tartibi jarayon ichida saqlanadi: bitta ishchi
+workers = int(os.getenv('WEB_CONCURRENCY') or (1 if os.getenv('WEBHOOK_URL') else multiprocessing.cpu_count()))
+threads = int(os.getenv('WEB_THREADS', '32'))
+preload_app = os.getenv('WEB_PRELOAD', '0' if worker_class == 'gevent' else '1') == '1'
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+timeout = 60
+keepalive = 5
+
+
+def when_ready(server):
+    if server.cfg.preload_app:
+        import main
+        main.warm_caches()
+
+
+def pre_fork(server, worker):
+    if server.cfg.preload_app:
+        import main
+        main.before_fork()
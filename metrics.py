@@ -0,0 +1,282 @@
+# metrics.py
+"""In-process metrics in the Prometheus text format (no client library needed).
+
+Counters, gauges and fixed-bucket histograms keyed by label values. The
+``instrument_*`` helpers wrap bot handlers, Telegram API requests and the
+db.py query helpers. Each wrapper records:
+
+- a latency histogram,
+- an error counter labelled with the exception type (or the Telegram
+  error code),
+- an in-flight gauge.
+
+A wrapped call adds a few microseconds: two ``perf_counter()`` calls, a
+bisect and three short locks.
+
+State that already lives elsewhere (cache hit counters, queue depths)
+is registered with a ``read`` callback and sampled at scrape time. With
+labels, the callback returns ``{label values: value}``.
+
+Each process keeps its own registry. The web process exposes it on
+``/metrics``. The polling bot process can expose its own on
+``METRICS_PORT`` via ``serve()``.
+"""
+import functools
+import sys
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+registry: List['Metric'] = []
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence) -> str:
+    if not names:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + '}'
+
+
+def _number(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    kind = ''
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+        registry.append(self)
+
+    def samples(self) -> Iterable[Tuple[str, str, float]]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} {self.kind}']
+        lines += [f'{self.name}{suffix}{labels} {_number(value)}' for suffix, labels, value in self.samples()]
+        return '\n'.join(lines)
+
+
+def _read_samples(read: Callable, labels: Sequence[str], suffix: str = ''):
+    # Yorliqli o'lchovda read() {yorliq qiymatlari: son} qaytaradi
+    if not labels:
+        return [(suffix, '', read())]
+    return [(suffix, _format_labels(labels, key), value) for key, value in sorted(read().items())]
+
+
+class Counter(Metric):
+    """Counter; with ``read`` the running totals are taken from a callback at scrape time."""
+    kind = 'counter'
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (),
+                 read: Optional[Callable[[], object]] = None):
+        super().__init__(name, help, labels)
+        self.read = read
+        self._values: Dict[tuple, float] = {}
+
+    def inc(self, *labels, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels) -> float:
+        return self._values.get(labels, 0)
+
+    def samples(self):
+        if self.read is not None:
+            return _read_samples(self.read, self.labels, '_total')
+        with self._lock:
+            items = list(self._values.items())
+        return [('_total', _format_labels(self.labels, key), value) for key, value in sorted(items)]
+
+
+class Gauge(Metric):
+    """Settable gauge; with ``read`` it is sampled from a callback at scrape time instead."""
+    kind = 'gauge'
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (),
+                 read: Optional[Callable[[], object]] = None):
+        super().__init__(name, help, labels)
+        self.read = read
+        self._values: Dict[tuple, float] = {}
+
+    def inc(self, *labels, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, *labels):
+        with self._lock:
+            self._values[labels] -= 1
+
+    def set(self, value: float, *labels):
+        with self._lock:
+            self._values[labels] = value
+
+    def samples(self):
+        if self.read is not None:
+            return _read_samples(self.read, self.labels)
+        with self._lock:
+            items = list(self._values.items())
+        return [('', _format_labels(self.labels, key), value) for key, value in sorted(items)]
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(buckets)
+        # label qiymatlari -> [har bir oraliq soni..., +Inf soni, yig'indi]
+        self._values: Dict[tuple, list] = {}
+
+    def observe(self, value: float, *labels):
+        i = bisect_left(self.buckets, value)
+        entry = self._values.get(labels)
+        if entry is None:
+            with self._lock:
+                entry = self._values.setdefault(labels, [0] * (len(self.buckets) + 1) + [0.0])
+        with self._lock:
+            entry[i] += 1
+            entry[-1] += value
+
+    def count(self, *labels) -> int:
+        entry = self._values.get(labels)
+        return sum(entry[:-1]) if entry else 0
+
+    def samples(self):
+        with self._lock:
+            items = [(key, list(entry)) for key, entry in self._values.items()]
+        out = []
+        for key, entry in sorted(items):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), entry[:-1]):
+                cumulative += count
+                out.append(('_bucket', _format_labels(self.labels + ('le',), key + (_number(bound),)),
+                            cumulative))
+            out.append(('_sum', _format_labels(self.labels, key), entry[-1]))
+            out.append(('_count', _format_labels(self.labels, key), cumulative))
+        return out
+
+
+def render() -> str:
+    return '\n'.join(metric.render() for metric in registry) + '\n'
+
+
+# ==================== O'LCHOVLAR ====================
+handler_seconds = Histogram('garajhub_handler_seconds', 'Bot handler latency', ['handler'])
+handler_errors = Counter('garajhub_handler_errors', 'Bot handler exceptions', ['handler', 'error'])
+handlers_in_flight = Gauge('garajhub_handlers_in_flight', 'Bot handlers currently running', ['handler'])
+
+telegram_seconds = Histogram('garajhub_telegram_request_seconds', 'Telegram Bot API request latency', ['method'])
+telegram_errors = Counter('garajhub_telegram_errors', 'Failed Telegram Bot API requests', ['method', 'error'])
+telegram_in_flight = Gauge('garajhub_telegram_requests_in_flight', 'Telegram Bot API requests in progress',
+                           ['method'])
+
+db_seconds = Histogram('garajhub_db_query_seconds', 'SQLite query latency by calling function', ['query'])
+db_errors = Counter('garajhub_db_errors', 'Failed SQLite queries', ['query', 'error'])
+db_in_flight = Gauge('garajhub_db_queries_in_flight', 'SQLite queries in progress', ['query'])
+
+
+def _error_label(error: BaseException) -> str:
+    # Telegram xatolarida kod (429, 403...) sinf nomidan foydaliroq
+    code = getattr(error, 'error_code', None)
+    return str(code) if code is not None else type(error).__name__
+
+
+def timed(fn: Callable, label: Callable[..., str], histogram: Histogram, errors: Counter,
+          in_flight: Gauge) -> Callable:
+    """Wrap ``fn``; ``label(*args, **kwargs)`` names the call for all three metrics."""
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        name = label(*args, **kwargs)
+        in_flight.inc(name)
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        except BaseException as e:
+            errors.inc(name, _error_label(e))
+            raise
+        finally:
+            histogram.observe(time.perf_counter() - start, name)
+            in_flight.dec(name)
+    wrapper.instrumented = True
+    return wrapper
+
+
+def _instrument_handler(fn: Callable, name: str) -> Callable:
+    if getattr(fn, 'instrumented', False):
+        return fn
+    return timed(fn, lambda *args, **kwargs: name, handler_seconds, handler_errors, handlers_in_flight)
+
+
+def instrument_bot(bot, routes: Optional[Dict] = None, steps: Optional[Dict] = None):
+    """Wrap every registered telebot handler, callback route and conversation step."""
+    for attr, handlers in vars(bot).items():
+        if attr.endswith('_handlers') and isinstance(handlers, list):
+            for handler in handlers:
+                if isinstance(handler, dict) and 'function' in handler:
+                    handler['function'] = _instrument_handler(handler['function'], handler['function'].__name__)
+    for action, (fn, arg_types) in (routes or {}).items():
+        routes[action] = (_instrument_handler(fn, f'callback:{action}'), arg_types)
+    for step, fn in (steps or {}).items():
+        steps[step] = _instrument_handler(fn, f'step:{step}')
+
+
+def instrument_telegram(apihelper):
+    """Time every Bot API request by method (``apihelper._make_request``)."""
+    if getattr(apihelper._make_request, 'instrumented', False):
+        return
+    apihelper._make_request = timed(apihelper._make_request, lambda token, method_name, *a, **k: method_name,
+                                    telegram_seconds, telegram_errors, telegram_in_flight)
+
+
+def _caller(*args, **kwargs) -> str:
+    # db.py dan tashqaridagi birinchi funksiya: get_user, save_user, ...
+    frame = sys._getframe(2)
+    while frame is not None and frame.f_globals.get('__name__') in ('db', __name__):
+        frame = frame.f_back
+    return frame.f_code.co_name if frame is not None else '?'
+
+
+def instrument_db(db, names: Sequence[str] = ('fetchone', 'fetchall', 'execute')):
+    """Time the db.py helpers, labelled by the function that issued the query."""
+    for name in names:
+        fn = getattr(db, name)
+        if not getattr(fn, 'instrumented', False):
+            setattr(db, name, timed(fn, _caller, db_seconds, db_errors, db_in_flight))
+
+
+def serve(port: int, host: str = '0.0.0.0'):
+    """Expose /metrics from a process without Flask (the polling bot)."""
+    # http.server faqat shu rejimda kerak: importi web va ishchi jarayonlarni sekinlashtirmaydi
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path != '/metrics':
+                self.send_error(404)
+                return
+            body = render().encode()
+            self.send_response(200)
+            self.send_header('Content-Type', CONTENT_TYPE)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name='metrics', daemon=True).start()
+    return server
@@ -0,0 +1,505 @@
+# migrations.py
+"""Numbered schema migrations tracked in ``PRAGMA user_version``.
+
+    python migrations.py          # apply pending migrations
+    python migrations.py check    # fail if a hot query falls back to a table scan or loses its index
+"""
+import logging
+import sqlite3
+import sys
+from typing import List, Tuple
+
+import db
+import pagination
+
+# (versiya, nomi, SQL). Har bir qadam qayta ishga tushirilsa ham xavfsiz bo'lishi kerak.
+MIGRATIONS: List[Tuple[int, str, str]] = [
+    (1, 'base schema', '''
+        CREATE TABLE IF NOT EXISTS users (
+            user_id INTEGER PRIMARY KEY,
+            username TEXT,
+            first_name TEXT,
+            last_name TEXT DEFAULT '',
+            phone TEXT DEFAULT '',
+            gender TEXT DEFAULT '',
+            birth_date TEXT DEFAULT '',
+            bio TEXT DEFAULT '',
+            joined_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            is_admin BOOLEAN DEFAULT 0
+        );
+
+        -- Adminlar uchun tokenlar
+        CREATE TABLE IF NOT EXISTS admin_tokens (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            token TEXT UNIQUE,
+            user_id INTEGER,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            expires_at TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users (user_id)
+        );
+
+        -- Startuplar
+        CREATE TABLE IF NOT EXISTS startups (
+            startup_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            description TEXT,
+            logo TEXT,
+            group_link TEXT NOT NULL,
+            owner_id INTEGER NOT NULL,
+            status TEXT DEFAULT 'pending',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            started_at TIMESTAMP,
+            ended_at TIMESTAMP,
+            results TEXT,
+            views INTEGER DEFAULT 0,
+            FOREIGN KEY (owner_id) REFERENCES users (user_id)
+        );
+
+        -- Startup a'zolari
+        CREATE TABLE IF NOT EXISTS startup_members (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            startup_id INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            status TEXT DEFAULT 'pending',
+            joined_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (startup_id) REFERENCES startups (startup_id),
+            FOREIGN KEY (user_id) REFERENCES users (user_id),
+            UNIQUE(startup_id, user_id)
+        );
+
+        -- Web admin sessiyalari
+        CREATE TABLE IF NOT EXISTS web_sessions (
+            session_id TEXT PRIMARY KEY,
+            user_id INTEGER,
+            data TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            expires_at TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users (user_id)
+        );
+    '''),
+    (2, 'hot path indexes', '''
+        -- Startuplar lentasi va admin ro'yxati: WHERE status = ? ORDER BY created_at DESC
+        CREATE INDEX IF NOT EXISTS idx_startups_status_created
+            ON startups (status, created_at DESC, startup_id DESC);
+        -- /api/startups?status=all va get_recent_startups
+        CREATE INDEX IF NOT EXISTS idx_startups_created
+            ON startups (created_at DESC, startup_id DESC);
+        -- get_startups_by_owner
+        CREATE INDEX IF NOT EXISTS idx_startups_owner_created
+            ON startups (owner_id, created_at DESC);
+        -- A'zolar soni va kutilayotgan so'rovlar
+        CREATE INDEX IF NOT EXISTS idx_members_startup_status
+            ON startup_members (startup_id, status);
+        CREATE INDEX IF NOT EXISTS idx_members_status
+            ON startup_members (status);
+        -- get_recent_users va /api/users
+        CREATE INDEX IF NOT EXISTS idx_users_joined
+            ON users (joined_at DESC, user_id DESC);
+        -- Muddati o'tgan sessiyalarni topish
+        CREATE INDEX IF NOT EXISTS idx_web_sessions_expires
+            ON web_sessions (expires_at);
+    '''),
+    (3, 'statistics counters', '''
+        -- get_statistics uchun bitta qator; triggerlar yozish paytida yangilab boradi
+        CREATE TABLE IF NOT EXISTS stats (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            total_users INTEGER NOT NULL DEFAULT 0,
+            total_startups INTEGER NOT NULL DEFAULT 0,
+            active_startups INTEGER NOT NULL DEFAULT 0,
+            pending_startups INTEGER NOT NULL DEFAULT 0,
+            completed_startups INTEGER NOT NULL DEFAULT 0,
+            total_members INTEGER NOT NULL DEFAULT 0,
+            pending_requests INTEGER NOT NULL DEFAULT 0
+        );
+        INSERT OR REPLACE INTO stats (id, total_users, total_startups, active_startups, pending_startups,
+                                      completed_startups, total_members, pending_requests)
+        SELECT 1,
+            (SELECT COUNT(*) FROM users),
+            (SELECT COUNT(*) FROM startups),
+            (SELECT COUNT(*) FROM startups WHERE status = 'active'),
+            (SELECT COUNT(*) FROM startups WHERE status = 'pending'),
+            (SELECT COUNT(*) FROM startups WHERE status = 'completed'),
+            (SELECT COUNT(*) FROM startup_members),
+            (SELECT COUNT(*) FROM startup_members WHERE status = 'pending');
+
+        CREATE TRIGGER IF NOT EXISTS trg_users_insert_stats AFTER INSERT ON users BEGIN
+            UPDATE stats SET total_users = total_users + 1 WHERE id = 1;
+        END;
+        CREATE TRIGGER IF NOT EXISTS trg_users_delete_stats AFTER DELETE ON users BEGIN
+            UPDATE stats SET total_users = total_users - 1 WHERE id = 1;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_startups_insert_stats AFTER INSERT ON startups BEGIN
+            UPDATE stats SET
+                total_startups = total_startups + 1,
+                active_startups = active_startups + (NEW.status = 'active'),
+                pending_startups = pending_startups + (NEW.status = 'pending'),
+                completed_startups = completed_startups + (NEW.status = 'completed')
+            WHERE id = 1;
+        END;
+        CREATE TRIGGER IF NOT EXISTS trg_startups_delete_stats AFTER DELETE ON startups BEGIN
+            UPDATE stats SET
+                total_startups = total_startups - 1,
+                active_startups = active_startups - (OLD.status = 'active'),
+                pending_startups = pending_startups - (OLD.status = 'pending'),
+                completed_startups = completed_startups - (OLD.status = 'completed')
+            WHERE id = 1;
+        END;
+        CREATE TRIGGER IF NOT EXISTS trg_startups_status_stats AFTER UPDATE OF status ON startups
+        WHEN OLD.status IS NOT NEW.status BEGIN
+            UPDATE stats SET
+                active_startups = active_startups + (NEW.status = 'active') - (OLD.status = 'active'),
+                pending_startups = pending_startups + (NEW.status = 'pending') - (OLD.status = 'pending'),
+                completed_startups = completed_startups + (NEW.status = 'completed') - (OLD.status = 'completed')
+            WHERE id = 1;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_members_insert_stats AFTER INSERT ON startup_members BEGIN
+            UPDATE stats SET
+                total_members = total_members + 1,
+                pending_requests = pending_requests + (NEW.status = 'pending')
+            WHERE id = 1;
+        END;
+        CREATE TRIGGER IF NOT EXISTS trg_members_delete_stats AFTER DELETE ON startup_members BEGIN
+            UPDATE stats SET
+                total_members = total_members - 1,
+                pending_requests = pending_requests - (OLD.status = 'pending')
+            WHERE id = 1;
+        END;
+        CREATE TRIGGER IF NOT EXISTS trg_members_status_stats AFTER UPDATE OF status ON startup_members
+        WHEN OLD.status IS NOT NEW.status BEGIN
+            UPDATE stats SET
+                pending_requests = pending_requests + (NEW.status = 'pending') - (OLD.status = 'pending')
+            WHERE id = 1;
+        END;
+    '''),
+    (4, 'durable broadcast jobs', '''
+        -- Bot bloklangan foydalanuvchilar keyingi xabarlarda o'tkazib yuboriladi
+        ALTER TABLE users ADD COLUMN is_active BOOLEAN DEFAULT 1;
+
+        CREATE TABLE IF NOT EXISTS broadcast_jobs (
+            job_id TEXT PRIMARY KEY,
+            text TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'running',
+            total INTEGER NOT NULL DEFAULT 0,
+            sent INTEGER NOT NULL DEFAULT 0,
+            failed INTEGER NOT NULL DEFAULT 0,
+            owner TEXT,
+            lease_until REAL,
+            created_at REAL,
+            finished_at REAL
+        );
+        CREATE INDEX IF NOT EXISTS idx_broadcast_jobs_status
+            ON broadcast_jobs (status, lease_until);
+
+        CREATE TABLE IF NOT EXISTS broadcast_recipients (
+            job_id TEXT NOT NULL,
+            user_id INTEGER NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',
+            error TEXT,
+            PRIMARY KEY (job_id, user_id)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS idx_broadcast_recipients_status
+            ON broadcast_recipients (job_id, status);
+    '''),
+    (5, 'conversation state', '''
+        -- Ko'p bosqichli dialoglar (startup yaratish, profil tahrirlash) holati
+        CREATE TABLE IF NOT EXISTS conversations (
+            chat_id INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            step TEXT NOT NULL,
+            data TEXT NOT NULL DEFAULT '{}',
+            updated_at REAL NOT NULL,
+            expires_at REAL NOT NULL,
+            PRIMARY KEY (chat_id, user_id)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS idx_conversations_expires
+            ON conversations (expires_at);
+    '''),
+    (6, 'active catalogue version', '''
+        -- Xotiradagi faol startuplar katalogi (catalogue.py) eskirganini bilish uchun
+        ALTER TABLE stats ADD COLUMN catalogue_version INTEGER NOT NULL DEFAULT 0;
+
+        CREATE TRIGGER IF NOT EXISTS trg_startups_insert_catalogue AFTER INSERT ON startups
+        WHEN NEW.status = 'active' BEGIN
+            UPDATE stats SET catalogue_version = catalogue_version + 1 WHERE id = 1;
+        END;
+        CREATE TRIGGER IF NOT EXISTS trg_startups_delete_catalogue AFTER DELETE ON startups
+        WHEN OLD.status = 'active' BEGIN
+            UPDATE stats SET catalogue_version = catalogue_version + 1 WHERE id = 1;
+        END;
+        CREATE TRIGGER IF NOT EXISTS trg_startups_update_catalogue AFTER UPDATE ON startups
+        WHEN OLD.status = 'active' OR NEW.status = 'active' BEGIN
+            UPDATE stats SET catalogue_version = catalogue_version + 1 WHERE id = 1;
+        END;
+        CREATE TRIGGER IF NOT EXISTS trg_owner_name_catalogue AFTER UPDATE OF first_name, last_name ON users
+        WHEN (OLD.first_name IS NOT NEW.first_name OR OLD.last_name IS NOT NEW.last_name)
+            AND EXISTS (SELECT 1 FROM startups WHERE owner_id = NEW.user_id AND status = 'active') BEGIN
+            UPDATE stats SET catalogue_version = catalogue_version + 1 WHERE id = 1;
+        END;
+    '''),
+    (7, 'startup row version', '''
+        -- Startup kartochkalari keshi (startup_id, version) bo'yicha ishlaydi
+        ALTER TABLE startups ADD COLUMN version INTEGER NOT NULL DEFAULT 0;
+
+        CREATE TRIGGER IF NOT EXISTS trg_startups_version AFTER UPDATE ON startups
+        WHEN NEW.version = OLD.version BEGIN
+            UPDATE startups SET version = OLD.version + 1 WHERE startup_id = NEW.startup_id;
+        END;
+        -- Kartochkada muallif ismi ham bor
+        CREATE TRIGGER IF NOT EXISTS trg_owner_name_version AFTER UPDATE OF first_name, last_name ON users
+        WHEN OLD.first_name IS NOT NEW.first_name OR OLD.last_name IS NOT NEW.last_name BEGIN
+            UPDATE startups SET version = version + 1 WHERE owner_id = NEW.user_id;
+        END;
+    '''),
+    (8, 'startup search', '''
+        -- Nom va tavsif bo'yicha to'liq matnli qidiruv (search.py); matn startups jadvalida qoladi
+        CREATE VIRTUAL TABLE IF NOT EXISTS startups_fts USING fts5(
+            name, description,
+            content = 'startups', content_rowid = 'startup_id',
+            tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'
+        );
+        INSERT INTO startups_fts (startups_fts) VALUES ('rebuild');
+
+        CREATE TRIGGER IF NOT EXISTS trg_startups_insert_fts AFTER INSERT ON startups BEGIN
+            INSERT INTO startups_fts (rowid, name, description) VALUES (NEW.startup_id, NEW.name, NEW.description);
+        END;
+        CREATE TRIGGER IF NOT EXISTS trg_startups_delete_fts AFTER DELETE ON startups BEGIN
+            INSERT INTO startups_fts (startups_fts, rowid, name, description)
+            VALUES ('delete', OLD.startup_id, OLD.name, OLD.description);
+        END;
+        CREATE TRIGGER IF NOT EXISTS trg_startups_update_fts AFTER UPDATE OF name, description ON startups BEGIN
+            INSERT INTO startups_fts (startups_fts, rowid, name, description)
+            VALUES ('delete', OLD.startup_id, OLD.name, OLD.description);
+            INSERT INTO startups_fts (rowid, name, description) VALUES (NEW.startup_id, NEW.name, NEW.description);
+        END;
+    '''),
+    (9, 'admin token expiry index', '''
+        -- Muddati o'tgan admin tokenlarini tozalash (sessions.py)
+        CREATE INDEX IF NOT EXISTS idx_admin_tokens_expires
+            ON admin_tokens (expires_at);
+    '''),
+    (10, 'dashboard data version', '''
+        -- /api/dashboard ETag: foydalanuvchi, startup yoki a'zolikdagi har qanday o'zgarish
+        ALTER TABLE stats ADD COLUMN data_version INTEGER NOT NULL DEFAULT 0;
+
+        CREATE TRIGGER IF NOT EXISTS trg_users_insert_data_version AFTER INSERT ON users BEGIN
+            UPDATE stats SET data_version = data_version + 1 WHERE id = 1;
+        END;
+        CREATE TRIGGER IF NOT EXISTS trg_users_update_data_version AFTER UPDATE ON users BEGIN
+            UPDATE stats SET data_version = data_version + 1 WHERE id = 1;
+        END;
+        CREATE TRIGGER IF NOT EXISTS trg_users_delete_data_version AFTER DELETE ON users BEGIN
+            UPDATE stats SET data_version = data_version + 1 WHERE id = 1;
+        END;
+        CREATE TRIGGER IF NOT EXISTS trg_startups_insert_data_version AFTER INSERT ON startups BEGIN
+            UPDATE stats SET data_version = data_version + 1 WHERE id = 1;
+        END;
+        CREATE TRIGGER IF NOT EXISTS trg_startups_update_data_version AFTER UPDATE ON startups BEGIN
+            UPDATE stats SET data_version = data_version + 1 WHERE id = 1;
+        END;
+        CREATE TRIGGER IF NOT EXISTS trg_startups_delete_data_version AFTER DELETE ON startups BEGIN
+            UPDATE stats SET data_version = data_version + 1 WHERE id = 1;
+        END;
+        CREATE TRIGGER IF NOT EXISTS trg_startup_members_insert_data_version AFTER INSERT ON startup_members BEGIN
+            UPDATE stats SET data_version = data_version + 1 WHERE id = 1;
+        END;
+        CREATE TRIGGER IF NOT EXISTS trg_startup_members_update_data_version AFTER UPDATE ON startup_members BEGIN
+            UPDATE stats SET data_version = data_version + 1 WHERE id = 1;
+        END;
+        CREATE TRIGGER IF NOT EXISTS trg_startup_members_delete_data_version AFTER DELETE ON startup_members BEGIN
+            UPDATE stats SET data_version = data_version + 1 WHERE id = 1;
+        END;
+    '''),
+    (11, 'shared snapshots', '''
+        -- Jarayonlar orasida umumiy kesh (snapshots.SharedStore): nom bo'yicha oxirgi versiya
+        CREATE TABLE IF NOT EXISTS shared_snapshots (
+            name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL,
+            body BLOB NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+    '''),
+    (12, 'search query keys', '''
+        -- callback_data ga sig'maydigan qidiruv so'rovlari: tugmada faqat qisqa kalit (search.py)
+        CREATE TABLE IF NOT EXISTS search_queries (
+            query_key TEXT PRIMARY KEY,
+            query TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+    '''),
+    (13, 'shared rate limits', '''
+        -- Barcha jarayonlar uchun bitta token bucket (broadcast.SharedTokenBucket)
+        CREATE TABLE IF NOT EXISTS rate_limits (
+            name TEXT PRIMARY KEY,
+            tokens REAL NOT NULL,
+            updated REAL NOT NULL,
+            paused_until REAL NOT NULL DEFAULT 0
+        );
+    '''),
+    (14, 'startup version in the write path', '''
+        -- Trigger ichidagi qayta UPDATE boshqa AFTER UPDATE triggerlarini ikkinchi marta ishga tushirardi:
+        -- version endi main.update_startup_status dagi o'sha UPDATE da oshiriladi
+        DROP TRIGGER IF EXISTS trg_startups_version;
+    '''),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+# main.get_startups_page / get_users_page: pagination.keyset_sql bilan bir xil so'rovlar
+_STARTUP_LIST_SQL = '''
+    SELECT s.*, u.first_name, u.last_name, u.username
+    FROM startups s
+    JOIN users u ON s.owner_id = u.user_id
+'''
+_KEYSET_PAGES = {
+    # nom: (SELECT, shartlar, shart parametrlari, kalit ustunlar, kutilgan indeks)
+    'startups_page_status': (_STARTUP_LIST_SQL, ['s.status = ?'], ['pending'],
+                             ('s.created_at', 's.startup_id'), 'idx_startups_status_created'),
+    'startups_page_all': (_STARTUP_LIST_SQL, [], [], ('s.created_at', 's.startup_id'), 'idx_startups_created'),
+    'users_page': ('SELECT * FROM users', [], [], ('joined_at', 'user_id'), 'idx_users_joined'),
+}
+_CURSOR = ('2025-01-01 00:00:00', 1)
+# Birinchi sahifa, "keyingi" (kursordan keyin) va "oldingi" (kursordan oldin)
+_KEYSET_QUERIES = {
+    f'{name}{suffix}': (pagination.keyset_sql(select_sql, conditions, key_columns, before), (*params, *cursor, 11))
+    for name, (select_sql, conditions, params, key_columns, _) in _KEYSET_PAGES.items()
+    for suffix, before, cursor in (('', None, ()), (' next', False, _CURSOR), (' prev', True, _CURSOR))
+}
+# Shu so'rovlar aynan shu indeks bilan bajarilishi kerak
+EXPECTED_INDEXES = {name: _KEYSET_PAGES[name.split()[0]][-1] for name in _KEYSET_QUERIES}
+
+
+# Indeks bilan bajarilishi shart bo'lgan so'rovlar (parametrlar bilan)
+HOT_QUERIES = {
+    **_KEYSET_QUERIES,
+    'get_recent_startups': ('''
+        SELECT s.*, u.first_name, u.last_name, u.username
+        FROM startups s JOIN users u ON s.owner_id = u.user_id
+        ORDER BY s.created_at DESC LIMIT ?
+    ''', (10,)),
+    'get_startups_by_owner': (
+        'SELECT * FROM startups WHERE owner_id = ? ORDER BY created_at DESC', (1,)),
+    'get_join_request_id': (
+        'SELECT id FROM startup_members WHERE startup_id = ? AND user_id = ?', (1, 1)),
+    'get_member_count': (
+        'SELECT COUNT(*) FROM startup_members WHERE startup_id = ? AND status = "accepted"', (1,)),
+    'get_recent_users': (
+        'SELECT * FROM users ORDER BY joined_at DESC LIMIT ?', (10,)),
+    'validate_web_session': (
+        'SELECT user_id, expires_at FROM web_sessions WHERE session_id = ? AND expires_at > ?', ('x', 0)),
+    'get_statistics': (
+        'SELECT * FROM stats WHERE id = 1', ()),
+    'catalogue_version': (
+        'SELECT catalogue_version FROM stats WHERE id = 1', ()),
+    'export_users': (
+        'SELECT user_id FROM users WHERE user_id > ? ORDER BY user_id LIMIT ?', (0, 1000)),
+    'export_startups': ('''
+        SELECT s.startup_id FROM startups s JOIN users u ON s.owner_id = u.user_id
+        WHERE s.startup_id > ? AND +s.status = ? ORDER BY s.startup_id LIMIT ?
+    ''', (0, 'active', 1000)),
+    'export_members': ('''
+        SELECT m.id FROM startup_members m JOIN startups s ON m.startup_id = s.startup_id
+        JOIN users u ON m.user_id = u.user_id
+        WHERE m.id > ? ORDER BY m.id LIMIT ?
+    ''', (0, 1000)),
+    'dashboard_data_version': (
+        'SELECT data_version FROM stats WHERE id = 1', ()),
+    'load_active_catalogue': ('''
+        SELECT s.startup_id, s.name, s.description, s.logo, s.owner_id, s.created_at, s.version,
+               u.first_name, u.last_name
+        FROM startups s JOIN users u ON s.owner_id = u.user_id
+        WHERE s.status = 'active'
+        ORDER BY s.created_at, s.startup_id
+    ''', ()),
+    'pending_broadcast_recipients': (
+        'SELECT user_id FROM broadcast_recipients WHERE job_id = ? AND status = "pending"', ('x',)),
+    'orphaned_broadcast_jobs': (
+        'SELECT * FROM broadcast_jobs WHERE status = "running" AND lease_until < ?', (0,)),
+    'get_conversation': (
+        'SELECT step, data, expires_at FROM conversations WHERE chat_id = ? AND user_id = ?', (1, 1)),
+    'expired_conversations': (
+        'SELECT chat_id, user_id FROM conversations WHERE expires_at <= ? LIMIT ?', (0, 500)),
+    # bm25 bo'yicha saralash har doim vaqtinchalik B-tree talab qiladi, shuning uchun ORDER BY siz
+    'search_startups': ('''
+        SELECT startups_fts.rowid FROM startups_fts
+        JOIN startups s ON s.startup_id = startups_fts.rowid
+        WHERE startups_fts MATCH ? AND +s.status = ?
+        LIMIT ?
+    ''', ('"garaj"*', 'active', 1000)),
+    'expired_web_sessions': (
+        'SELECT session_id FROM web_sessions WHERE expires_at <= ? LIMIT ?', (0, 500)),
+    'expired_admin_tokens': (
+        'SELECT id FROM admin_tokens WHERE expires_at <= ? LIMIT ?', (0, 500)),
+    'shared_snapshot': (
+        'SELECT body FROM shared_snapshots WHERE name = ? AND version = ?', ('catalogue', 1)),
+    'search_query_key': (
+        'SELECT query FROM search_queries WHERE query_key = ?', ('x',)),
+    'rate_limit': (
+        'SELECT tokens, updated, paused_until FROM rate_limits WHERE name = ?', ('broadcast',)),
+}
+
+
+def current_version() -> int:
+    return db.fetchvalue('PRAGMA user_version', default=0)
+
+
+def _statements(sql: str) -> List[str]:
+    """Split a migration script into statements (trigger bodies stay whole)."""
+    statements, buffer = [], ''
+    for chunk in sql.split(';')[:-1]:
+        buffer += chunk + ';'
+        if sqlite3.complete_statement(buffer):
+            statements.append(buffer.strip())
+            buffer = ''
+    return statements
+
+
+def migrate() -> int:
+    """Apply every migration newer than ``user_version``; return the final version."""
+    version = current_version()
+    if version >= MIGRATIONS[-1][0]:
+        # Sxema joriy: jarayon ishga tushganda yozish qulfi olinmaydi
+        return version
+    for number, name, sql in MIGRATIONS:
+        if number <= version:
+            continue
+        with db.transaction() as conn:
+            # Bir nechta jarayon bir vaqtda ishga tushsa: versiyani yozish qulfi ostida qayta o'qiymiz
+            if conn.execute('PRAGMA user_version').fetchone()[0] >= number:
+                continue
+            for statement in _statements(sql):
+                conn.execute(statement)
+            conn.execute(f'PRAGMA user_version = {number}')
+        logging.info(f'Migration {number} applied: {name}')
+        version = number
+    return current_version()
+
+
+def scanning_queries() -> List[Tuple[str, str]]:
+    """Return (query name, plan detail) for every hot query that is not index-driven or misses its index."""
+    problems = []
+    with db.connection() as conn:
+        for name, (sql, params) in HOT_QUERIES.items():
+            details = [row['detail'] for row in conn.execute(f'EXPLAIN QUERY PLAN {sql}', params)]
+            for detail in details:
+                if detail.startswith('SCAN') and 'INDEX' not in detail:
+                    problems.append((name, detail))
+                elif 'TEMP B-TREE' in detail:
+                    problems.append((name, detail))
+            index = EXPECTED_INDEXES.get(name)
+            if index and not any(f'INDEX {index}' in detail for detail in details):
+                problems.append((name, f"expected {index}, got: {'; '.join(details)}"))
+    return problems
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    print(f'Schema version: {migrate()}')
+    if sys.argv[1:] == ['check']:
+        problems = scanning_queries()
+        for name, detail in problems:
+            print(f'FAIL {name}: {detail}')
+        if problems:
+            sys.exit(1)
+        print(f'OK: {len(HOT_QUERIES)} hot queries use indexes')
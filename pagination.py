@@ -0,0 +1,99 @@
+# pagination.py
+"""Keyset (cursor) pagination over ``(timestamp, id)`` ordered listings.
+
+Cursors are short opaque tokens such as ``a1kx9q2p.3f``: a direction flag
+(``a`` = rows after, ``b`` = rows before), the row timestamp as base-36
+epoch seconds and the row id in base 36. They fit comfortably inside
+Telegram's 64-byte callback_data.
+"""
+import calendar
+import string
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import db
+
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+_DIGITS = string.digits + string.ascii_lowercase
+
+
+def _b36(number: int) -> str:
+    if number == 0:
+        return '0'
+    sign = '-' if number < 0 else ''
+    number = abs(number)
+    out = []
+    while number:
+        number, rem = divmod(number, 36)
+        out.append(_DIGITS[rem])
+    return sign + ''.join(reversed(out))
+
+
+def encode_cursor(timestamp: str, row_id: int, before: bool = False) -> str:
+    seconds = calendar.timegm(time.strptime(timestamp, TIMESTAMP_FORMAT))
+    return f"{'b' if before else 'a'}{_b36(seconds)}.{_b36(row_id)}"
+
+
+def decode_cursor(token: Optional[str]) -> Optional[Tuple[bool, str, int]]:
+    """Return (before, timestamp, row_id), or None for a missing or malformed token."""
+    if not token or token[0] not in 'ab' or '.' not in token:
+        return None
+    try:
+        seconds, row_id = (int(part, 36) for part in token[1:].split('.', 1))
+    except ValueError:
+        return None
+    return token[0] == 'b', time.strftime(TIMESTAMP_FORMAT, time.gmtime(seconds)), row_id
+
+
+def keyset_sql(select_sql: str, conditions: Sequence[str], key_columns: Tuple[str, str],
+               before: Optional[bool] = None) -> str:
+    """The page query; ``before`` is None for the first page, else the cursor direction.
+
+    Parameters: ``conditions`` params, then (timestamp, id) if there is a
+    cursor, then the row limit. migrations.HOT_QUERIES checks these plans.
+    """
+    ts_col, id_col = key_columns
+    where = list(conditions)
+    if before is not None:
+        where.append(f'({ts_col}, {id_col}) {">" if before else "<"} (?, ?)')
+    order = 'ASC' if before else 'DESC'
+    sql = select_sql
+    if where:
+        sql += ' WHERE ' + ' AND '.join(where)
+    return sql + f' ORDER BY {ts_col} {order}, {id_col} {order} LIMIT ?'
+
+
+def keyset_page(select_sql: str, conditions: Sequence[str], params: Sequence[Any],
+                key_columns: Tuple[str, str], key_fields: Tuple[str, str],
+                cursor: Optional[str], per_page: int) -> Tuple[List[Dict], Optional[str], Optional[str]]:
+    """Fetch one page newest-first and return (rows, next_cursor, prev_cursor).
+
+    ``select_sql`` is the ``SELECT ... FROM ... JOIN ...`` part; ``conditions``
+    are ANDed into the WHERE clause together with the cursor bound.
+    """
+    ts_field, id_field = key_fields
+    decoded = decode_cursor(cursor)
+    args = list(params)
+    before = False
+
+    if decoded:
+        before, ts, row_id = decoded
+        args += [ts, row_id]
+
+    sql = keyset_sql(select_sql, conditions, key_columns, before if decoded else None)
+    rows = db.fetchdicts(sql, args + [per_page + 1])
+
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    if before:
+        rows.reverse()
+        has_next, has_prev = bool(rows), has_more
+    else:
+        has_next, has_prev = has_more, decoded is not None
+
+    next_cursor = prev_cursor = None
+    if rows and has_next:
+        next_cursor = encode_cursor(rows[-1][ts_field], rows[-1][id_field])
+    if rows and has_prev:
+        prev_cursor = encode_cursor(rows[0][ts_field], rows[0][id_field], before=True)
+    return rows, next_cursor, prev_cursor
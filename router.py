@@ -0,0 +1,127 @@
+# router.py
+"""Callback-data router: decode once, dispatch by dict lookup.
+
+Callback data has the compact, versioned form ``1:<action>[:<arg>...]``.
+For example, ``1:feed:3:a1kx9q2p.3f`` decodes to the ``feed`` action with
+page ``3`` and that cursor. A handler declares its argument types when it
+registers and is called as ``handler(call, *args)`` with the arguments
+already converted.
+
+Buttons sent before this format existed (``join_startup_5``,
+``pending_startups_2`` ...) keep working: an exact-match table and a
+longest-prefix trie map them onto the same actions.
+"""
+import logging
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+VERSION = '1'
+SEPARATOR = ':'
+MAX_CALLBACK_DATA = 64
+
+
+class CallbackDataError(ValueError):
+    pass
+
+
+def encode(action: str, *args: Any) -> str:
+    parts = [VERSION, action] + ['' if arg is None else str(arg) for arg in args]
+    # Oxirgi bo'sh (ixtiyoriy) argumentlarni tashlab yuboramiz
+    while len(parts) > 2 and parts[-1] == '':
+        parts.pop()
+    data = SEPARATOR.join(parts)
+    if len(data.encode()) > MAX_CALLBACK_DATA:
+        raise CallbackDataError(f'callback_data too long: {data!r}')
+    return data
+
+
+class _PrefixTrie:
+    def __init__(self):
+        self.root: Dict = {}
+
+    def insert(self, prefix: str, value: Any):
+        node = self.root
+        for char in prefix:
+            node = node.setdefault(char, {})
+        node[None] = value
+
+    def longest(self, text: str) -> Tuple[Optional[Any], int]:
+        node, found, length = self.root, None, 0
+        for i, char in enumerate(text):
+            node = node.get(char)
+            if node is None:
+                break
+            if None in node:
+                found, length = node[None], i + 1
+        return found, length
+
+
+class CallbackRouter:
+    def __init__(self):
+        self.routes: Dict[str, Tuple[Callable, Tuple[Callable, ...]]] = {}
+        self.legacy_exact: Dict[str, Tuple[str, Tuple[str, ...]]] = {}
+        self.legacy_prefixes = _PrefixTrie()
+
+    def route(self, action: str, *arg_types: Callable):
+        """Register ``handler(call, *args)`` for ``action``; ``arg_types`` convert the raw strings."""
+        if SEPARATOR in action:
+            raise CallbackDataError(f'action may not contain {SEPARATOR!r}: {action!r}')
+
+        def decorator(handler: Callable) -> Callable:
+            if action in self.routes:
+                raise CallbackDataError(f'duplicate callback action: {action!r}')
+            self.routes[action] = (handler, arg_types)
+            return handler
+        return decorator
+
+    def legacy(self, old: str, action: str, *fixed_args: str, prefix: bool = False):
+        """Map pre-router callback data onto an action.
+
+        With ``prefix=True`` the text after ``old`` is split on ``_`` and
+        appended after ``fixed_args``; otherwise ``old`` must match exactly.
+        """
+        if prefix:
+            self.legacy_prefixes.insert(old, (action, fixed_args))
+        else:
+            self.legacy_exact[old] = (action, fixed_args)
+
+    def decode(self, data: str) -> Tuple[str, List[str]]:
+        if data.startswith(VERSION + SEPARATOR):
+            parts = data.split(SEPARATOR)
+            return parts[1], parts[2:]
+        if data in self.legacy_exact:
+            action, fixed = self.legacy_exact[data]
+            return action, list(fixed)
+        found, length = self.legacy_prefixes.longest(data)
+        if found is None:
+            raise CallbackDataError(f'unknown callback data: {data!r}')
+        action, fixed = found
+        rest = data[length:]
+        if not rest:
+            return action, list(fixed)
+        # Oxirgi argument (masalan, cursor) ichida '_' bo'lishi mumkin
+        arity = len(self.routes[action][1]) - len(fixed) if action in self.routes else 0
+        return action, list(fixed) + rest.split('_', arity - 1 if arity > 0 else -1)
+
+    def resolve(self, data: str) -> Tuple[Callable, List[Any]]:
+        action, raw_args = self.decode(data)
+        route = self.routes.get(action)
+        if route is None:
+            raise CallbackDataError(f'no handler for action {action!r}')
+        handler, arg_types = route
+        if len(raw_args) > len(arg_types):
+            raise CallbackDataError(f'too many arguments for {action!r}: {raw_args!r}')
+        try:
+            args = [None if raw == '' else convert(raw) for convert, raw in zip(arg_types, raw_args)]
+        except ValueError as e:
+            raise CallbackDataError(f'bad argument for {action!r}: {e}') from e
+        return handler, args
+
+    def dispatch(self, call) -> bool:
+        """Run the handler for ``call.data``; return False if nothing matched."""
+        try:
+            handler, args = self.resolve(call.data or '')
+        except CallbackDataError as e:
+            logging.warning(f'Callback ignored: {e}')
+            return False
+        handler(call, *args)
+        return True
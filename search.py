@@ -0,0 +1,118 @@
+# search.py
+"""Full-text search over startup names and descriptions (FTS5, migration 8).
+
+User input is never passed to MATCH as is. It is split into words and
+every word becomes a quoted prefix term, so ``garaj hub`` matches
+"GarajHub loyihasi" and stray quotes or operators cannot break the
+query. Results are ranked by bm25 with name hits weighted 10x.
+
+Ranking runs on the FTS table alone and returns only ids; the page's rows
+are fetched by primary key afterwards. Snippets are cut in Python from
+the description, since FTS5 ``snippet()`` would re-walk the whole match
+list for every row. Only the best ``MAX_RESULTS`` matches are counted and
+paged; a word found in half of all startups would otherwise cost a full
+count on every page.
+
+A normalized query that does not fit in a button's callback_data is
+stored in ``search_queries`` (migration 12) under a short hash key.
+``query_key`` / ``lookup_query`` turn one into the other.
+"""
+import hashlib
+import html
+import re
+import unicodedata
+from typing import Dict, List, Optional, Tuple
+
+import db
+
+MAX_TERMS = 8
+MAX_RESULTS = 1000
+MIN_TERM_LENGTH = 2
+SNIPPET_WORDS = 12
+
+_WORD = re.compile(r'\w+', re.UNICODE)
+
+
+def normalize(text: Optional[str]) -> str:
+    """Search words as the user meant them, e.g. for echoing back or callback data."""
+    words = [w for w in _WORD.findall((text or '').lower()) if len(w) >= MIN_TERM_LENGTH]
+    return ' '.join(words[:MAX_TERMS])
+
+
+def query_key(query: str) -> str:
+    """Short stable key for ``query``; the query is stored so ``lookup_query`` can return it."""
+    key = hashlib.sha1(query.encode()).hexdigest()[:16]
+    db.execute('INSERT OR IGNORE INTO search_queries (query_key, query) VALUES (?, ?)', (key, query))
+    return key
+
+
+def lookup_query(key: str) -> Optional[str]:
+    return db.fetchvalue('SELECT query FROM search_queries WHERE query_key = ?', (key,))
+
+
+def build_query(text: Optional[str]) -> Optional[str]:
+    words = normalize(text).split()
+    if not words:
+        return None
+    return ' AND '.join(f'"{word}"*' for word in words)
+
+
+def _fold(word: str) -> str:
+    # FTS tokenizer (unicode61 remove_diacritics 2) bilan bir xil solishtirish
+    return ''.join(c for c in unicodedata.normalize('NFKD', word.lower()) if not unicodedata.combining(c))
+
+
+def snippet(text: Optional[str], query: str, words: int = SNIPPET_WORDS) -> str:
+    """HTML-escaped window of ``text`` around the first match, matches in <b>."""
+    terms = [_fold(term) for term in normalize(query).split()]
+    tokens = list(_WORD.finditer(text or ''))
+    if not tokens:
+        return ''
+    hits = {i for i, m in enumerate(tokens) if any(_fold(m.group()).startswith(t) for t in terms)}
+    first = max(0, min(hits, default=0) - words // 3)
+    window = tokens[first:first + words]
+    out, pos = [], window[0].start()
+    for i, m in enumerate(window, start=first):
+        out.append(html.escape(text[pos:m.start()], quote=False))
+        out.append(f'<b>{html.escape(m.group(), quote=False)}</b>' if i in hits else html.escape(m.group(), quote=False))
+        pos = m.end()
+    prefix = '…' if first > 0 else ''
+    suffix = '…' if first + words < len(tokens) else ''
+    return prefix + ''.join(out) + suffix
+
+
+def search_startups(text: str, status: Optional[str] = None, page: int = 1,
+                    per_page: int = 10) -> Tuple[List[Dict], int]:
+    """Return (rows for ``page``, total matches up to MAX_RESULTS), best match first."""
+    query = build_query(text)
+    if query is None:
+        return [], 0
+    source, params = 'startups_fts WHERE startups_fts MATCH ?', [query]
+    if status:
+        # Unar '+' status indeksini o'chiradi: reja FTS dan boshlanadi, har qatorda MATCH bajarilmaydi
+        source = ('startups_fts JOIN startups s ON s.startup_id = startups_fts.rowid '
+                  'WHERE startups_fts MATCH ? AND +s.status = ?')
+        params = [query, status]
+
+    total = db.fetchvalue(f'SELECT COUNT(*) FROM (SELECT 1 FROM {source} LIMIT {MAX_RESULTS})', params, 0)
+    page = max(1, page)
+    offset = (page - 1) * per_page
+    limit = max(0, min(per_page, MAX_RESULTS - offset))
+    if not total or not limit:
+        return [], total
+
+    ids = [row[0] for row in db.fetchall(
+        f'SELECT startups_fts.rowid FROM {source} ORDER BY bm25(startups_fts, 10.0, 1.0) LIMIT ? OFFSET ?',
+        params + [limit, offset])]
+    rows = {row['startup_id']: row for row in db.fetchdicts(f'''
+        SELECT s.*, u.first_name, u.last_name, u.username
+        FROM startups s JOIN users u ON s.owner_id = u.user_id
+        WHERE s.startup_id IN ({", ".join("?" * len(ids))})
+    ''', ids)} if ids else {}
+    results = []
+    for startup_id in ids:
+        row = rows.get(startup_id)
+        if row is not None:
+            row['snippet'] = snippet(row['description'], text)
+            results.append(row)
+    return results, total
@@ -0,0 +1,108 @@
+# sessions.py
+"""Web admin sessions with an in-process cache and a background sweeper.
+
+``validate`` answers from an LRU cache of sessions that are already known
+to be valid, so an authenticated API call normally costs no SQL. A cached
+entry never outlives the session's ``expires_at``. It also lives at most
+``cache_ttl`` seconds, so a logout handled by another process takes
+effect within that window. Unknown ids are not cached.
+
+Expired ``web_sessions`` rows and expired ``admin_tokens`` rows are
+deleted in small batches by a daemon thread, so the tables stop growing
+and no single DELETE holds the write lock for long.
+"""
+import logging
+import secrets
+import threading
+import time
+from typing import Optional
+
+import cache
+import db
+
+SESSION_TTL = 3600
+CACHE_TTL = 60
+CACHE_SIZE = 5000
+SWEEP_INTERVAL = 600
+SWEEP_BATCH = 500
+
+
+class WebSessionStore:
+    def __init__(self, ttl: float = SESSION_TTL, cache_ttl: float = CACHE_TTL, cache_size: int = CACHE_SIZE):
+        self.ttl = ttl
+        self.cache_ttl = cache_ttl
+        self.cache = cache.TTLCache('web_session', cache_ttl, maxsize=cache_size)
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def _remember(self, session_id: str, user_id: int, expires_at: float):
+        remaining = expires_at - time.time()
+        if remaining > 0:
+            self.cache.set(session_id, user_id, ttl=min(self.cache_ttl, remaining))
+
+    def create(self, user_id: int) -> str:
+        session_id = secrets.token_hex(32)
+        expires_at = time.time() + self.ttl
+        db.execute('''
+            INSERT INTO web_sessions (session_id, user_id, expires_at)
+            VALUES (?, ?, ?)
+        ''', (session_id, user_id, expires_at))
+        self._remember(session_id, user_id, expires_at)
+        self.start()
+        return session_id
+
+    def validate(self, session_id: Optional[str]) -> Optional[int]:
+        if not session_id:
+            return None
+        user_id = self.cache.get(session_id)
+        if user_id is not None:
+            return user_id
+        self.start()
+        row = db.fetchone('SELECT user_id, expires_at FROM web_sessions WHERE session_id = ? AND expires_at > ?',
+                          (session_id, time.time()))
+        if row is None:
+            return None
+        self._remember(session_id, row['user_id'], row['expires_at'])
+        return row['user_id']
+
+    def delete(self, session_id: str):
+        self.cache.invalidate(session_id)
+        db.execute('DELETE FROM web_sessions WHERE session_id = ?', (session_id,))
+
+    def sweep(self, batch: int = SWEEP_BATCH) -> int:
+        """Delete expired sessions and admin tokens in batches; return how many were removed."""
+        removed = 0
+        for table, key in (('web_sessions', 'session_id'), ('admin_tokens', 'id')):
+            while True:
+                cursor = db.execute(f'''
+                    DELETE FROM {table} WHERE {key} IN (
+                        SELECT {key} FROM {table} WHERE expires_at <= ? LIMIT ?
+                    )
+                ''', (time.time(), batch))
+                removed += cursor.rowcount
+                if cursor.rowcount < batch:
+                    break
+        return removed
+
+    def start(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._sweeper, name='session-sweeper', daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _sweeper(self):
+        while True:
+            try:
+                removed = self.sweep()
+                if removed:
+                    logging.info(f'Expired web sessions and admin tokens removed: {removed}')
+            except Exception as e:
+                logging.error(f'Session sweep failed: {e}')
+            if self._stop.wait(SWEEP_INTERVAL):
+                return
@@ -0,0 +1,129 @@
+# snapshots.py
+"""JSON responses cached per data version, pre-compressed, with strong ETags.
+
+``read_version()`` returns a counter that the database bumps whenever the
+underlying data changes. The body is built and compressed once per
+version and then served to everyone. A client that sends back the ETag
+gets a 304. The version is re-read at most every ``recheck_interval``
+seconds per process, or sooner after ``touch()``. In the common case a
+304 therefore costs no SQL at all.
+
+Brotli is used when the optional ``brotli`` package is installed.
+
+``SharedStore`` keeps the latest body per name in SQLite, so when several
+processes serve the same database (gunicorn workers), only the first one
+to see a new version builds it. The others read one row.
+"""
+import gzip
+import json
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import db
+
+try:
+    import brotli
+except ImportError:  # ixtiyoriy
+    brotli = None
+
+RECHECK_INTERVAL = 1.0
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+
+def encode(body: bytes, encoding: str) -> bytes:
+    if encoding == 'br':
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    if encoding == 'gzip':
+        # mtime=0: bir xil ma'lumot har doim bir xil baytlar (kuchli ETag uchun)
+        return gzip.compress(body, GZIP_LEVEL, mtime=0)
+    return body
+
+
+class SharedStore:
+    """Latest snapshot per name in ``shared_snapshots`` (migration 11), shared by every process."""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.saves = 0
+
+    def load(self, name: str, version: int) -> Optional[bytes]:
+        body = db.fetchvalue('SELECT body FROM shared_snapshots WHERE name = ? AND version = ?', (name, version))
+        if body is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return bytes(body)
+
+    def save(self, name: str, version: int, body: bytes):
+        # Kechikkan jarayon yangiroq versiyani eskisi bilan almashtirmaydi
+        db.execute('''
+            INSERT INTO shared_snapshots (name, version, body) VALUES (?, ?, ?)
+            ON CONFLICT (name) DO UPDATE SET version = excluded.version, body = excluded.body
+            WHERE excluded.version > shared_snapshots.version
+        ''', (name, version, body))
+        self.saves += 1
+
+    def stats(self) -> Dict:
+        return {'hits': self.hits, 'misses': self.misses, 'saves': self.saves}
+
+
+class VersionedJSON:
+    def __init__(self, read_version: Callable[[], int], build: Callable[[], Any],
+                 recheck_interval: float = RECHECK_INTERVAL, store: Optional[SharedStore] = None,
+                 name: str = 'json'):
+        self.read_version = read_version
+        self.build = build
+        self.recheck_interval = recheck_interval
+        self.store = store
+        self.name = name
+        self.encodings = ('br', 'gzip') if brotli is not None else ('gzip',)
+        self.version: Optional[int] = None
+        self.builds = 0
+        self.version_reads = 0
+        self.shared_loads = 0
+        self._bodies: Dict[str, bytes] = {}
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def touch(self):
+        """This process changed the data: re-read the version on the next request."""
+        self._checked_at = 0.0
+
+    def etag(self, encoding: str) -> str:
+        return f'"d{self.version}-{encoding}"'
+
+    def _ensure_fresh(self):
+        if self.version is not None and time.monotonic() - self._checked_at < self.recheck_interval:
+            return
+        self._checked_at = time.monotonic()
+        version = self.read_version()
+        self.version_reads += 1
+        if version == self.version:
+            return
+        body = self.store.load(self.name, version) if self.store is not None else None
+        if body is None:
+            # Versiya ma'lumotdan oldin o'qiladi: oraliqdagi o'zgarish keyingi tekshiruvda qayta quriladi
+            body = json.dumps(self.build(), default=str, separators=(',', ':')).encode()
+            self.builds += 1
+            if self.store is not None:
+                self.store.save(self.name, version, body)
+        else:
+            self.shared_loads += 1
+        self._bodies = {'identity': body}
+        self.version = version
+
+    def get(self, encoding: str = 'identity') -> Tuple[str, bytes]:
+        """Return (ETag, body) for ``encoding`` ('br', 'gzip' or 'identity')."""
+        with self._lock:
+            self._ensure_fresh()
+            body = self._bodies.get(encoding)
+            if body is None:
+                body = self._bodies[encoding] = encode(self._bodies['identity'], encoding)
+            return self.etag(encoding), body
+
+    def stats(self) -> Dict:
+        return {'version': self.version, 'builds': self.builds, 'version_reads': self.version_reads,
+                'shared_loads': self.shared_loads}
@@ -0,0 +1,241 @@
+# sqltrace.py
+"""Opt-in SQL tracing: per-update statement lists, top queries and a slow-query log.
+
+Enabled with ``SQL_TRACE=1``. The db.py helpers are then wrapped so that
+every statement records its normalized SQL, duration, row count and the
+calling function. Each statement is added to:
+
+- the trace of the bot update or HTTP request currently running on this
+  thread. The last ``RECENT_TRACES`` traces are kept in memory.
+- per-statement totals, used for the top-N list.
+- the slow-query log, if it took at least ``SQL_SLOW_MS``. That is a
+  rotating NDJSON file, and each entry carries the statement's
+  ``EXPLAIN QUERY PLAN`` (captured once per statement).
+
+Parameter values are never logged.
+"""
+import functools
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from collections import deque
+from logging.handlers import RotatingFileHandler
+from typing import Callable, Dict, List, Optional
+
+import db
+
+ENABLED = os.getenv('SQL_TRACE', '') == '1'
+SLOW_MS = float(os.getenv('SQL_SLOW_MS', '50'))
+LOG_PATH = os.getenv('SQL_SLOW_LOG', 'logs/slow_queries.ndjson')
+LOG_MAX_BYTES = 10 * 2 ** 20
+LOG_BACKUPS = 5
+RECENT_TRACES = 50
+MAX_STATEMENTS = 2000   # alohida SQL matnlari soni chegarasi
+MAX_TRACE_STATEMENTS = 500
+
+_WHITESPACE = re.compile(r'\s+')
+_SKIP_MODULES = ('db', 'metrics', __name__)
+
+_local = threading.local()
+_lock = threading.Lock()
+statements: Dict[str, Dict] = {}
+recent: deque = deque(maxlen=RECENT_TRACES)
+_slow_log: Optional[logging.Logger] = None
+
+
+def normalize(sql: str) -> str:
+    return _WHITESPACE.sub(' ', sql).strip()
+
+
+def _caller() -> str:
+    frame = sys._getframe(2)
+    while frame is not None and frame.f_globals.get('__name__') in _SKIP_MODULES:
+        frame = frame.f_back
+    return frame.f_code.co_name if frame is not None else '?'
+
+
+def slow_log() -> logging.Logger:
+    global _slow_log
+    if _slow_log is None:
+        directory = os.path.dirname(LOG_PATH)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        logger = logging.getLogger('garajhub.slow_sql')
+        logger.propagate = False
+        handler = RotatingFileHandler(LOG_PATH, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS, encoding='utf-8')
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        _slow_log = logger
+    return _slow_log
+
+
+# ==================== KONTEKST ====================
+class Trace:
+    __slots__ = ('name', 'started', 'statements', 'dropped')
+
+    def __init__(self, name: str):
+        self.name = name
+        self.started = time.perf_counter()
+        self.statements: List[Dict] = []
+        self.dropped = 0
+
+    def snapshot(self) -> Dict:
+        return {
+            'name': self.name,
+            'ms': round((time.perf_counter() - self.started) * 1000, 3),
+            'sql_ms': round(sum(s['ms'] for s in self.statements), 3),
+            'statements': self.statements,
+            'dropped': self.dropped,
+        }
+
+
+def current() -> Optional[Trace]:
+    return getattr(_local, 'trace', None)
+
+
+def begin(name: str) -> Optional[Trace]:
+    """Start this thread's trace; None if one is already running (nested handler)."""
+    if current() is not None:
+        return None
+    _local.trace = Trace(name)
+    return _local.trace
+
+
+def end(trace: Optional[Trace]):
+    if trace is None or current() is not trace:
+        return
+    _local.trace = None
+    if trace.statements:
+        recent.append(trace.snapshot())
+
+
+def traced(fn: Callable, name: str) -> Callable:
+    """Run ``fn`` inside a trace; a nested traced call only renames the current trace."""
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        trace = begin(name)
+        if trace is None:
+            # Ichki handler (callback marshruti, dialog bosqichi) aniqroq nom beradi
+            current().name = name
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            end(trace)
+    wrapper.sql_traced = True
+    return wrapper
+
+
+# ==================== YOZISH ====================
+def _plan(sql: str, params) -> List[str]:
+    try:
+        with db.pool.connection() as conn:
+            return [row[3] for row in conn.execute('EXPLAIN QUERY PLAN ' + sql, params).fetchall()]
+    except Exception as e:
+        return [f'EXPLAIN failed: {e}']
+
+
+def record(sql: str, params, seconds: float, rows: int, where: str):
+    text = normalize(sql)
+    ms = seconds * 1000
+    trace = current()
+    if trace is not None:
+        if len(trace.statements) < MAX_TRACE_STATEMENTS:
+            trace.statements.append({'sql': text, 'ms': round(ms, 3), 'rows': rows, 'where': where})
+        else:
+            trace.dropped += 1
+
+    slow = ms >= SLOW_MS
+    with _lock:
+        entry = statements.get(text)
+        if entry is None:
+            if len(statements) >= MAX_STATEMENTS:
+                text = '<other>'
+                entry = statements.get(text)
+            if entry is None:
+                entry = statements[text] = {'sql': text, 'where': where, 'count': 0, 'total_ms': 0.0,
+                                            'max_ms': 0.0, 'rows': 0, 'slow': 0, 'plan': None}
+        entry['count'] += 1
+        entry['total_ms'] += ms
+        entry['max_ms'] = max(entry['max_ms'], ms)
+        entry['rows'] += rows
+        entry['slow'] += slow
+        need_plan = slow and entry['plan'] is None and text != '<other>'
+        if need_plan:
+            entry['plan'] = []
+    if not slow:
+        return
+    if need_plan:
+        entry['plan'] = _plan(sql, params)
+    slow_log().info(json.dumps({
+        'ts': time.time(), 'ms': round(ms, 3), 'rows': rows, 'sql': text, 'where': where,
+        'context': trace.name if trace is not None else None, 'plan': entry['plan'],
+    }, ensure_ascii=False))
+
+
+def _row_count(result) -> int:
+    if result is None:
+        return 0
+    if isinstance(result, list):
+        return len(result)
+    rowcount = getattr(result, 'rowcount', None)
+    if rowcount is not None:
+        # SELECT uchun rowcount -1: qatorlar keyinroq o'qiladi
+        return max(rowcount, 0)
+    return 1
+
+
+def _timed(fn: Callable) -> Callable:
+    @functools.wraps(fn)
+    def wrapper(sql, params=()):
+        start = time.perf_counter()
+        result = fn(sql, params)
+        record(sql, params, time.perf_counter() - start, _row_count(result), _caller())
+        return result
+    wrapper.sql_traced = True
+    return wrapper
+
+
+# ==================== ULASH ====================
+def instrument_db(db, names=('fetchone', 'fetchall', 'execute')):
+    """Wrap the db.py helpers; call before metrics.instrument_db so metrics stays outermost."""
+    for name in names:
+        fn = getattr(db, name)
+        if not getattr(fn, 'sql_traced', False):
+            setattr(db, name, _timed(fn))
+
+
+def instrument_bot(bot, routes: Optional[Dict] = None, steps: Optional[Dict] = None):
+    """Give every bot update its own trace, named after the most specific handler."""
+    for attr, handlers in vars(bot).items():
+        if attr.endswith('_handlers') and isinstance(handlers, list):
+            for handler in handlers:
+                if isinstance(handler, dict) and 'function' in handler:
+                    fn = handler['function']
+                    if not getattr(fn, 'sql_traced', False):
+                        handler['function'] = traced(fn, fn.__name__)
+    for action, (fn, arg_types) in (routes or {}).items():
+        routes[action] = (traced(fn, f'callback:{action}'), arg_types)
+    for step, fn in (steps or {}).items():
+        steps[step] = traced(fn, f'step:{step}')
+
+
+def top(n: int = 20, key: str = 'total_ms') -> List[Dict]:
+    with _lock:
+        entries = [dict(entry) for entry in statements.values()]
+    entries.sort(key=lambda entry: entry[key], reverse=True)
+    for entry in entries:
+        entry['avg_ms'] = round(entry['total_ms'] / entry['count'], 3)
+        entry['total_ms'] = round(entry['total_ms'], 3)
+        entry['max_ms'] = round(entry['max_ms'], 3)
+    return entries[:n]
+
+
+def reset():
+    with _lock:
+        statements.clear()
+        recent.clear()
@@ -0,0 +1,376 @@
+# web.py
+"""Flask admin panel: dashboard pages, JSON API, exports, /metrics and the Telegram webhook.
+
+Built by ``main.create_app()``. Messages to users go through
+``main.telegram_client()``, so serving the panel never registers bot
+handlers. In webhook mode the first update builds them
+(``main.create_bot``).
+"""
+import logging
+import traceback
+
+from flask import (Flask, Response, render_template, request, jsonify, redirect, url_for,
+                   send_from_directory, stream_with_context)
+from flask_cors import CORS
+
+import cache
+import events
+import export
+import metrics
+import search
+import sqltrace
+import webhook
+from main import (METRICS_TOKEN, WEBHOOK_SECRET, WEBHOOK_WORKERS, WEB_SECRET_KEY, active_startups, broadcaster,
+                  create_bot, create_web_session, dashboard_events, dashboard_snapshot, delete_web_session,
+                  get_all_users, get_recent_startups, get_recent_users, get_startup, get_startups_page,
+                  get_statistics, get_user, get_users_page, navigation_stats, shared, telegram_client,
+                  update_startup_status, validate_web_session)
+
+updates = webhook.UpdateDispatcher(lambda batch: create_bot().process_new_updates(batch), workers=WEBHOOK_WORKERS)
+metrics.Gauge('garajhub_update_queue_depth', 'Webhook updates waiting for a handler thread',
+              read=lambda: updates.stats()['queued'])
+
+# Flask Web App
+app = Flask(__name__, template_folder='templates')
+app.secret_key = WEB_SECRET_KEY
+CORS(app)  # CORS qo'shing deployment uchun
+
+if sqltrace.ENABLED:
+    @app.before_request
+    def begin_sql_trace():
+        request.sql_trace = sqltrace.begin(f'{request.method} {request.path}')
+
+    @app.teardown_request
+    def end_sql_trace(error=None):
+        sqltrace.end(getattr(request, 'sql_trace', None))
+
+# Error handler
+@app.errorhandler(500)
+def internal_error(error):
+    logging.error(f'Internal error: {traceback.format_exc()}')
+    return jsonify({'error': 'Internal Server Error', 'message': str(error)}), 500
+
+@app.errorhandler(404)
+def not_found(error):
+    return jsonify({'error': 'Not Found'}), 404
+
+# ==================== WEB ADMIN PANEL ====================
+@app.route('/')
+def index():
+    return redirect(url_for('login'))
+
+@app.route('/login')
+def login():
+    return render_template('login.html')
+
+@app.route('/api/login', methods=['POST'])
+def api_login():
+    data = request.json
+    user_id = data.get('user_id')
+    token = data.get('token')
+    
+    # Check if user is admin
+    user = get_user(int(user_id)) if user_id.isdigit() else None
+    if not user or not user.get('is_admin'):
+        return jsonify({'success': False, 'message': 'Admin emas'})
+    
+    # Create session
+    session_id = create_web_session(int(user_id))
+    return jsonify({'success': True, 'session_id': session_id})
+
+
+# Cross-origin friendly login: create session and set cookie, then redirect to admin.
+@app.route('/auth/redirect_login')
+def redirect_login():
+    user_id = request.args.get('user_id')
+    if not user_id or not user_id.isdigit():
+        return redirect(url_for('login'))
+
+    user = get_user(int(user_id))
+    if not user or not user.get('is_admin'):
+        return redirect(url_for('login'))
+
+    session_id = create_web_session(int(user_id))
+    resp = redirect(url_for('admin_dashboard'))
+    # Set cookie for the backend domain so subsequent requests from browser include it
+    resp.set_cookie('session_id', session_id, httponly=True, samesite='None', secure=True)
+    return resp
+
+@app.route('/api/logout', methods=['POST'])
+def api_logout():
+    session_id = request.cookies.get('session_id')
+    if session_id:
+        delete_web_session(session_id)
+    resp = jsonify({'success': True})
+    resp.delete_cookie('session_id', samesite='None', secure=True)
+    return resp
+
+@app.route('/admin')
+def admin_dashboard():
+    session_id = request.cookies.get('session_id')
+    user_id = validate_web_session(session_id) if session_id else None
+    
+    if not user_id:
+        return redirect(url_for('login'))
+    
+    stats = get_statistics()
+    recent_users = get_recent_users(5)
+    recent_startups = get_recent_startups(5)
+    
+    return render_template('dashboard.html', 
+                         stats=stats,
+                         recent_users=recent_users,
+                         recent_startups=recent_startups)
+
+@app.route('/api/stats')
+def api_stats():
+    session_id = request.cookies.get('session_id')
+    if not validate_web_session(session_id):
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    stats = get_statistics()
+    return jsonify(stats)
+
+@app.route('/api/dashboard')
+def api_dashboard():
+    session_id = request.cookies.get('session_id')
+    if not validate_web_session(session_id):
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    encoding = next((e for e in dashboard_snapshot.encodings if request.accept_encodings[e]), 'identity')
+    etag, body = dashboard_snapshot.get(encoding)
+    headers = {'ETag': etag, 'Cache-Control': 'private, no-cache', 'Vary': 'Accept-Encoding, Cookie'}
+    if request.if_none_match.contains_weak(etag.strip('"')):
+        return Response(status=304, headers=headers)
+    if encoding != 'identity':
+        headers['Content-Encoding'] = encoding
+    return Response(body, mimetype='application/json', headers=headers)
+
+@app.route('/api/stream')
+def api_stream():
+    session_id = request.cookies.get('session_id')
+    if not validate_web_session(session_id):
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    try:
+        subscriber = dashboard_events.subscribe()
+    except events.TooManySubscribers:
+        # Dashboard oddiy so'rovlarga qaytadi
+        return jsonify({'error': 'Busy'}), 503
+    return Response(stream_with_context(dashboard_events.stream(subscriber)), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/metrics')
+def prometheus_metrics():
+    if METRICS_TOKEN and request.headers.get('Authorization') != f'Bearer {METRICS_TOKEN}':
+        return jsonify({'error': 'Not Found'}), 404
+    return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
+@app.route('/api/sql')
+def api_sql():
+    session_id = request.cookies.get('session_id')
+    if not validate_web_session(session_id):
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    limit = int(request.args.get('n', 20))
+    sort = request.args.get('sort', 'total_ms')
+    if sort not in ('total_ms', 'max_ms', 'count', 'rows', 'slow'):
+        sort = 'total_ms'
+    return jsonify({
+        'enabled': sqltrace.ENABLED,
+        'slow_ms': sqltrace.SLOW_MS,
+        'top': sqltrace.top(limit, sort),
+        'recent': list(sqltrace.recent)[-limit:],
+    })
+
+@app.route('/api/cache')
+def api_cache():
+    session_id = request.cookies.get('session_id')
+    if not validate_web_session(session_id):
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    # Faqat shu web jarayoni: bot jarayonining keshlari va navigatsiyasi uning /metrics (METRICS_PORT) sahifasida
+    return jsonify({**cache.all_stats(), 'navigation': navigation_stats(), 'stream': dashboard_events.stats(),
+                    'dashboard': dashboard_snapshot.stats(), 'catalogue': active_startups.stats(),
+                    'shared': shared.stats()})
+
+@app.route('/api/startups')
+def api_startups():
+    session_id = request.cookies.get('session_id')
+    if not validate_web_session(session_id):
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    status = request.args.get('status', 'all')
+    cursor = request.args.get('cursor')
+    per_page = int(request.args.get('per_page', 10))
+    query = request.args.get('q', '').strip()
+    
+    if query:
+        # Qidiruv natijalari moslik bo'yicha tartiblanadi, shuning uchun sahifa raqami bilan
+        page = int(request.args.get('page', 1))
+        startups, total = search.search_startups(query, None if status == 'all' else status, page, per_page)
+        return jsonify({
+            'data': startups,
+            'q': search.normalize(query),
+            'page': page,
+            'total': total,
+            'per_page': per_page,
+            'total_pages': (total + per_page - 1) // per_page
+        })
+    
+    startups, next_cursor, prev_cursor, total = get_startups_page(status, cursor, per_page)
+    
+    result = {
+        'data': startups,
+        'next_cursor': next_cursor,
+        'prev_cursor': prev_cursor,
+        'total': total,
+        'per_page': per_page,
+        'total_pages': (total + per_page - 1) // per_page
+    }
+    
+    return jsonify(result)
+
+@app.route('/api/users')
+def api_users():
+    session_id = request.cookies.get('session_id')
+    if not validate_web_session(session_id):
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    cursor = request.args.get('cursor')
+    per_page = int(request.args.get('per_page', 10))
+    
+    users, next_cursor, prev_cursor, total = get_users_page(cursor, per_page)
+    
+    result = {
+        'data': users,
+        'next_cursor': next_cursor,
+        'prev_cursor': prev_cursor,
+        'total': total,
+        'per_page': per_page,
+        'total_pages': (total + per_page - 1) // per_page
+    }
+    
+    return jsonify(result)
+
+@app.route('/api/export/<name>')
+def api_export(name):
+    session_id = request.cookies.get('session_id')
+    if not validate_web_session(session_id):
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    fmt = request.args.get('format', 'csv')
+    if name not in export.EXPORTS or fmt not in export.FORMATS:
+        return jsonify({'error': 'Not Found'}), 404
+    status = request.args.get('status', 'all')
+    
+    # Qatorlar partiyalab o'qiladi va darhol yuboriladi, xotira jadval hajmiga bog'liq emas
+    return Response(stream_with_context(export.stream(name, fmt, None if status == 'all' else status)),
+                    mimetype=export.FORMATS[fmt],
+                    headers={'Content-Disposition': f'attachment; filename={name}.{fmt}',
+                             'X-Accel-Buffering': 'no'})
+
+@app.route('/api/broadcast', methods=['POST'])
+def api_broadcast():
+    session_id = request.cookies.get('session_id')
+    if not validate_web_session(session_id):
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    data = request.json
+    message = data.get('message')
+    
+    if not message:
+        return jsonify({'success': False, 'message': 'Xabar bo\'sh'})
+    
+    job = broadcaster.submit(get_all_users(), f"📢 <b>Yangilik!</b>\n\n{message}")
+    
+    return jsonify({
+        'success': True,
+        'job_id': job.job_id,
+        'total': job.total
+    })
+
+@app.route('/api/broadcast/<job_id>')
+def api_broadcast_status(job_id):
+    session_id = request.cookies.get('session_id')
+    if not validate_web_session(session_id):
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    job = broadcaster.get(job_id)
+    if not job:
+        return jsonify({'error': 'Not Found'}), 404
+    
+    return jsonify(job)
+
+@app.route('/api/startup/<int:startup_id>/approve', methods=['POST'])
+def api_approve_startup(startup_id):
+    session_id = request.cookies.get('session_id')
+    if not validate_web_session(session_id):
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    update_startup_status(startup_id, 'active')
+    
+    # Notify owner
+    startup = get_startup(startup_id)
+    if startup:
+        try:
+            telegram_client().send_message(
+                startup['owner_id'],
+                f"🎉 <b>Tabriklaymiz!</b>\n\n"
+                f"✅ Sizning '<b>{startup['name']}</b>' startupingiz tasdiqlandi!"
+            )
+        except:
+            pass
+    
+    return jsonify({'success': True})
+
+@app.route('/api/startup/<int:startup_id>/reject', methods=['POST'])
+def api_reject_startup(startup_id):
+    session_id = request.cookies.get('session_id')
+    if not validate_web_session(session_id):
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    update_startup_status(startup_id, 'rejected')
+    
+    # Notify owner
+    startup = get_startup(startup_id)
+    if startup:
+        try:
+            telegram_client().send_message(
+                startup['owner_id'],
+                f"❌ <b>Xabar!</b>\n\n"
+                f"Sizning '<b>{startup['name']}</b>' startupingiz rad etildi."
+            )
+        except:
+            pass
+    
+    return jsonify({'success': True})
+
+# ==================== TELEGRAM WEBHOOK ====================
+def start_webhook_workers():
+    # Handlerlar navbat oqimlarida bajariladi, telebot'ning o'z pool'i kerak emas
+    create_bot().threaded = False
+    updates.start()
+    broadcaster.start()
+
+@app.route('/telegram/webhook', methods=['POST'])
+def telegram_webhook():
+    if not WEBHOOK_SECRET or request.headers.get('X-Telegram-Bot-Api-Secret-Token') != WEBHOOK_SECRET:
+        return jsonify({'error': 'Not Found'}), 404
+    
+    # telebot faqat webhook rejimida yuklanadi
+    from telebot import types
+    update = types.Update.de_json(request.get_data(as_text=True))
+    if update is None:
+        return jsonify({'error': 'Bad Request'}), 400
+    
+    start_webhook_workers()
+    if updates.submit(update) == webhook.FULL:
+        # Navbat to'la: Telegram keyinroq qayta yuboradi
+        return jsonify({'error': 'Busy'}), 503
+    return '', 200
+
+# ==================== TEMPLATES ====================
+@app.route('/templates/<path:filename>')
+def serve_template(filename):
+    return send_from_directory('templates', filename)
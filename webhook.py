@@ -0,0 +1,108 @@
+# webhook.py
+"""Webhook ingestion: dedupe updates and hand them to bounded worker queues.
+
+The HTTP handler only parses the update and enqueues it, so Telegram gets
+its 200 at once and never retries because a bot handler was slow. Updates
+are partitioned by chat id. Each chat always lands on the same worker
+thread, which keeps messages in order and next-step flows intact.
+"""
+import logging
+import threading
+from collections import OrderedDict
+from queue import Full, Queue
+from typing import Callable, List
+
+QUEUED = 'queued'
+DUPLICATE = 'duplicate'
+FULL = 'full'
+
+
+def chat_key(update) -> int:
+    """Chat (or user) id an update belongs to, used for partitioning."""
+    for attr in ('message', 'edited_message', 'channel_post', 'edited_channel_post'):
+        message = getattr(update, attr, None)
+        if message is not None:
+            return message.chat.id
+    call = getattr(update, 'callback_query', None)
+    if call is not None:
+        return call.message.chat.id if call.message else call.from_user.id
+    member = getattr(update, 'chat_member', None)
+    if member is not None:
+        # Kanal a'zoligi foydalanuvchining o'z xabarlari bilan bir navbatda
+        return member.new_chat_member.user.id
+    for attr in ('my_chat_member', 'chat_join_request'):
+        event = getattr(update, attr, None)
+        if event is not None:
+            return event.chat.id
+    for attr in ('inline_query', 'chosen_inline_result', 'shipping_query', 'pre_checkout_query', 'poll_answer'):
+        event = getattr(update, attr, None)
+        if event is not None and getattr(event, 'from_user', None) is not None:
+            return event.from_user.id
+    return 0
+
+
+class UpdateDispatcher:
+    def __init__(self, process: Callable[[List], None], workers: int = 4,
+                 queue_size: int = 1000, remember: int = 10000):
+        self.process = process
+        self.workers = workers
+        self.queues = [Queue(maxsize=queue_size) for _ in range(workers)]
+        self.remember = remember
+        self.processed = 0
+        self.duplicates = 0
+        self.rejected = 0
+        self._seen: 'OrderedDict[int, None]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._threads = []
+
+    def start(self):
+        with self._lock:
+            if self._threads:
+                return
+            for i, queue in enumerate(self.queues):
+                thread = threading.Thread(target=self._worker, args=(queue,), name=f'update-{i}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, update) -> str:
+        update_id = update.update_id
+        with self._lock:
+            if update_id in self._seen:
+                self.duplicates += 1
+                return DUPLICATE
+            self._seen[update_id] = None
+            while len(self._seen) > self.remember:
+                self._seen.popitem(last=False)
+        queue = self.queues[hash(chat_key(update)) % self.workers]
+        try:
+            queue.put_nowait(update)
+        except Full:
+            # Telegram qayta yuborganda qabul qilinishi uchun
+            with self._lock:
+                self._seen.pop(update_id, None)
+                self.rejected += 1
+            return FULL
+        return QUEUED
+
+    def join(self):
+        for queue in self.queues:
+            queue.join()
+
+    def _worker(self, queue: Queue):
+        while True:
+            update = queue.get()
+            try:
+                self.process([update])
+            except Exception as e:
+                logging.error(f'Update {update.update_id} failed: {e}')
+            finally:
+                self.processed += 1
+                queue.task_done()
+
+    def stats(self):
+        return {
+            'queued': sum(q.qsize() for q in self.queues),
+            'processed': self.processed,
+            'duplicates': self.duplicates,
+            'rejected': self.rejected,
+        }